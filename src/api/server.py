@@ -0,0 +1,298 @@
+import argparse
+import asyncio
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import tornado.web
+from tornado.ioloop import IOLoop
+from tornado.iostream import StreamClosedError
+
+from core.model_loader import load_models, models_loaded
+from core.queries import (
+    DEFAULT_TOP_N,
+    parse_flag,
+    parse_query,
+    parse_search,
+    parse_top_n,
+)
+from core.recommender import (
+    RecommendationHandle,
+    get_recommender,
+    get_tracks,
+    range_search,
+    recommend_handle,
+    similar_handle,
+)
+from services import async_engine, spotify_api
+from services.negative_cache import (
+    EXCLUDE_DEAD_FROM_RECOMMENDATIONS,
+    get_negative_cache,
+)
+
+API_PORT = int(os.getenv("API_PORT", "8502"))
+API_THREADS = int(os.getenv("API_THREADS", "8"))
+MAX_BATCH_QUERIES = 100
+
+_executor = ThreadPoolExecutor(max_workers=API_THREADS, thread_name_prefix="api")
+_started_at = time.monotonic()
+
+
+def _excluded_ids():
+    if EXCLUDE_DEAD_FROM_RECOMMENDATIONS:
+        return get_negative_cache().dead_ids()
+    return None
+
+
+def _fetch_items(tracks: List[Dict]) -> List[Dict]:
+    if async_engine.ASYNC_ENGINE_ENABLED:
+        return async_engine.fetch_spotify_data(tracks)
+    return spotify_api.fetch_spotify_data_parallel(tracks)
+
+
+def _prime_metadata(track_ids: List[str]) -> None:
+    # One batched lookup per result instead of a call per track; the items
+    # are then read back from the metadata store.
+    _, _, missing = spotify_api.partition_track_ids(track_ids)
+    if not missing:
+        return
+    try:
+        spotify_api.lookup_tracks(missing)
+    except Exception as e:
+        print(f"⚠️ Batched lookup of {len(missing)} tracks failed: {e}")
+
+
+def _result_items(tracks: List[Dict], distances, enrich: bool) -> List[Dict]:
+    if enrich:
+        _prime_metadata([track["id"] for track in tracks])
+    items = _fetch_items(tracks) if enrich else tracks
+    return [
+        dict(item, distance=round(float(distance), 6))
+        for item, distance in zip(items, distances)
+    ]
+
+
+def handle_result(handle: RecommendationHandle, enrich: bool) -> List[Dict]:
+    return _result_items(get_tracks(handle), handle.distances[: handle.shown], enrich)
+
+
+def recommend_result(query: Dict, enrich: bool) -> List[Dict]:
+    handle = recommend_handle(**query, exclude_ids=_excluded_ids())
+    return handle_result(handle, enrich)
+
+
+def similar_result(track_id: str, top_n: int, enrich: bool) -> List[Dict]:
+    handle = similar_handle(track_id, top_n, exclude_ids=_excluded_ids())
+    return handle_result(handle, enrich)
+
+
+def start_search(query: Dict) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    return range_search(**query, exclude_ids=_excluded_ids())
+
+
+def next_search_result(
+    chunks: Iterator[Tuple[np.ndarray, np.ndarray]], limit: int, enrich: bool
+) -> Optional[List[Dict]]:
+    chunk = next(chunks, None)
+    if chunk is None:
+        return None
+    positions, distances = chunk[0][:limit], chunk[1][:limit]
+    tracks = get_recommender().tracks_at(positions)
+    return _result_items(tracks, distances, enrich)
+
+
+class JSONHandler(tornado.web.RequestHandler):
+    def set_default_headers(self) -> None:
+        self.set_header("Content-Type", "application/json; charset=utf-8")
+
+    def write_error(self, status_code: int, **kwargs) -> None:
+        message = self._reason
+        exc_info = kwargs.get("exc_info")
+        if exc_info and isinstance(exc_info[1], tornado.web.HTTPError):
+            message = exc_info[1].log_message or message
+        self.finish(json.dumps({"error": message}))
+
+    def write_json(self, value) -> None:
+        self.write(json.dumps(value, ensure_ascii=False))
+
+    def finish_stream(self, error: Optional[Exception] = None) -> None:
+        # Once the first chunk is flushed the status can't change; a failure
+        # closes the open list and reports itself next to it, so the body is
+        # still valid JSON.
+        if error is None:
+            self.finish("]}")
+        else:
+            self.finish('], "error": %s}' % json.dumps(str(error)))
+
+    def json_body(self):
+        try:
+            return json.loads(self.request.body or b"null")
+        except ValueError:
+            raise tornado.web.HTTPError(400, "Request body must be JSON")
+
+    def enrich_arg(self, default: bool = True) -> bool:
+        try:
+            return parse_flag(self.get_argument("enrich", str(default)), "enrich")
+        except ValueError as e:
+            raise tornado.web.HTTPError(400, str(e))
+
+    async def run_blocking(self, fn, *args):
+        return await IOLoop.current().run_in_executor(_executor, fn, *args)
+
+
+class HealthHandler(JSONHandler):
+    def get(self) -> None:
+        loaded = models_loaded()
+        if not loaded:
+            self.set_status(503)
+        self.write_json(
+            {
+                "status": "ok" if loaded else "loading",
+                "tracks": get_recommender().get_dataset_size() if loaded else 0,
+                "async_engine": async_engine.ASYNC_ENGINE_ENABLED,
+                "uptime_seconds": round(time.monotonic() - _started_at, 1),
+            }
+        )
+
+
+class RecommendHandler(JSONHandler):
+    async def post(self) -> None:
+        body = self.json_body()
+        enrich = self.enrich_arg()
+        batch = isinstance(body, dict) and "queries" in body
+
+        try:
+            if batch:
+                if not isinstance(body["queries"], list) or not body["queries"]:
+                    raise ValueError("queries must be a non-empty list")
+                if len(body["queries"]) > MAX_BATCH_QUERIES:
+                    raise ValueError(f"At most {MAX_BATCH_QUERIES} queries per batch")
+                queries = [parse_query(query) for query in body["queries"]]
+            else:
+                queries = [parse_query(body)]
+        except ValueError as e:
+            raise tornado.web.HTTPError(400, str(e))
+
+        if not batch:
+            try:
+                tracks = await self.run_blocking(recommend_result, queries[0], enrich)
+            except ValueError as e:
+                raise tornado.web.HTTPError(400, str(e))
+            self.write_json({"tracks": tracks})
+            return
+
+        # Every query starts at once; results go out in request order, each
+        # flushed as soon as it and the ones before it are ready.
+        pending = [
+            asyncio.ensure_future(self.run_blocking(recommend_result, query, enrich))
+            for query in queries
+        ]
+        self.write('{"results": [')
+        try:
+            for position, future in enumerate(pending):
+                try:
+                    result = json.dumps({"tracks": await future}, ensure_ascii=False)
+                except Exception as e:
+                    print(f"❌ Error processing batch query {position}: {e}")
+                    result = json.dumps({"error": str(e)})
+                if position:
+                    self.write(",")
+                self.write(result)
+                await self.flush()
+        except StreamClosedError:
+            return
+        except Exception as e:
+            print(f"❌ Error streaming batch results: {e}")
+            self.finish_stream(e)
+            return
+        finally:
+            for future in pending:
+                future.cancel()
+        self.finish_stream()
+
+
+class SimilarHandler(JSONHandler):
+    async def get(self, track_id: str) -> None:
+        enrich = self.enrich_arg()
+        try:
+            top_n = parse_top_n(self.get_argument("top_n", str(DEFAULT_TOP_N)))
+        except ValueError as e:
+            raise tornado.web.HTTPError(400, str(e))
+
+        try:
+            tracks = await self.run_blocking(similar_result, track_id, top_n, enrich)
+        except KeyError:
+            raise tornado.web.HTTPError(404, f"Unknown track id: {track_id}")
+        self.write_json({"id": track_id, "tracks": tracks})
+
+
+class SearchHandler(JSONHandler):
+    async def post(self) -> None:
+        enrich = self.enrich_arg()
+        try:
+            query = parse_search(self.json_body())
+            limit = query.pop("limit")
+            chunks = await self.run_blocking(start_search, query)
+        except ValueError as e:
+            raise tornado.web.HTTPError(400, str(e))
+
+        # Matches go out nearest first, a flushed chunk at a time.
+        self.write('{"tracks": [')
+        sent = 0
+        try:
+            while sent < limit:
+                items = await self.run_blocking(
+                    next_search_result, chunks, limit - sent, enrich
+                )
+                if not items:
+                    break
+                chunk = ",".join(json.dumps(item, ensure_ascii=False) for item in items)
+                self.write("," + chunk if sent else chunk)
+                sent += len(items)
+                await self.flush()
+        except StreamClosedError:
+            return
+        except Exception as e:
+            print(f"❌ Error streaming search results: {e}")
+            self.finish_stream(e)
+            return
+        self.finish_stream()
+
+
+def make_app() -> tornado.web.Application:
+    return tornado.web.Application(
+        [
+            (r"/health", HealthHandler),
+            (r"/recommend", RecommendHandler),
+            (r"/search", SearchHandler),
+            (r"/tracks/([^/]+)/similar", SimilarHandler),
+        ]
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="JSON recommendation API served next to the Streamlit UI."
+    )
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=API_PORT)
+    args = parser.parse_args()
+
+    # Loaded before listening so /health only reports ready once it is.
+    load_models()
+    get_recommender()
+
+    app = make_app()
+    app.listen(args.port, address=args.host)
+    print(f"🚀 Recommendation API listening on http://{args.host}:{args.port}")
+    try:
+        IOLoop.current().start()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
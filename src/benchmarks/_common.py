@@ -0,0 +1,68 @@
+import os
+import random
+import tempfile
+from typing import Dict, List, Optional, Union
+
+# Imported by the benchmarks before anything under services/ reads its
+# settings: placeholder credentials, no thumbnails, and a scratch directory
+# for anything written, so a run never touches the real store.
+WORKDIR = tempfile.mkdtemp(prefix="benchmark-")
+os.environ.setdefault("CLIENT_ID", "benchmark")
+os.environ.setdefault("CLIENT_SECRET", "benchmark")
+os.environ.setdefault("THUMBNAILS_ENABLED", "0")
+os.environ.setdefault("SPOTIFY_METADATA_DB", os.path.join(WORKDIR, "metadata.sqlite"))
+
+from core.recommender import DECADES  # noqa: E402
+from services import metadata_store, spotify_api, token_manager  # noqa: E402
+from tools.spotify_standin import FixtureStore, LatencyModel, StandInServer  # noqa: E402
+
+
+def point_client_at(base_url: str) -> None:
+    token_manager.TOKEN_URL = f"{base_url}/api/token"
+    spotify_api.SPOTIFY_API_BASE = f"{base_url}/v1"
+
+
+def start_standin(
+    latency: Union[str, LatencyModel] = "fixed:0",
+    store: Optional[FixtureStore] = None,
+    **options,
+) -> StandInServer:
+    # A local Spotify stand-in, with this process's client pointed at it.
+    if isinstance(latency, str):
+        latency = LatencyModel(latency)
+    server = StandInServer(
+        ("127.0.0.1", 0),
+        FixtureStore() if store is None else store,
+        latency,
+        **options,
+    ).start()
+    point_client_at(server.base_url)
+    return server
+
+
+def fresh_metadata_store(label: str) -> None:
+    # Every run gets its own store, so it starts from a cold cache.
+    metadata_store._store = metadata_store.MetadataStore(
+        os.path.join(WORKDIR, f"{label}.sqlite")
+    )
+
+
+def random_query(rng: random.Random, **fixed) -> Dict:
+    # Sliders anywhere and filters on for some queries; keyword arguments
+    # pin any of the fields.
+    query = dict(
+        danceability=rng.uniform(0, 100),
+        energy=rng.uniform(0, 100),
+        acousticness=rng.uniform(0, 100),
+        valence=rng.uniform(0, 100),
+        is_popular=rng.random() < 0.3,
+        is_explicit=rng.random() < 0.3,
+        decade=rng.choice(DECADES + ("",)),
+    )
+    query.update(fixed)
+    return query
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
@@ -0,0 +1,182 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+from tornado.httpclient import AsyncHTTPClient, HTTPClientError, HTTPRequest
+
+from benchmarks._common import percentile, random_query, start_standin
+
+SRC_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+def api_query(rng: random.Random, top_n: int) -> Dict:
+    return random_query(rng, is_popular=False, is_explicit=False, top_n=top_n)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_api(standin_url: str, port: int) -> subprocess.Popen:
+    # Credentials and the scratch store come from this process's settings.
+    env = dict(
+        os.environ,
+        SPOTIFY_API_BASE=f"{standin_url}/v1",
+        TOKEN_URL=f"{standin_url}/api/token",
+    )
+    return subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "api.server",
+            "--host",
+            "127.0.0.1",
+            "--port",
+            str(port),
+        ],
+        cwd=SRC_PATH,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+
+async def wait_healthy(client: AsyncHTTPClient, url: str, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            await client.fetch(f"{url}/health", request_timeout=2)
+            return
+        except (HTTPClientError, OSError):
+            await asyncio.sleep(0.5)
+    raise SystemExit(f"API at {url} did not become healthy in {timeout:.0f}s")
+
+
+def build_request(
+    url: str, kind: str, rng: random.Random, track_ids: List[str], args
+) -> HTTPRequest:
+    enrich = "1" if args.enrich else "0"
+    if kind == "recommend":
+        body = json.dumps(api_query(rng, args.top_n))
+        return HTTPRequest(f"{url}/recommend?enrich={enrich}", "POST", body=body)
+    if kind == "batch":
+        queries = [api_query(rng, args.top_n) for _ in range(args.batch_size)]
+        body = json.dumps({"queries": queries})
+        return HTTPRequest(f"{url}/recommend?enrich={enrich}", "POST", body=body)
+    if kind == "similar":
+        track_id = rng.choice(track_ids)
+        return HTTPRequest(
+            f"{url}/tracks/{track_id}/similar?top_n={args.top_n}&enrich={enrich}"
+        )
+    return HTTPRequest(f"{url}/health")
+
+
+async def load(url: str, args) -> Tuple[Dict[str, List[float]], Dict[str, int], float]:
+    client = AsyncHTTPClient(force_instance=True, max_clients=args.concurrency)
+    await wait_healthy(client, url, args.startup_timeout)
+
+    # Seed ids for /similar from the API itself.
+    seed = await client.fetch(
+        f"{url}/recommend?enrich=0",
+        method="POST",
+        body=json.dumps(api_query(random.Random(0), 20)),
+    )
+    track_ids = [track["id"] for track in json.loads(seed.body)["tracks"]]
+    kinds = (
+        ["recommend", "batch", "similar"] if args.endpoint == "mix" else [args.endpoint]
+    )
+
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    failures: Dict[str, int] = defaultdict(int)
+    deadline = time.monotonic() + args.duration
+
+    async def worker(number: int) -> None:
+        rng = random.Random(args.seed + number)
+        while time.monotonic() < deadline:
+            kind = rng.choice(kinds)
+            request = build_request(url, kind, rng, track_ids, args)
+            request.request_timeout = 60
+            started = time.perf_counter()
+            try:
+                await client.fetch(request)
+                latencies[kind].append(time.perf_counter() - started)
+            except (HTTPClientError, OSError):
+                failures[kind] += 1
+
+    started = time.monotonic()
+    await asyncio.gather(*(worker(number) for number in range(args.concurrency)))
+    elapsed = time.monotonic() - started
+    client.close()
+    return latencies, failures, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Requests/sec and latency percentiles of the JSON API."
+    )
+    parser.add_argument("--url", help="Target a running API instead of starting one")
+    parser.add_argument(
+        "--endpoint",
+        choices=["recommend", "batch", "similar", "health", "mix"],
+        default="mix",
+    )
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--top-n", type=int, default=10)
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--enrich", action="store_true", help="Enrich with Spotify")
+    parser.add_argument("--latency", default="fixed:0.05")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--startup-timeout", type=float, default=120.0)
+    args = parser.parse_args()
+
+    server = api = None
+    url = args.url
+    if url is None:
+        server = start_standin(args.latency)
+        port = free_port()
+        api = start_api(server.base_url, port)
+        url = f"http://127.0.0.1:{port}"
+
+    try:
+        latencies, failures, elapsed = asyncio.run(load(url.rstrip("/"), args))
+    finally:
+        if api is not None:
+            api.terminate()
+            api.wait()
+        if server is not None:
+            server.shutdown()
+
+    print("=" * 72)
+    print(
+        f"{url}  concurrency={args.concurrency}  {elapsed:.1f}s  "
+        f"enrich={'on' if args.enrich else 'off'}"
+    )
+    print(
+        f"{'endpoint':<10} {'requests':>9} {'req/s':>8} {'p50':>10} {'p90':>10} "
+        f"{'p99':>10} {'errors':>7}"
+    )
+    for kind in sorted(set(latencies) | set(failures)):
+        values = latencies[kind] or [float("nan")]
+        print(
+            f"{kind:<10} {len(latencies[kind]):>9} {len(latencies[kind]) / elapsed:>8.1f} "
+            f"{percentile(values, 0.5) * 1000:>7.1f} ms {percentile(values, 0.9) * 1000:>7.1f} ms "
+            f"{percentile(values, 0.99) * 1000:>7.1f} ms {failures[kind]:>7}"
+        )
+    total = sum(len(values) for values in latencies.values())
+    print(f"{'total':<10} {total:>9} {total / elapsed:>8.1f}")
+    print("=" * 72)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+import argparse
+import random
+
+from benchmarks._common import random_query, start_standin
+from core.recommender import recommend
+from services import spotify_api
+from tools.spotify_standin import FixtureStore
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Artist calls needed to fill genres on recommendation pages."
+    )
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    store = FixtureStore()
+    store.load_dataset()
+    server = start_standin(store=store)
+
+    calls = []
+    fetch_artists = spotify_api._artist_genres.fetch_artists
+
+    def counting_fetch(artist_ids):
+        calls.append(len(artist_ids))
+        return fetch_artists(artist_ids)
+
+    spotify_api._artist_genres.fetch_artists = counting_fetch
+
+    rng = random.Random(args.seed)
+    queries = [
+        random_query(rng, is_popular=False, is_explicit=False, top_n=20)
+        for _ in range(args.pages)
+    ]
+
+    print("=" * 60)
+    print(
+        f"{'page':>4} {'tracks':>7} {'artists':>8} {'artist calls':>13} {'w/ genres':>10}"
+    )
+    # Replaying the same queries shows the warm-cache cost.
+    for label, batch in (("cold", queries), ("warm", queries)):
+        total_calls = 0
+        for page, query in enumerate(batch, 1):
+            tracks = recommend(**query).to_dict("records")
+            before = len(calls)
+            items = spotify_api.fetch_spotify_data_parallel(tracks)
+            page_calls = len(calls) - before
+            total_calls += page_calls
+            artists = {
+                artist_id
+                for entry in spotify_api._load_stored_entries(
+                    [track["id"] for track in tracks]
+                ).values()
+                for artist_id in entry["artist_ids"]
+            }
+            with_genres = sum(1 for item in items if item["genres"])
+            if label == "cold":
+                print(
+                    f"{page:>4} {len(tracks):>7} {len(artists):>8} {page_calls:>13} "
+                    f"{with_genres:>10}"
+                )
+        print(f"{label}: {total_calls} artist calls for {len(batch)} pages")
+    print("=" * 60)
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
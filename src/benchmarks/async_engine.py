@@ -0,0 +1,148 @@
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import threading
+import time
+
+from benchmarks._common import fresh_metadata_store, point_client_at, start_standin
+from services import async_engine, rate_limiter, spotify_api, token_manager
+
+_PAGE_SIZE = resource.getpagesize()
+
+
+def _rss_bytes() -> int:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * _PAGE_SIZE
+
+
+class Sampler(threading.Thread):
+    def __init__(self, interval: float = 0.01):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.peak_threads = 0
+        self.peak_rss = 0
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            self.peak_threads = max(self.peak_threads, threading.active_count())
+            self.peak_rss = max(self.peak_rss, _rss_bytes())
+            time.sleep(self.interval)
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+def worker(engine: str, sessions: int, tracks: int, base_url: str) -> dict:
+    # Runs in its own process so thread stacks and allocator state from one
+    # configuration don't leak into the next measurement.
+    fresh_metadata_store(engine)
+    point_client_at(base_url)
+    rate_limiter._token_bucket = rate_limiter.TokenBucket(100000, 100000)
+    token_manager.get_access_token()
+
+    if engine == "asyncio":
+        fetch = async_engine.fetch_spotify_data
+        async_engine.get_async_engine()
+    else:
+        fetch = spotify_api.fetch_spotify_data_parallel
+
+    baseline_threads = threading.active_count()
+    baseline_rss = _rss_bytes()
+    barrier = threading.Barrier(sessions + 1)
+    durations = []
+
+    def session(index: int):
+        ids = [{"id": f"s{index}-{i}"} for i in range(tracks)]
+        barrier.wait()
+        started = time.monotonic()
+        fetch(ids)
+        durations.append(time.monotonic() - started)
+
+    sampler = Sampler()
+    sampler.start()
+    threads = [
+        threading.Thread(target=session, args=(i,), daemon=True)
+        for i in range(sessions)
+    ]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    started = time.monotonic()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+    sampler.stop()
+
+    durations.sort()
+    return {
+        "engine": engine,
+        "sessions": sessions,
+        # Session threads stand in for Streamlit script threads and exist in
+        # both engines; only count what the engine adds on top.
+        "engine_threads": sampler.peak_threads - baseline_threads - sessions,
+        "rss_delta_mib": (sampler.peak_rss - baseline_rss) / 2**20,
+        "tracks_per_second": sessions * tracks / elapsed,
+        "p95_session_seconds": durations[int(0.95 * (len(durations) - 1))],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Thread count, memory and throughput: executor vs asyncio."
+    )
+    parser.add_argument("--sessions", default="10,50,200")
+    parser.add_argument("--tracks", type=int, default=20)
+    parser.add_argument("--latency", default="fixed:0.05")
+    parser.add_argument("--worker", choices=("threads", "asyncio"))
+    parser.add_argument("--base-url")
+    args = parser.parse_args()
+
+    if args.worker:
+        result = worker(args.worker, int(args.sessions), args.tracks, args.base_url)
+        print(json.dumps(result))
+        return
+
+    server = start_standin(args.latency)
+
+    print("=" * 78)
+    print(
+        f"{'engine':<8} {'sessions':>8} {'extra threads':>14} {'peak RSS +MiB':>14} "
+        f"{'tracks/s':>10} {'p95 session':>12}"
+    )
+    for sessions in [int(s) for s in args.sessions.split(",")]:
+        for engine in ("threads", "asyncio"):
+            output = subprocess.run(
+                [
+                    sys.executable,
+                    "-m",
+                    "benchmarks.async_engine",
+                    "--worker",
+                    engine,
+                    "--sessions",
+                    str(sessions),
+                    "--tracks",
+                    str(args.tracks),
+                    "--base-url",
+                    server.base_url,
+                ],
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            print(
+                f"{engine:<8} {sessions:>8} {result['engine_threads']:>14} "
+                f"{result['rss_delta_mib']:>14.1f} "
+                f"{result['tracks_per_second']:>10.0f} "
+                f"{result['p95_session_seconds']:>11.2f}s"
+            )
+    print("=" * 78)
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+import argparse
+import time
+
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.runtime.forward_msg_cache import (
+    create_reference_msg,
+    populate_hash_if_needed,
+)
+
+from ui import components
+
+# The card markup as it was generated before fragments were cached, kept
+# here as the baseline.
+LEGACY_SKELETON = """
+        <div class="track-card skeleton">
+            <div class="track-image"></div>
+            <div class="skeleton-line"></div>
+            <div class="skeleton-line short"></div>
+        </div>
+    """
+
+
+def legacy_track_card_html(song: dict) -> str:
+    title = song.get("title", "Unknown").replace('"', "&quot;").replace("'", "&#39;")
+    artist = (
+        song.get("artist", "Unknown Artist")
+        .replace('"', "&quot;")
+        .replace("'", "&#39;")
+    )
+    genres = song.get("genres", "").replace('"', "&quot;").replace("'", "&#39;")
+
+    image_url = song.get("image_url", "")
+    image_srcset = song.get("image_srcset")
+    spotify_url = song.get("spotify_url", "")
+
+    if image_url and image_srcset:
+        image_html = (
+            f'<img src="{image_url}" srcset="{image_srcset}" '
+            f'sizes="{components.CARD_IMAGE_SIZES}" alt="{title}" '
+            'class="track-image-img" width="256" height="256" loading="lazy" '
+            'decoding="async">'
+        )
+    else:
+        image_html = '<div class="track-image">🎵</div>'
+
+    card_inner = f"""
+        <div class="track-card">
+            {image_html}
+            <div class="track-title-wrapper">
+                <div class="track-title">{title}</div>
+            </div>
+            <div class="track-artist-wrapper">
+                <div class="track-artist">{artist}</div>
+            </div>
+            <div class="track-genres-wrapper">
+                <div class="track-genres">{genres}</div>
+            </div>
+        </div>
+    """
+    card_open = (
+        f'<a href="{spotify_url}" target="_blank" rel="noopener noreferrer" '
+        'class="track-card-link">'
+    )
+    return f"\n{card_open}{card_inner}</a>\n"
+
+
+def legacy_grid(cards: list) -> str:
+    html = '<div class="tracks-grid scrollable-list">'
+    for card in cards:
+        html += card
+    return html + "</div>"
+
+
+def sample_songs(count: int) -> list:
+    return [
+        {
+            "id": f"card-{i}",
+            "title": f'Canção número {i} (feat. O\'Brien & "Amigos")',
+            "artist": f"Artista {i % 37}, Convidado {i % 11}",
+            "genres": "mpb, bossa nova, samba, indie folk",
+            "image_url": f"https://i.scdn.co/image/ab67616d00001e02{i:024x}",
+            "image_srcset": (
+                f"app/static/thumbs/{i:032x}-128.webp 128w, "
+                f"app/static/thumbs/{i:032x}-256.webp 256w"
+            ),
+            "spotify_url": f"https://open.spotify.com/track/{i:022x}",
+        }
+        for i in range(count)
+    ]
+
+
+def timed(fn, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat
+
+
+def progressive_payload(songs: list, card, grid, skeleton: str, skip: bool) -> int:
+    # Bytes sent to the browser for a page whose cards are all cached.
+    cards = [skeleton] * len(songs)
+    emitted = [grid(cards)] if not skip else []
+    for rank, song in enumerate(songs):
+        cards[rank] = card(song)
+        if not skip:
+            emitted.append(grid(cards))
+    if skip:
+        emitted.append(grid(cards))
+    return sum(len(html.encode("utf-8")) for html in emitted)
+
+
+def resent_payload(html: str) -> int:
+    # Bytes on the wire when a rerun emits the grid the browser already
+    # holds: Streamlit sends a reference to its hash instead.
+    msg = ForwardMsg()
+    msg.delta.new_element.markdown.body = html
+    msg.delta.new_element.markdown.allow_html = True
+    populate_hash_if_needed(msg)
+    if not msg.metadata.cacheable:
+        return msg.ByteSize()
+    return create_reference_msg(msg).ByteSize()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Render time and payload of a grid of track cards."
+    )
+    parser.add_argument("--cards", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    songs = sample_songs(args.cards)
+
+    legacy_time = timed(
+        lambda: legacy_grid([legacy_track_card_html(s) for s in songs]), args.repeat
+    )
+
+    def cold():
+        components._card_cache.clear()
+        components.tracks_grid_html([components.track_card_html(s) for s in songs])
+
+    cold_time = timed(cold, args.repeat)
+    warm_time = timed(
+        lambda: components.tracks_grid_html(
+            [components.track_card_html(s) for s in songs]
+        ),
+        args.repeat,
+    )
+
+    legacy_html = legacy_grid([legacy_track_card_html(s) for s in songs])
+    new_html = components.tracks_grid_html(
+        [components.track_card_html(s) for s in songs]
+    )
+
+    legacy_rerun = progressive_payload(
+        songs, legacy_track_card_html, legacy_grid, LEGACY_SKELETON, skip=False
+    )
+    new_rerun = progressive_payload(
+        songs,
+        components.track_card_html,
+        components.tracks_grid_html,
+        components.track_card_skeleton_html(),
+        skip=True,
+    )
+
+    print("=" * 60)
+    print(f"{args.cards} cards")
+    print(f"Build grid, before:            {legacy_time * 1000:>8.3f} ms")
+    print(f"Build grid, after (cold):      {cold_time * 1000:>8.3f} ms")
+    print(f"Build grid, after (cached):    {warm_time * 1000:>8.3f} ms")
+    print(f"Grid payload, before:          {len(legacy_html) / 1024:>8.1f} KiB")
+    print(f"Grid payload, after:           {len(new_html) / 1024:>8.1f} KiB")
+    print(f"Cached page emitted, before:   {legacy_rerun / 1024:>8.1f} KiB")
+    print(f"Cached page emitted, after:    {new_rerun / 1024:>8.1f} KiB")
+    print(f"Unchanged grid resent, wire:   {resent_payload(new_html):>8} bytes")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+from typing import Dict, List
+
+# The updates go to a scratch log, followed closely so the benchmark sees
+# them applied while it queries.
+os.environ["CATALOG_UPDATES_PATH"] = os.path.join(
+    tempfile.mkdtemp(), "catalog_updates.jsonl"
+)
+os.environ["CATALOG_UPDATES_POLL_SECONDS"] = "0.05"
+os.environ["CATALOG_COMPACT_THRESHOLD"] = "1000000000"
+os.environ["RECOMMEND_COALESCE"] = "0"
+
+import numpy as np  # noqa: E402
+
+from benchmarks._common import percentile, random_query  # noqa: E402
+from core.catalog import AUDIO_FEATURES, append_tracks, remove_tracks  # noqa: E402
+from core.model_loader import load_models  # noqa: E402
+from core.recommender import DECADES, get_recommender, make_query_key  # noqa: E402
+
+
+def new_tracks(count: int, start: int, rng: np.random.Generator) -> List[Dict]:
+    # Real tracks' features back in slider units, nudged.
+    recommender = get_recommender()
+    rows = recommender.df.sample(count, random_state=int(rng.integers(1 << 31)))
+    raw = recommender.preprocessor.inverse_transform(rows[list(AUDIO_FEATURES)])
+    raw = np.clip(raw + rng.normal(0, 0.02, raw.shape), 0.0, 1.0)
+    return [
+        {
+            "id": f"new{start + number:08d}",
+            "name": f"Nova {start + number}",
+            "artists": "['Artista Nova']",
+            **{
+                name: float(values[column])
+                for column, name in enumerate(AUDIO_FEATURES)
+            },
+            "is_popular": int(rng.random() < 0.3),
+            "explicit": int(rng.random() < 0.3),
+            "year": int(rng.choice(DECADES)) + int(rng.integers(10)),
+        }
+        for number, values in enumerate(raw)
+    ]
+
+
+def query_while(running: threading.Event, rng: random.Random, minimum: int):
+    recommender = get_recommender()
+    latencies = []
+    while running.is_set() or len(latencies) < minimum:
+        started = time.perf_counter()
+        recommender.recommend_handle(**random_query(rng), top_n=10)
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+def report(label: str, latencies: List[float]) -> None:
+    recommender = get_recommender()
+    print(
+        f"{label:<22} {len(recommender._live.matrix):>7} "
+        f"{len(recommender._live.removed):>7} {len(latencies):>8} "
+        f"{percentile(latencies, 0.5) * 1000:>7.2f} ms "
+        f"{percentile(latencies, 0.99) * 1000:>7.2f} ms"
+    )
+
+
+def exact(query: Dict, top_n: int) -> List[int]:
+    # Every position, main and delta, scanned and filtered directly.
+    recommender = get_recommender()
+    live = recommender._live
+    matrix = np.concatenate([recommender.model._fit_X, live.matrix])
+    key = make_query_key(**query)
+    difference = matrix - recommender._query_vectors([key])[0]
+    squared = np.einsum("ij,ij->i", difference, difference)
+    rows = np.flatnonzero(recommender._keep(np.arange(len(matrix)), key, None))
+    return list(rows[np.lexsort((rows, squared[rows]))][:top_n])
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Query latency while tracks are appended and removed, and "
+        "while the delta is compacted into the main index."
+    )
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--batches", type=int, default=20)
+    parser.add_argument("--batch-size", type=int, default=250)
+    parser.add_argument("--interval-ms", type=float, default=100)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    load_models()
+    recommender = get_recommender()
+    rng = np.random.default_rng(args.seed)
+    query_rng = random.Random(args.seed)
+    running = threading.Event()
+
+    print("=" * 66)
+    print(
+        f"{'phase':<22} {'delta':>7} {'removed':>7} {'queries':>8} {'p50':>10} "
+        f"{'p99':>10}"
+    )
+    report("idle", query_while(running, query_rng, args.queries))
+
+    def write_updates():
+        for batch in range(args.batches):
+            append_tracks(new_tracks(args.batch_size, batch * args.batch_size, rng))
+            # A few of the catalog's own tracks go away with every batch.
+            removed = recommender.df["id"].sample(5, random_state=batch)
+            remove_tracks(removed)
+            time.sleep(args.interval_ms / 1000)
+        while recommender._updates.offset < os.path.getsize(
+            os.environ["CATALOG_UPDATES_PATH"]
+        ):
+            time.sleep(0.01)
+        time.sleep(0.1)
+        running.clear()
+
+    running.set()
+    writer = threading.Thread(target=write_updates)
+    writer.start()
+    report("appending", query_while(running, query_rng, args.queries))
+    writer.join()
+    report("after appends", query_while(running, query_rng, args.queries))
+
+    checks = [random_query(query_rng) for _ in range(50)]
+    for query in checks:
+        handle = recommender.recommend_handle(**query, top_n=20)
+        if list(handle.indices[: handle.shown]) != exact(query, handle.shown):
+            raise SystemExit("❌ Merged results differ from a scan of every track")
+
+    timings = {}
+
+    def compact():
+        started = time.perf_counter()
+        recommender.compact()
+        timings["compact"] = time.perf_counter() - started
+        running.clear()
+
+    running.set()
+    compactor = threading.Thread(target=compact)
+    compactor.start()
+    report("compacting", query_while(running, query_rng, 1))
+    compactor.join()
+    report("after compaction", query_while(running, query_rng, args.queries))
+
+    for query in checks:
+        handle = recommender.recommend_handle(**query, top_n=20)
+        if list(handle.indices[: handle.shown]) != exact(query, handle.shown):
+            raise SystemExit("❌ Compacted results differ from a scan of every track")
+    print("=" * 66)
+    print(
+        f"✅ {args.batches * args.batch_size} tracks appended, results exact before "
+        f"and after a {timings['compact']:.2f} s compaction"
+    )
+
+
+if __name__ == "__main__":
+    main()
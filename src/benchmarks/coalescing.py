@@ -0,0 +1,61 @@
+import argparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks._common import fresh_metadata_store, start_standin
+from services import rate_limiter, single_flight, spotify_api
+from tools.spotify_standin import StandInServer
+
+
+def run(label: str, server: StandInServer, sessions: int, tracks: int) -> None:
+    fresh_metadata_store(label)
+    ids = [{"id": f"{label}-{i}"} for i in range(tracks)]
+    barrier = threading.Barrier(sessions)
+    before = server.stats["served"]
+
+    def session(_):
+        barrier.wait()
+        return spotify_api.fetch_spotify_data_parallel(ids)
+
+    with ThreadPoolExecutor(max_workers=sessions) as pool:
+        list(pool.map(session, range(sessions)))
+
+    # Hedged duplicates may still be in flight; count them against this run.
+    settled = server.stats["requests"]
+    while True:
+        time.sleep(1.0)
+        if server.stats["requests"] == settled and server.in_flight == 0:
+            break
+        settled = server.stats["requests"]
+
+    calls = server.stats["served"] - before
+    print(
+        f"{label:<16} upstream calls for {sessions} identical recommendations: "
+        f"{calls} ({calls / sessions:.2f} per recommendation)"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Upstream calls for concurrent identical recommendations."
+    )
+    parser.add_argument("--sessions", type=int, default=100)
+    parser.add_argument("--tracks", type=int, default=20)
+    parser.add_argument("--latency", default="fixed:0.1")
+    args = parser.parse_args()
+
+    server = start_standin(args.latency)
+    rate_limiter._token_bucket = rate_limiter.TokenBucket(10000, 10000)
+
+    print("=" * 60)
+    single_flight.COALESCING_ENABLED = False
+    run("no-coalescing", server, args.sessions, args.tracks)
+    single_flight.COALESCING_ENABLED = True
+    run("coalescing", server, args.sessions, args.tracks)
+    print("=" * 60)
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
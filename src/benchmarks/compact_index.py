@@ -0,0 +1,101 @@
+import argparse
+import random
+import time
+from typing import List, Optional
+
+import numpy as np
+
+from benchmarks._common import percentile, random_query
+from core.compact_index import LAYOUTS, CompactIndex
+from core.model_loader import get_model, load_models
+from core.recommender import SIMILAR_QUERY, get_recommender, make_query_key
+
+
+def random_keys(count: int, seed: int, track_ids: List[str]) -> List:
+    rng = random.Random(seed)
+    keys = []
+    for number in range(count):
+        # One in four is a "more like this track" search.
+        if number % 4 == 3:
+            keys.append((SIMILAR_QUERY, rng.choice(track_ids)))
+            continue
+        keys.append(make_query_key(**random_query(rng)))
+    return keys
+
+
+def run(
+    label: str,
+    index: Optional[CompactIndex],
+    vectors: np.ndarray,
+    top_k: int,
+    expected,
+) -> None:
+    model = get_model()
+    latencies, recalls, errors = [], [], []
+    for row, vector in enumerate(vectors):
+        started = time.perf_counter()
+        if index is None:
+            distances, indices = model.kneighbors(vector[None], n_neighbors=top_k)
+            distances, indices = distances[0], indices[0]
+        else:
+            distances, indices = index.search_one(vector, top_k)
+        latencies.append(time.perf_counter() - started)
+
+        exact_distances, exact_indices = expected[0][row], expected[1][row]
+        recalls.append(len(set(indices) & set(exact_indices)) / top_k)
+        errors.append(np.abs(distances - exact_distances).max())
+
+    size = index.nbytes if index is not None else model._fit_X.nbytes
+    print(
+        f"{label:<9} {size / 2**20:>8.2f} MiB {np.mean(recalls):>8.4f} "
+        f"{max(errors):>10.1e} {percentile(latencies, 0.5) * 1000:>7.2f} ms "
+        f"{percentile(latencies, 0.99) * 1000:>7.2f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Memory, accuracy and latency of the compact index layouts "
+        "against the sklearn search."
+    )
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", default="10,50,500")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    load_models()
+    recommender = get_recommender()
+    model = get_model()
+    matrix = model._fit_X
+    track_ids = list(recommender.df["id"].sample(1000, random_state=args.seed))
+    keys = random_keys(args.queries, args.seed, track_ids)
+    vectors = recommender._query_vectors(keys)
+
+    indexes = {}
+    for layout in LAYOUTS:
+        started = time.perf_counter()
+        indexes[layout] = CompactIndex(matrix, layout)
+        elapsed = time.perf_counter() - started
+        print(
+            f"🏗️ {layout}: built in {elapsed * 1000:.0f} ms, "
+            f"{indexes[layout].nbytes / len(matrix):.1f} bytes/row "
+            f"(sklearn: {matrix.nbytes / len(matrix):.0f} bytes/row)"
+        )
+
+    print("=" * 64)
+    for top_k in [int(value) for value in args.top_k.split(",")]:
+        expected = model.kneighbors(vectors, n_neighbors=top_k)
+        print(f"top {top_k} over {len(keys)} queries")
+        print(
+            f"{'index':<9} {'memory':>12} {'recall':>8} {'max error':>10} "
+            f"{'p50':>10} {'p99':>10}"
+        )
+        run("sklearn", None, vectors, top_k, expected)
+        for layout, index in indexes.items():
+            run(layout, index, vectors, top_k, expected)
+        print("-" * 64)
+    print("=" * 64)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+import argparse
+import random
+import time
+
+from benchmarks._common import fresh_metadata_store, percentile, start_standin
+from core.recommender import get_recommender, make_query_key
+from services import spotify_api
+from ui import components
+
+
+def slider_walk(moves: int, seed: int, window: int) -> list:
+    # Dragging back and forth around a spot, the way people search for a
+    # sound they like: small steps inside a window, so earlier positions come
+    # back.
+    rng = random.Random(seed)
+    position = [50, 50, 50, 50]
+    walk = []
+    for _ in range(moves):
+        slider = rng.randrange(4)
+        step = rng.choice((-2, -1, 1, 2))
+        position[slider] = min(50 + window, max(50 - window, position[slider] + step))
+        walk.append(
+            dict(
+                danceability=position[0],
+                energy=position[1],
+                acousticness=position[2],
+                valence=position[3],
+                is_popular=False,
+                is_explicit=False,
+                decade="",
+            )
+        )
+    return walk
+
+
+def run(label: str, server, walk: list, page_size: int, live: bool) -> None:
+    fresh_metadata_store(label)
+    components._card_cache.clear()
+    recommender = get_recommender()
+    recommender._neighbor_cache.clear()
+    served = server.stats["served"]
+
+    rendered = frozenset()
+    totals, ranking, enriched, revisits = [], [], [], []
+    for query in walk:
+        if not live:
+            recommender._neighbor_cache.clear()
+        revisit = make_query_key(**query) in recommender._neighbor_cache
+        started = time.perf_counter()
+        handle = recommender.recommend_handle(**query, top_n=page_size)
+        ranked = time.perf_counter()
+
+        tracks = recommender.tracks(handle)
+        # The same steps as render_tracks_progressively: cards on screen
+        # stand in, every track is streamed, and only ids missing from the
+        # store are looked up upstream.
+        reuse = rendered if live else ()
+        ids = [t["id"] for t in tracks]
+        cards = [
+            components.cached_track_card_html(track_id) if track_id in reuse else None
+            for track_id in ids
+        ]
+        _, _, missing = spotify_api.partition_track_ids(ids)
+        for rank, song in spotify_api.stream_spotify_data(tracks):
+            cards[rank] = components.track_card_html(song)
+        components.tracks_grid_html(cards)
+        rendered = frozenset(ids)
+
+        totals.append(time.perf_counter() - started)
+        ranking.append(ranked - started)
+        enriched.append(len(missing))
+        if revisit:
+            revisits.append(ranked - started)
+
+    n = len(walk)
+    revisit_rank = sum(revisits) / len(revisits) * 1000 if revisits else float("nan")
+    print(
+        f"{label:<6} {sum(totals) / n * 1000:>7.1f} ms {percentile(totals, 0.5) * 1000:>7.1f} ms "
+        f"{percentile(totals, 0.95) * 1000:>7.1f} ms {sum(ranking) / n * 1000:>7.2f} ms "
+        f"{revisit_rank:>7.2f} ms {sum(enriched) / n:>9.1f} "
+        f"{(server.stats['served'] - served) / n:>8.2f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="End-to-end cost of one slider move, form vs live mode."
+    )
+    parser.add_argument("--moves", type=int, default=200)
+    parser.add_argument("--page-size", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=13)
+    parser.add_argument("--window", type=int, default=3)
+    parser.add_argument("--latency", default="fixed:0.08")
+    args = parser.parse_args()
+
+    server = start_standin(args.latency)
+
+    walk = slider_walk(args.moves, args.seed, args.window)
+    distinct = len({tuple(query.values()) for query in walk})
+    get_recommender()
+
+    # "every" recomputes the neighbors on each move, as the form does on each
+    # submit; "live" reuses cached neighbors and keeps unchanged cards up.
+    print("=" * 78)
+    print(f"{args.moves} moves, {distinct} distinct positions, debounce not included")
+    print(
+        f"{'mode':<6} {'mean':>10} {'p50':>10} {'p95':>10} {'rank':>10} "
+        f"{'revisit':>10} {'looked up':>9} {'API/move':>8}"
+    )
+    run("every", server, walk, args.page_size, live=False)
+    run("live", server, walk, args.page_size, live=True)
+    print("=" * 78)
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+import argparse
+import os
+
+from benchmarks.card_render import sample_songs
+from ui import components, styles
+
+# The overflow detector as it was before the ResizeObserver version, kept
+# here as the baseline.
+LEGACY_OVERFLOW_SCRIPT = """
+        <script>
+        function detectTextOverflow() {
+            const doc = window.parent.document || window.document;
+
+            const titles = doc.querySelectorAll('.track-title');
+            const artists = doc.querySelectorAll('.track-artist');
+            const genres = doc.querySelectorAll('.track-genres');
+
+            function checkOverflow(element) {
+                const wrapper = element.parentElement;
+                if (!wrapper) return;
+
+                const hasOverflow = element.scrollWidth > wrapper.clientWidth;
+
+                if (hasOverflow) {
+                    element.classList.add('has-overflow');
+                } else {
+                    element.classList.remove('has-overflow');
+                }
+            }
+
+            titles.forEach(title => checkOverflow(title));
+            artists.forEach(artist => checkOverflow(artist));
+            genres.forEach(genre => checkOverflow(genre));
+        }
+
+        detectTextOverflow();
+
+        setTimeout(detectTextOverflow, 100);
+        setTimeout(detectTextOverflow, 500);
+        setTimeout(detectTextOverflow, 1000);
+
+        const observer = new MutationObserver(detectTextOverflow);
+        const targetDoc = window.parent.document || window.document;
+        observer.observe(targetDoc.body, {
+            childList: true,
+            subtree: true,
+            characterData: true
+        });
+
+        setInterval(detectTextOverflow, 500);
+        </script>
+    """
+LEGACY_POLL_MS = 500
+LEGACY_STARTUP_TIMEOUTS = 3
+
+# Wraps every timer and observer callback so the page can report how much
+# main-thread time the detector takes while nobody touches it.
+PROBE_SCRIPT = """
+    <script>
+    window.__probe = {calls: 0, ms: 0, counting: false};
+    function timed(fn) {
+        return function () {
+            const started = performance.now();
+            try { return fn.apply(this, arguments); }
+            finally {
+                if (window.__probe.counting) {
+                    window.__probe.calls += 1;
+                    window.__probe.ms += performance.now() - started;
+                }
+            }
+        };
+    }
+    const setIntervalNative = window.setInterval;
+    const setTimeoutNative = window.setTimeout;
+    window.setInterval = (fn, ms) => setIntervalNative(timed(fn), ms);
+    window.setTimeout = (fn, ms) => setTimeoutNative(timed(fn), ms);
+    ['MutationObserver', 'ResizeObserver'].forEach(name => {
+        const Native = window[name];
+        window[name] = class extends Native {
+            constructor(fn) { super(timed(fn)); }
+        };
+    });
+    setTimeoutNative(() => { window.__probe.counting = true; }, %(settle)d);
+    setTimeoutNative(() => {
+        window.__probe.counting = false;
+        const probe = window.__probe;
+        document.title = probe.calls + ' calls, ' + probe.ms.toFixed(1) + ' ms';
+        console.log('%(label)s idle ' + %(window)d / 1000 + 's: ' + document.title);
+    }, %(settle)d + %(window)d);
+    </script>
+"""
+
+
+def idle_page(label: str, songs: list, detector: str, settle: int, window: int):
+    grid = components.tracks_grid_html(
+        [components.track_card_html(song) for song in songs]
+    )
+    probe = PROBE_SCRIPT % {"label": label, "settle": settle, "window": window}
+    return (
+        f"<!DOCTYPE html><html><head><meta charset='utf-8'>{probe}"
+        f"{styles.load_styles()}</head><body><div data-testid='stMain'>{grid}</div>"
+        f"{detector}</body></html>"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Idle client work of the text overflow detector."
+    )
+    parser.add_argument("--cards", type=int, default=100)
+    parser.add_argument("--reruns", type=int, default=20)
+    parser.add_argument("--idle", type=int, default=60, help="Idle seconds.")
+    parser.add_argument(
+        "--html",
+        help="Write before/after pages here; open them in a browser and read "
+        "the title or console after the idle window.",
+    )
+    args = parser.parse_args()
+
+    songs = sample_songs(args.cards)
+    fields_per_card = 3
+    legacy_runs = args.idle * 1000 // LEGACY_POLL_MS + LEGACY_STARTUP_TIMEOUTS
+    legacy_reads = legacy_runs * args.cards * fields_per_card * 2
+
+    legacy_rerun = len(styles.load_styles()) + len(LEGACY_OVERFLOW_SCRIPT)
+    loader = len(styles.get_assets_loader_html())
+    first_run = len(styles.inline_styles_html(first_run=True))
+    assets = sum(
+        os.path.getsize(os.path.join(styles.STATIC_PATH, os.path.basename(path)))
+        for path in styles.get_static_assets().values()
+        if path is not None
+    )
+
+    print("=" * 64)
+    print(f"{args.cards} cards, {args.idle}s idle")
+    print(f"Detector runs while idle, before:   {legacy_runs:>10}")
+    print(f"Detector runs while idle, after:    {0:>10}")
+    print(f"Layout reads while idle, before:    {legacy_reads:>10}")
+    print(f"Layout reads while idle, after:     {0:>10}")
+    print("-" * 64)
+    print(f"Styles + script per rerun, before:  {legacy_rerun / 1024:>8.1f} KiB")
+    print(f"Loader per rerun, after:            {loader / 1024:>8.1f} KiB")
+    print(f"Static assets, once per session:    {assets / 1024:>8.1f} KiB")
+    print(f"Inline styles, first run only:      {first_run / 1024:>8.1f} KiB")
+    print(
+        f"Over {args.reruns} reruns:                   "
+        f"{legacy_rerun * args.reruns / 1024:>8.1f} KiB -> "
+        f"{(loader * args.reruns + assets + first_run) / 1024:.1f} KiB"
+    )
+    print("=" * 64)
+
+    if args.html:
+        os.makedirs(args.html, exist_ok=True)
+        settle, window = 2000, args.idle * 1000
+        after_script = f"<script>{styles.get_text_overflow_script()}</script>"
+        for label, detector in (
+            ("before", LEGACY_OVERFLOW_SCRIPT),
+            ("after", after_script),
+        ):
+            path = os.path.join(args.html, f"overflow-{label}.html")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(idle_page(label, songs, detector, settle, window))
+            print(f"📄 {path}")
+
+
+if __name__ == "__main__":
+    main()
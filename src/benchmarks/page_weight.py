@@ -0,0 +1,52 @@
+import argparse
+import os
+
+# The thumbnails are what this measures.
+os.environ.setdefault("THUMBNAILS_ENABLED", "1")
+
+import requests  # noqa: E402
+
+from benchmarks._common import WORKDIR, start_standin  # noqa: E402
+from services import image_cache, spotify_api  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare album-art bytes per page: CDN images vs local thumbnails."
+    )
+    parser.add_argument("--tracks", type=int, default=100)
+    args = parser.parse_args()
+
+    server = start_standin()
+    image_cache.THUMBNAIL_DIR = os.path.join(WORKDIR, "thumbs")
+
+    tracks = [{"id": f"page-weight-{i}"} for i in range(args.tracks)]
+    cards = spotify_api.fetch_spotify_data_parallel(tracks)
+    urls = [card["image_url"] for card in cards if card["image_url"]]
+
+    before = sum(len(requests.get(url, timeout=10).content) for url in urls)
+
+    after = {width: 0 for width in image_cache.THUMBNAIL_WIDTHS}
+    for url in urls:
+        content_key = image_cache.cache_album_image(url)
+        for width in after:
+            path = os.path.join(
+                image_cache.THUMBNAIL_DIR,
+                image_cache._thumbnail_filename(content_key, width),
+            )
+            after[width] += os.path.getsize(path)
+
+    print("=" * 60)
+    print(f"Cards per page:                {len(urls)}")
+    print(f"CDN 'medium' images (before):  {before / 1024:.1f} KiB")
+    for width, size in after.items():
+        print(
+            f"Thumbnails {width}w (after):       {size / 1024:.1f} KiB "
+            f"({size / before:.0%} of before)"
+        )
+    print("=" * 60)
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
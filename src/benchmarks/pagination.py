@@ -0,0 +1,88 @@
+import argparse
+import random
+import time
+
+from benchmarks._common import fresh_metadata_store, random_query, start_standin
+from core.recommender import get_recommender
+from services import spotify_api
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Time to first page and cost per 'load more' page."
+    )
+    parser.add_argument("--queries", type=int, default=10)
+    parser.add_argument("--page-size", type=int, default=10)
+    parser.add_argument("--pages", type=int, default=4)
+    parser.add_argument("--latency", default="fixed:0.08")
+    args = parser.parse_args()
+
+    server = start_standin(args.latency)
+
+    recommender = get_recommender()
+    rng = random.Random(11)
+    queries = [
+        random_query(rng, is_popular=False, is_explicit=False)
+        for _ in range(args.queries)
+    ]
+
+    # Before: top_n=100 capped to 20 rows, everything enriched at once.
+    fresh_metadata_store("before")
+    first_page = []
+    for query in queries:
+        started = time.perf_counter()
+        tracks = recommender.recommend(**query, top_n=100).to_dict("records")
+        spotify_api.fetch_spotify_data_parallel(tracks)
+        first_page.append(time.perf_counter() - started)
+    before = sum(first_page) / len(first_page)
+
+    fresh_metadata_store("after")
+    first_page = []
+    pages = [[] for _ in range(args.pages)]
+    for query in queries:
+        started = time.perf_counter()
+        handle = recommender.recommend_handle(**query, top_n=args.page_size)
+        spotify_api.fetch_spotify_data_parallel(recommender.tracks(handle))
+        first_page.append(time.perf_counter() - started)
+
+        for page in pages:
+            served = server.stats["served"]
+            start = handle.shown
+            started = time.perf_counter()
+            handle = recommender.next_page(handle, args.page_size)
+            ranked = time.perf_counter() - started
+            # The UI re-renders every shown card; earlier pages come from the
+            # metadata store, so only the new page reaches the API.
+            spotify_api.fetch_spotify_data_parallel(recommender.tracks(handle))
+            page.append(
+                (
+                    ranked,
+                    time.perf_counter() - started,
+                    server.stats["served"] - served,
+                    handle.shown - start,
+                )
+            )
+
+    print("=" * 66)
+    print(f"Before: first page of 20 cards          {before * 1000:>8.0f} ms")
+    after = sum(first_page) / len(first_page)
+    print(
+        f"After:  first page of {args.page_size} cards          {after * 1000:>8.0f} ms"
+    )
+    print("-" * 66)
+    print(
+        f"{'page':>4} {'next_page':>12} {'page ready':>12} {'API calls':>10} {'new cards':>10}"
+    )
+    for number, page in enumerate(pages, 2):
+        n = len(page)
+        print(
+            f"{number:>4} {sum(p[0] for p in page) / n * 1000:>9.2f} ms "
+            f"{sum(p[1] for p in page) / n * 1000:>9.0f} ms "
+            f"{sum(p[2] for p in page) / n:>10.1f} {sum(p[3] for p in page) / n:>10.1f}"
+        )
+    print("=" * 66)
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
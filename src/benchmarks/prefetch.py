@@ -0,0 +1,104 @@
+import argparse
+import random
+import time
+
+from benchmarks._common import fresh_metadata_store, random_query, start_standin
+from core.recommender import get_recommender
+from services import prefetch, rate_limiter, spotify_api
+from services.prefetch import get_prefetcher
+
+
+def page_query(rng: random.Random) -> dict:
+    return random_query(rng, is_popular=False, is_explicit=False)
+
+
+def run(label: str, server, queries: list, page_size: int, think: float) -> None:
+    fresh_metadata_store(label)
+    recommender = get_recommender()
+    prefetcher = get_prefetcher()
+    throttled = server.stats["throttled"]
+    first, second = [], []
+
+    for query in queries:
+        started = time.perf_counter()
+        handle = recommender.recommend_handle(**query, top_n=page_size)
+        spotify_api.fetch_spotify_data_parallel(recommender.tracks(handle))
+        first.append(time.perf_counter() - started)
+
+        # As in the app: the next page is ranked on the prefetch worker, and
+        # by "load more" itself when the worker has not got to it.
+        upcoming = {}
+
+        def next_track_ids(handle=handle, upcoming=upcoming):
+            upcoming["handle"] = recommender.next_page(handle, page_size)
+            return [
+                t["id"]
+                for t in recommender.tracks(upcoming["handle"], start=handle.shown)
+            ]
+
+        prefetcher.schedule(next_track_ids)
+        time.sleep(think)
+
+        started = time.perf_counter()
+        if "handle" not in upcoming:
+            upcoming["handle"] = recommender.next_page(handle, page_size)
+        spotify_api.fetch_spotify_data_parallel(recommender.tracks(upcoming["handle"]))
+        second.append(time.perf_counter() - started)
+
+    print(
+        f"{label:<12} {sum(first) / len(first) * 1000:>10.0f} ms "
+        f"{sum(second) / len(second) * 1000:>10.0f} ms "
+        f"{server.stats['throttled'] - throttled:>8}"
+    )
+
+
+def cancelled_on_new_query(server, rng: random.Random, page_size: int) -> None:
+    recommender = get_recommender()
+    handle = recommender.recommend_handle(**page_query(rng), top_n=page_size)
+    upcoming = recommender.next_page(handle, page_size)
+    # Drain the bucket as a busy foreground would, then supersede the query.
+    bucket = spotify_api.get_token_bucket()
+    while bucket.available() >= 1:
+        bucket.try_acquire()
+
+    served = server.stats["served"]
+    task = get_prefetcher().schedule(
+        [t["id"] for t in recommender.tracks(upcoming, start=handle.shown)]
+    )
+    task.cancel()
+    time.sleep(2.0)
+    print(f"Cancelled prefetch: {server.stats['served'] - served} upstream calls")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="'Load more' latency with and without next-page prefetch."
+    )
+    parser.add_argument("--queries", type=int, default=8)
+    parser.add_argument("--page-size", type=int, default=10)
+    parser.add_argument("--think", type=float, default=2.0)
+    parser.add_argument("--latency", default="fixed:0.08")
+    args = parser.parse_args()
+
+    # The stand-in enforces the same 10 req/s the client budgets for, so any
+    # prefetch overspending would show up as 429s.
+    server = start_standin(args.latency, rate_limit=10)
+    rate_limiter._token_bucket = rate_limiter.TokenBucket(10, 10)
+
+    rng = random.Random(5)
+    queries = [page_query(rng) for _ in range(args.queries)]
+
+    print("=" * 50)
+    print(f"{'':<12} {'first page':>13} {'load more':>13} {'429s':>8}")
+    prefetch.PREFETCH_ENABLED = False
+    run("no prefetch", server, queries, args.page_size, args.think)
+    prefetch.PREFETCH_ENABLED = True
+    run("prefetch", server, queries, args.page_size, args.think)
+    print("-" * 50)
+    cancelled_on_new_query(server, rng, args.page_size)
+    print("=" * 50)
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
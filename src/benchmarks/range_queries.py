@@ -0,0 +1,120 @@
+import argparse
+import time
+from typing import Dict
+
+from benchmarks._common import percentile
+from core.model_loader import load_models
+from core.recommender import AUDIO_FEATURES, get_recommender, make_query_key
+
+QUERY = dict(
+    danceability=70.0,
+    energy=80.0,
+    acousticness=20.0,
+    valence=50.0,
+    is_popular=False,
+    is_explicit=False,
+    decade="",
+)
+CASES = [
+    (
+        "danceability 60-80, energy >= 70",
+        None,
+        {"danceability": (60, 80), "energy": (70, None)},
+    ),
+    ("valence 49-51", None, {"valence": (49, 51)}),
+    ("radius 1.2, 2010s", 1.2, {}),
+    ("radius 1.5", 1.5, {}),
+]
+
+
+def pandas_search(query: Dict, radius, ranges, page_size: int):
+    # What recommend() would need today: every neighbor, then pandas filters.
+    recommender = get_recommender()
+    key = make_query_key(**query)
+    vector = recommender._query_vectors([key])
+    distances, indices = recommender.model.kneighbors(
+        vector, n_neighbors=len(recommender.df)
+    )
+    found = recommender.df.iloc[indices[0]].copy()
+    found["distancia"] = distances[0]
+    keep = recommender._keep(indices[0], key, None)
+    for column, (low, high) in recommender._scaled_ranges(ranges).items():
+        values = found[recommender.features[column]]
+        keep &= ((values >= low) & (values <= high)).to_numpy()
+    if radius is not None:
+        keep &= (found["distancia"] <= radius).to_numpy()
+    return found[keep].head(page_size)
+
+
+def indexed_search(query: Dict, radius, ranges, page_size: int):
+    chunks = get_recommender().range_search(
+        **query, radius=radius, ranges=ranges, chunk_size=page_size
+    )
+    return next(chunks, None), chunks
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Range and radius queries through the sorted column indexes "
+        "against fetching every neighbor and filtering in pandas."
+    )
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--page-size", type=int, default=20)
+    args = parser.parse_args()
+
+    load_models()
+    recommender = get_recommender()
+    recommender._sorted_columns()
+    total = recommender.get_dataset_size()
+
+    print("=" * 78)
+    print(
+        f"{'query':<34} {'matches':>8} {'scanned':>8} {'pandas':>10} "
+        f"{'first page':>10} {'all':>10}"
+    )
+    for label, radius, ranges in CASES:
+        query = dict(QUERY, decade="2010" if "2010s" in label else "")
+
+        # Rows left after the range (or the radius' box) prunes, before any
+        # distance is computed.
+        key = make_query_key(**query)
+        vector = recommender._query_vectors([key])[0]
+        bounds = recommender._scaled_ranges(ranges)
+        if radius is not None:
+            for name in AUDIO_FEATURES:
+                column = recommender.features.index(name)
+                bounds[column] = (vector[column] - radius, vector[column] + radius)
+        scanned = len(recommender._range_candidates(bounds))
+
+        baseline, first, full = [], [], []
+        matches = 0
+        for _ in range(args.runs):
+            started = time.perf_counter()
+            expected = pandas_search(query, radius, ranges, args.page_size)
+            baseline.append(time.perf_counter() - started)
+
+            started = time.perf_counter()
+            page, chunks = indexed_search(query, radius, ranges, args.page_size)
+            first.append(time.perf_counter() - started)
+            matches = (
+                0
+                if page is None
+                else len(page[0]) + sum(len(rows) for rows, _ in chunks)
+            )
+            full.append(time.perf_counter() - started)
+
+            found = [] if page is None else list(page[0])
+            if found != list(recommender.df.index.get_indexer(expected.index)):
+                raise SystemExit(f"❌ {label}: first page differs from pandas")
+
+        print(
+            f"{label:<34} {matches:>8} {scanned / total:>7.1%} "
+            f"{percentile(baseline, 0.5) * 1000:>7.1f} ms "
+            f"{percentile(first, 0.5) * 1000:>7.2f} ms "
+            f"{percentile(full, 0.5) * 1000:>7.2f} ms"
+        )
+    print("=" * 78)
+
+
+if __name__ == "__main__":
+    main()
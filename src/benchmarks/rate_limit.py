@@ -0,0 +1,75 @@
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks._common import start_standin
+from services import rate_limiter, spotify_api
+from tools.spotify_standin import LatencyModel
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Load the rate-limited Spotify client against a local stand-in."
+    )
+    parser.add_argument("--server-limit", type=int, default=40, help="req/s")
+    # By default the client's budget is set to the stand-in's documented
+    # limit, rate + burst, as SPOTIFY_RATE_LIMIT and SPOTIFY_RATE_BURST should
+    # be. A budget above it shows the adaptive backoff instead.
+    parser.add_argument("--client-rate", type=float, help="req/s")
+    parser.add_argument("--client-burst", type=float)
+    parser.add_argument("--sessions", type=int, default=10)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--tracks", type=int, default=20)
+    parser.add_argument("--latency", default="fixed:0.05")
+    parser.add_argument("--capacity", type=int, default=16)
+    args = parser.parse_args()
+
+    server = start_standin(
+        LatencyModel(args.latency, capacity=args.capacity),
+        rate_limit=args.server_limit,
+    )
+    if args.client_rate is None:
+        args.client_rate = args.server_limit * 0.75
+    if args.client_burst is None:
+        args.client_burst = max(1.0, args.server_limit - args.client_rate)
+    rate_limiter._token_bucket = rate_limiter.TokenBucket(
+        args.client_rate, args.client_burst
+    )
+
+    def session(session_id: int) -> int:
+        unknown = 0
+        for round_id in range(args.rounds):
+            tracks = [
+                {"id": f"s{session_id}r{round_id}t{i}"} for i in range(args.tracks)
+            ]
+            results = spotify_api.fetch_spotify_data_parallel(tracks)
+            unknown += sum(1 for r in results if r["title"] == "Unknown")
+        return unknown
+
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=args.sessions) as pool:
+        unknown = sum(pool.map(session, range(args.sessions)))
+    elapsed = time.monotonic() - started
+
+    stats = server.stats
+    total = args.sessions * args.rounds * args.tracks
+    limiter = rate_limiter.get_concurrency_limiter()
+    print("=" * 60)
+    print(f"Tracks requested:      {total}")
+    print(f"Served by stand-in:    {stats['served']}")
+    print(f"429 responses:         {stats['throttled']}")
+    print(f"Unknown cards:         {unknown}")
+    print(f"Elapsed:               {elapsed:.2f}s")
+    print(f"Throughput:            {stats['served'] / elapsed:.1f} req/s")
+    print(f"Stand-in limit:        {args.server_limit} req/s")
+    print(
+        f"Client budget:         {args.client_rate:g} req/s + "
+        f"{args.client_burst:g} burst"
+    )
+    print(f"Final concurrency:     {limiter.limit}")
+    print("=" * 60)
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+import argparse
+import random
+import threading
+import time
+from typing import List, Optional
+
+from benchmarks._common import percentile, random_query
+from core.coalescer import SearchCoalescer
+from core.model_loader import load_models
+from core.recommender import get_recommender
+
+
+def run(
+    clients: int,
+    window_ms: Optional[float],
+    max_batch: int,
+    duration: float,
+    top_n: int,
+    seed: int,
+) -> None:
+    recommender = get_recommender()
+    recommender._neighbor_cache.clear()
+    coalescer = None
+    if window_ms is not None:
+        coalescer = SearchCoalescer(
+            recommender.search_neighbors, window_ms / 1000.0, max_batch
+        )
+    recommender._coalescer = coalescer
+
+    latencies: List[List[float]] = [[] for _ in range(clients)]
+    barrier = threading.Barrier(clients + 1)
+    deadline = 0.0
+
+    def client(number: int) -> None:
+        rng = random.Random(seed * 1000 + number)
+        barrier.wait()
+        while time.monotonic() < deadline:
+            # Unique positions, so every query misses the neighbor cache.
+            query = random_query(rng)
+            started = time.perf_counter()
+            recommender.recommend_handle(**query, top_n=top_n)
+            latencies[number].append(time.perf_counter() - started)
+
+    threads = [
+        threading.Thread(target=client, args=(number,)) for number in range(clients)
+    ]
+    for thread in threads:
+        thread.start()
+    deadline = time.monotonic() + duration
+    started = time.monotonic()
+    barrier.wait()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+
+    values = [value for values in latencies for value in values]
+    label = "off" if window_ms is None else f"{window_ms:g} ms"
+    batch = "-"
+    if coalescer is not None and coalescer.stats["batches"]:
+        stats = coalescer.stats
+        batch = f"{stats['queries'] / stats['batches']:.1f}/{stats['largest']}"
+    print(
+        f"{clients:>7} {label:>8} {len(values) / elapsed:>9.1f} "
+        f"{percentile(values, 0.5) * 1000:>7.1f} ms "
+        f"{percentile(values, 0.99) * 1000:>7.1f} ms {batch:>9}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Queries/sec and latency of coalesced kneighbors searches "
+        "across window sizes and concurrent clients."
+    )
+    parser.add_argument("--clients", default="1,4,16,64")
+    parser.add_argument("--windows", default="off,0,1,2,5,10", help="Window in ms")
+    parser.add_argument("--max-batch", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--top-n", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    load_models()
+    get_recommender()
+
+    print("=" * 60)
+    print(
+        f"{'clients':>7} {'window':>8} {'queries/s':>9} {'p50':>10} {'p99':>10} "
+        f"{'batch avg/max':>9}"
+    )
+    for clients in [int(value) for value in args.clients.split(",")]:
+        for window in args.windows.split(","):
+            window_ms = None if window == "off" else float(window)
+            run(
+                clients, window_ms, args.max_batch, args.duration, args.top_n, args.seed
+            )
+        print("-" * 60)
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+import argparse
+import random
+import time
+
+import numpy as np
+from sklearn.neighbors import NearestNeighbors
+
+from benchmarks._common import percentile, random_query
+from core.compact_index import indicator_columns
+from core.model_loader import get_model, load_models
+from core.recommender import get_recommender, make_query_key
+from core.segment_index import SegmentIndex
+
+
+def scaled_catalog(matrix: np.ndarray, scale: int, seed: int) -> np.ndarray:
+    # Copies of the catalog with the audio features nudged, so the larger
+    # catalogs keep the real distribution without exact duplicates.
+    if scale == 1:
+        return matrix
+    rng = np.random.default_rng(seed)
+    continuous = np.flatnonzero(~indicator_columns(matrix))
+    copies = [matrix]
+    for _ in range(scale - 1):
+        copy = matrix.copy()
+        copy[:, continuous] += rng.normal(0, 0.05, (len(matrix), len(continuous)))
+        copies.append(copy)
+    return np.concatenate(copies)
+
+
+def query_vectors(count: int, seed: int) -> np.ndarray:
+    rng = random.Random(seed)
+    keys = [make_query_key(**random_query(rng)) for _ in range(count)]
+    return get_recommender()._query_vectors(keys)
+
+
+def timed(search, vectors: np.ndarray, top_k: int):
+    latencies, results = [], []
+    for vector in vectors:
+        started = time.perf_counter()
+        results.append(search(vector, top_k))
+        latencies.append(time.perf_counter() - started)
+    return latencies, results
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Segment + KD-tree index against the sklearn brute-force "
+        "search, on the catalog and on larger synthetic ones."
+    )
+    parser.add_argument("--scales", default="1,4,10", help="Catalog multiples")
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--top-k", default="10,50")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    load_models()
+    matrix = get_model()._fit_X
+    vectors = query_vectors(args.queries, args.seed)
+
+    print("=" * 72)
+    print(
+        f"{'tracks':>9} {'top':>4} {'index':<8} {'build':>9} {'p50':>10} "
+        f"{'p99':>10} {'recall':>7}"
+    )
+    for scale in [int(value) for value in args.scales.split(",")]:
+        catalog = scaled_catalog(matrix, scale, args.seed)
+
+        started = time.perf_counter()
+        index = SegmentIndex(catalog)
+        index_build = time.perf_counter() - started
+        started = time.perf_counter()
+        model = NearestNeighbors(algorithm="brute").fit(catalog)
+        model_build = time.perf_counter() - started
+
+        def brute(vector, top_k):
+            distances, indices = model.kneighbors(vector[None], n_neighbors=top_k)
+            return distances[0], indices[0]
+
+        for top_k in [int(value) for value in args.top_k.split(",")]:
+            brute_latencies, expected = timed(brute, vectors, top_k)
+            index_latencies, results = timed(index.search_one, vectors, top_k)
+            recall = np.mean(
+                [
+                    len(set(found[1]) & set(exact[1])) / top_k
+                    for found, exact in zip(results, expected)
+                ]
+            )
+            for label, build, latencies, shown in (
+                ("sklearn", model_build, brute_latencies, "-"),
+                ("segment", index_build, index_latencies, f"{recall:.4f}"),
+            ):
+                print(
+                    f"{len(catalog):>9} {top_k:>4} {label:<8} {build:>7.2f} s "
+                    f"{percentile(latencies, 0.5) * 1000:>7.2f} ms "
+                    f"{percentile(latencies, 0.99) * 1000:>7.2f} ms {shown:>7}"
+                )
+        print("-" * 72)
+    print("=" * 72)
+
+
+if __name__ == "__main__":
+    main()
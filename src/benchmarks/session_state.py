@@ -0,0 +1,68 @@
+import argparse
+import pickle
+import random
+import time
+import tracemalloc
+
+from benchmarks._common import random_query
+from core.recommender import get_recommender
+
+
+def random_queries(count: int, seed: int) -> list:
+    rng = random.Random(seed)
+    return [random_query(rng, is_explicit=False, top_n=100) for _ in range(count)]
+
+
+def measure(label: str, build, rerun, queries: list) -> None:
+    recommender = get_recommender()
+    # Compute outside the measurement so only what stays in the session counts.
+    results = [build(recommender, query) for query in queries]
+
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    sessions = [pickle.loads(pickle.dumps(result)) for result in results]
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    started = time.perf_counter()
+    for state in sessions:
+        rerun(recommender, state)
+    per_rerun = (time.perf_counter() - started) / len(sessions)
+
+    per_session = (after - before) / len(sessions)
+    pickled = sum(len(pickle.dumps(state)) for state in sessions) / len(sessions)
+    print(
+        f"{label:<10} {per_session / 1024:>10.1f} KiB {pickled / 1024:>10.1f} KiB "
+        f"{per_rerun * 1000:>10.3f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Per-session memory of stored recommendations."
+    )
+    parser.add_argument("--sessions", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=3)
+    args = parser.parse_args()
+
+    queries = random_queries(args.sessions, args.seed)
+
+    print("=" * 60)
+    print(f"{'state':<10} {'memory/session':>14} {'pickled':>14} {'rerun':>13}")
+    measure(
+        "DataFrame",
+        lambda r, q: r.recommend(**q),
+        lambda r, state: state.to_dict("records"),
+        queries,
+    )
+    measure(
+        "handle",
+        lambda r, q: r.recommend_handle(**q),
+        lambda r, state: r.tracks(state),
+        queries,
+    )
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+import argparse
+import math
+import pickle
+import random
+import time
+import tracemalloc
+from typing import Dict, List
+
+import numpy as np
+
+from benchmarks._common import percentile, random_query
+from core.model_loader import load_models
+from core.recommender import get_recommender
+from core.shown_filter import ShownFilter
+
+PAGE_SIZE = 10
+
+
+def session_queries(clicks: int, rng: random.Random) -> List[Dict]:
+    # One user clicking "Gerar recomendação" again and again, nudging the
+    # sliders a little between clicks.
+    query = random_query(rng, is_explicit=False)
+    queries = []
+    for _ in range(clicks):
+        queries.append(dict(query))
+        for name in ("danceability", "energy", "acousticness", "valence"):
+            query[name] = min(100.0, max(0.0, query[name] + rng.uniform(-3, 3)))
+    return queries
+
+
+def run(label: str, sessions: List[List[Dict]], mode: str) -> List:
+    recommender = get_recommender()
+    # Every run starts from the same cold neighbor cache.
+    recommender._neighbor_cache.clear()
+    latencies = []
+    repeated = shown_total = 0
+    states = []
+    for queries in sessions:
+        seen_positions = set()
+        seen_ids = set()
+        shown = ShownFilter() if mode == "bloom" else None
+        for query in queries:
+            started = time.perf_counter()
+            handle = recommender.recommend_handle(
+                **query,
+                top_n=PAGE_SIZE,
+                exclude_ids=seen_ids if mode == "ids" else None,
+                shown=shown,
+            )
+            latencies.append(time.perf_counter() - started)
+
+            positions = handle.indices[: handle.shown]
+            repeated += sum(int(position) in seen_positions for position in positions)
+            shown_total += len(positions)
+            seen_positions.update(int(position) for position in positions)
+            if mode == "ids":
+                seen_ids.update(track["id"] for track in recommender.tracks(handle))
+            if shown is not None:
+                shown.add(positions)
+        states.append(shown if mode == "bloom" else seen_ids)
+
+    print(
+        f"{label:<14} {repeated / shown_total:>9.1%} "
+        f"{percentile(latencies, 0.5) * 1000:>7.2f} ms "
+        f"{percentile(latencies, 0.99) * 1000:>7.2f} ms"
+    )
+    return states
+
+
+def memory(states: List) -> Dict[str, float]:
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    copies = [pickle.loads(pickle.dumps(state)) for state in states]
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "memory": (after - before) / len(copies),
+        "pickled": sum(len(pickle.dumps(state)) for state in states) / len(states),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Repeated tracks, latency and per-session memory of the "
+        "'already shown' exclusion across repeated clicks."
+    )
+    parser.add_argument("--sessions", type=int, default=40)
+    parser.add_argument("--clicks", type=int, default=15)
+    parser.add_argument("--seed", type=int, default=5)
+    args = parser.parse_args()
+
+    load_models()
+    recommender = get_recommender()
+    rng = random.Random(args.seed)
+    sessions = [session_queries(args.clicks, rng) for _ in range(args.sessions)]
+
+    print("=" * 48)
+    print(f"{'exclusion':<14} {'repeated':>9} {'p50':>10} {'p99':>10}")
+    run("none", sessions, "none")
+    ids = run("set of ids", sessions, "ids")
+    bloom = run("bloom filter", sessions, "bloom")
+    print("=" * 48)
+
+    # Every session's filter, and how often it skips a track it never saw.
+    filters = bloom
+    probe = np.arange(recommender.get_dataset_size())
+    false_positives = np.mean(
+        [
+            (shown.contains(probe).sum() - shown.count) / (len(probe) - shown.count)
+            for shown in filters[: min(5, len(filters))]
+        ]
+    )
+    shown_tracks = np.mean([shown.count for shown in filters])
+    bitset = math.ceil(recommender.get_dataset_size() / 8)
+    print(f"{'state':<14} {'memory/session':>16} {'pickled':>10}")
+    for label, states in (("set of ids", ids), ("bloom filter", filters)):
+        cost = memory(states)
+        print(
+            f"{label:<14} {cost['memory']:>10.0f} bytes {cost['pickled']:>4.0f} bytes"
+        )
+    print(f"{'bitset':<14} {bitset:>10} bytes {'-':>10}")
+    print("=" * 48)
+    print(
+        f"🧮 {shown_tracks:.0f} tracks shown per session; the filter holds "
+        f"{filters[0].capacity} in {filters[0].nbytes} bytes with "
+        f"{filters[0].hashes} hashes and skipped {false_positives:.2%} of the "
+        f"tracks never shown"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+import argparse
+import time
+
+from benchmarks._common import percentile, start_standin
+from services import rate_limiter, resilience, spotify_api
+from tools.spotify_standin import LatencyModel
+
+
+def run_pages(label: str, pages: int, tracks: int) -> None:
+    timings = []
+    unknown = 0
+    for page in range(pages):
+        ids = [{"id": f"{label}-{page}-{i}"} for i in range(tracks)]
+        started = time.monotonic()
+        cards = spotify_api.fetch_spotify_data_parallel(ids)
+        timings.append(time.monotonic() - started)
+        unknown += sum(1 for card in cards if card["title"] == "Unknown")
+
+    print(
+        f"{label:<12} p50={percentile(timings, 0.5):6.3f}s "
+        f"p95={percentile(timings, 0.95):6.3f}s "
+        f"p99={percentile(timings, 0.99):6.3f}s "
+        f"unknown={unknown}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Page-enrichment tail latency with injected stalls and outages."
+    )
+    parser.add_argument("--pages", type=int, default=50)
+    parser.add_argument("--tracks", type=int, default=20)
+    parser.add_argument("--latency", default="lognormal:-3.5,0.4")
+    parser.add_argument("--stall-rate", type=float, default=0.02)
+    parser.add_argument("--stall-seconds", type=float, default=10.0)
+    args = parser.parse_args()
+
+    latency = LatencyModel(args.latency, args.stall_rate, args.stall_seconds)
+    server = start_standin(latency)
+    # Measure stalls, not the client-side rate budget.
+    rate_limiter._token_bucket = rate_limiter.TokenBucket(1000, 1000)
+
+    print("=" * 60)
+    print(f"Stalls: {args.stall_rate:.0%} of requests hang {args.stall_seconds:.0f}s")
+    resilience.HEDGING_ENABLED = False
+    run_pages("no-hedging", args.pages, args.tracks)
+    resilience.HEDGING_ENABLED = True
+    run_pages("hedging", args.pages, args.tracks)
+    print(f"Hedges issued: {spotify_api._hedger.stats}")
+
+    print("-" * 60)
+    print("Outage: every request fails with 5xx")
+    latency.stall_rate = 0.0
+    server.error_rate = 1.0
+    run_pages("outage", max(5, args.pages // 5), args.tracks)
+    print(f"Circuit state: {spotify_api._breaker.state}")
+    print("=" * 60)
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
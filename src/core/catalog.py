@@ -0,0 +1,164 @@
+import json
+import os
+import threading
+from typing import (
+    TYPE_CHECKING,
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
+
+import numpy as np
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+AUDIO_FEATURES = ("acousticness", "danceability", "energy", "valence")
+# New and removed tracks are appended here by any process and picked up by
+# every running recommender, without regenerating the dataset or the model.
+UPDATES_PATH = os.getenv(
+    "CATALOG_UPDATES_PATH",
+    os.path.abspath(
+        os.path.join(
+            os.path.dirname(__file__), "../assets/datasets/catalog_updates.jsonl"
+        )
+    ),
+)
+# Past this many new tracks the delta is folded into the main index.
+COMPACT_THRESHOLD = int(os.getenv("CATALOG_COMPACT_THRESHOLD", "5000"))
+# How often the log is checked for new lines. Off by default: the log is
+# read on startup, and processes that should follow it set this.
+POLL_SECONDS = float(os.getenv("CATALOG_UPDATES_POLL_SECONDS", "0"))
+
+_write_lock = threading.Lock()
+
+
+class DeltaSegment(NamedTuple):
+    # Everything added or removed since the main index was built. Replaced
+    # as a whole on every update, so a query reads one consistent version.
+    # Positions continue the main index's and never change, not even when
+    # the delta is compacted, so sessions' handles stay valid.
+    base: int
+    matrix: np.ndarray
+    frame: Optional["pd.DataFrame"]
+    ids: Dict[str, int]
+    removed: FrozenSet[int]
+    # Filter columns of every position, main and delta, with the removed
+    # tracks marked invalid; None until the first update.
+    columns: Optional[Dict[str, np.ndarray]]
+    generation: int = 0
+
+    @property
+    def size(self) -> int:
+        return self.base + len(self.matrix)
+
+    def search(
+        self, vectors: np.ndarray, n_neighbors: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        # A few thousand rows at most: a plain scan beats building a tree on
+        # every update.
+        n_neighbors = min(n_neighbors, len(self.matrix))
+        distances = np.empty((len(vectors), n_neighbors))
+        indices = np.empty((len(vectors), n_neighbors), dtype=np.int64)
+        for row, vector in enumerate(vectors):
+            difference = self.matrix - vector
+            squared = np.einsum("ij,ij->i", difference, difference)
+            rows = np.argpartition(squared, n_neighbors - 1)[:n_neighbors]
+            rows = rows[np.lexsort((rows, squared[rows]))]
+            distances[row] = np.sqrt(squared[rows])
+            indices[row] = rows + self.base
+        return distances, indices
+
+
+def empty_delta(
+    base: int,
+    width: int,
+    removed: FrozenSet[int] = frozenset(),
+    columns: Optional[Dict[str, np.ndarray]] = None,
+    generation: int = 0,
+) -> DeltaSegment:
+    return DeltaSegment(
+        base=base,
+        matrix=np.empty((0, width)),
+        frame=None,
+        ids={},
+        removed=removed,
+        columns=columns,
+        generation=generation,
+    )
+
+
+def decade_of(year) -> str:
+    if year in (None, ""):
+        return ""
+    return str(int(year) // 10 * 10)
+
+
+def parse_update(update: Dict) -> Dict:
+    op = update.get("op")
+    if op == "remove":
+        return {"op": "remove", "id": str(update["id"])}
+    if op != "add":
+        raise ValueError(f"Unknown catalog update op: {op!r}")
+
+    track = dict(update["track"])
+    track["id"] = str(track["id"])
+    for name in AUDIO_FEATURES:
+        value = float(track[name])
+        if not (0.0 <= value <= 1.0):
+            raise ValueError(f"{name} must be between 0 and 1, got {value}")
+        track[name] = value
+    return {"op": "add", "id": track["id"], "track": track}
+
+
+def _write(updates: List[Dict], path: str) -> int:
+    lines = "".join(json.dumps(update, ensure_ascii=False) + "\n" for update in updates)
+    # Whole lines in one write under the lock, so lines from concurrent
+    # writers never interleave; readers leave a partial last line for later.
+    with _write_lock, open(path, "a", encoding="utf-8") as f:
+        f.write(lines)
+        f.flush()
+        os.fsync(f.fileno())
+    return len(updates)
+
+
+def append_tracks(tracks: Iterable[Dict], path: str = UPDATES_PATH) -> int:
+    updates = [parse_update({"op": "add", "track": track}) for track in tracks]
+    return _write([{"op": "add", "track": update["track"]} for update in updates], path)
+
+
+def remove_tracks(track_ids: Iterable[str], path: str = UPDATES_PATH) -> int:
+    return _write(
+        [{"op": "remove", "id": str(track_id)} for track_id in track_ids], path
+    )
+
+
+class UpdateLog:
+    def __init__(self, path: str = UPDATES_PATH):
+        self.path = path
+        self.offset = 0
+
+    def read(self) -> List[Dict]:
+        try:
+            with open(self.path, "rb") as f:
+                f.seek(self.offset)
+                data = f.read()
+        except FileNotFoundError:
+            return []
+
+        # A line still being written is left for the next read.
+        end = data.rfind(b"\n") + 1
+        self.offset += end
+        updates = []
+        for line in data[:end].splitlines():
+            if not line.strip():
+                continue
+            try:
+                updates.append(parse_update(json.loads(line)))
+            except (ValueError, TypeError, KeyError) as e:
+                print(f"⚠️ Skipping catalog update: {e}")
+        return updates
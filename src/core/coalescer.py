@@ -0,0 +1,93 @@
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+SearchFn = Callable[[List[Tuple], int], Tuple[np.ndarray, np.ndarray]]
+
+
+class SearchCoalescer:
+    def __init__(self, search: SearchFn, window: float, max_batch: int):
+        # Callers block on a future while one dispatcher thread runs a single
+        # vectorized search for everything that queued up in the window.
+        self.search_many = search
+        self.window = window
+        self.max_batch = max(1, max_batch)
+        self._pending: List[Tuple[Tuple, int, Future]] = []
+        self._cond = threading.Condition()
+        self.stats = {"batches": 0, "queries": 0, "largest": 0}
+        self._thread: Optional[threading.Thread] = None
+
+    def search(
+        self, query_key: Tuple, n_neighbors: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        future: Future = Future()
+        with self._cond:
+            # The dispatcher starts with the first search, and again in a
+            # forked child, where the parent's thread no longer runs.
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="recommend-coalescer", daemon=True
+                )
+                self._thread.start()
+            self._pending.append((query_key, n_neighbors, future))
+            self._cond.notify()
+        return future.result()
+
+    def _next_batch(self) -> List[Tuple[Tuple, int, Future]]:
+        with self._cond:
+            while not self._pending:
+                self._cond.wait()
+
+            # A query with nothing else queued is searched at once. The window
+            # only opens when others are already waiting; whatever arrives
+            # during a search goes out with the next batch. A full batch
+            # leaves early.
+            deadline = time.monotonic() + self.window
+            while 1 < len(self._pending) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+            batch = self._pending[: self.max_batch]
+            del self._pending[: self.max_batch]
+            return batch
+
+    def _search(self, batch: List[Tuple[Tuple, int, Future]]) -> None:
+        # Sessions asking for the same slider position share one row.
+        keys = list(dict.fromkeys(query_key for query_key, _, _ in batch))
+        n_neighbors = max(n for _, n, _ in batch)
+        try:
+            distances, indices = self.search_many(keys, n_neighbors)
+        except Exception as e:
+            if len(keys) == 1:
+                for _, _, future in batch:
+                    future.set_exception(e)
+                return
+            # One bad query must not fail the others: each key on its own.
+            for query_key in keys:
+                self._search([entry for entry in batch if entry[0] == query_key])
+            return
+
+        rows = {query_key: row for row, query_key in enumerate(keys)}
+        for query_key, n, future in batch:
+            row = rows[query_key]
+            future.set_result((distances[row, :n], indices[row, :n]))
+        self.stats["batches"] += 1
+
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch()
+            # Queries are searched alongside others of about the same depth,
+            # so one deep page doesn't make the whole batch scan that far.
+            groups: Dict[int, List[Tuple[Tuple, int, Future]]] = {}
+            for entry in batch:
+                groups.setdefault((entry[1] - 1).bit_length(), []).append(entry)
+            for group in groups.values():
+                self._search(group)
+
+            self.stats["queries"] += len(batch)
+            self.stats["largest"] = max(self.stats["largest"], len(batch))
@@ -0,0 +1,136 @@
+from typing import Tuple
+
+import numpy as np
+
+LAYOUTS = ("int8", "float16")
+# Rows taken from the compact scan before the exact pass; the exact pass
+# then adds whatever the lower bounds can't rule out.
+RERANK_FACTOR = 2
+RERANK_MIN = 32
+# float32 rounding in the lower bounds, kept on the safe side.
+BOUND_SLACK = 1e-5
+
+
+def indicator_columns(matrix: np.ndarray) -> np.ndarray:
+    return np.all((matrix == 0) | (matrix == 1), axis=0)
+
+
+class CompactIndex:
+    def __init__(self, matrix: np.ndarray, layout: str = "int8"):
+        if layout not in LAYOUTS:
+            raise ValueError(f"layout must be one of {', '.join(LAYOUTS)}")
+        self.layout = layout
+        # Exact rows, only read for the few candidates of each query.
+        self.exact = matrix
+
+        binary = indicator_columns(matrix)
+        self.binary_columns = np.flatnonzero(binary)
+        self.continuous_columns = np.flatnonzero(~binary)
+
+        # Indicator columns: read as the bits of one integer per row, then
+        # dictionary-encoded, as only a few dozen popular/explicit/decade
+        # combinations occur.
+        bits = matrix[:, self.binary_columns].astype(np.int64)
+        codes = bits @ (1 << np.arange(bits.shape[1], dtype=np.int64))
+        unique, first, ids = np.unique(codes, return_index=True, return_inverse=True)
+        self.signatures = bits[first].astype(np.uint8)
+        self.signature_ids = ids.reshape(-1).astype(
+            np.uint8 if len(unique) <= 256 else np.uint16
+        )
+
+        continuous = matrix[:, self.continuous_columns]
+        if layout == "int8":
+            # 256 levels per column, over that column's own range.
+            self.low = continuous.min(axis=0)
+            self.step = (continuous.max(axis=0) - self.low) / 255.0
+            self.step[self.step == 0] = 1.0
+            codes = np.rint((continuous - self.low) / self.step).astype(np.uint8)
+            decoded = codes * self.step + self.low
+            # Columns are paired into one 16-bit code, so a query reads one
+            # 65536-entry table per pair instead of two small ones.
+            self.codes = [
+                codes[:, start].astype(np.uint16) << 8 | codes[:, start + 1]
+                if start + 1 < codes.shape[1]
+                else np.ascontiguousarray(codes[:, start])
+                for start in range(0, codes.shape[1], 2)
+            ]
+        else:
+            codes = continuous.astype(np.float16)
+            decoded = codes.astype(np.float64)
+            self.codes = [np.ascontiguousarray(column) for column in codes.T]
+        # Largest rounding error per column, measured rather than derived.
+        self.error = np.abs(continuous - decoded).max(axis=0)
+
+    def __len__(self) -> int:
+        return len(self.exact)
+
+    @property
+    def nbytes(self) -> int:
+        codes = sum(column.nbytes for column in self.codes)
+        return codes + self.signature_ids.nbytes + self.signatures.nbytes
+
+    def _lower_bounds(self, vector: np.ndarray) -> np.ndarray:
+        # A lower bound on every row's squared distance, from the compact
+        # form only: indicator mismatches are exact, each continuous value
+        # is off by at most its column's rounding error.
+        query_bits = vector[self.binary_columns]
+        mismatches = (self.signatures != query_bits).sum(axis=1).astype(np.float32)
+        bounds = mismatches.take(self.signature_ids)
+
+        tables = []
+        for position, column in enumerate(self.continuous_columns):
+            slack = self.error[position]
+            if self.layout == "int8":
+                levels = np.arange(256) * self.step[position] + self.low[position]
+                gap = np.maximum(np.abs(levels - vector[column]) - slack, 0.0)
+                tables.append((gap * gap).astype(np.float32))
+            else:
+                values = self.codes[position].astype(np.float32)
+                gap = np.maximum(np.abs(values - vector[column]) - slack, 0.0)
+                bounds += gap * gap
+
+        for start in range(0, len(tables), 2):
+            table = tables[start]
+            if start + 1 < len(tables):
+                table = np.add.outer(table, tables[start + 1]).ravel()
+            bounds += table.take(self.codes[start // 2])
+        return bounds
+
+    def _exact_squared(self, vector: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        difference = self.exact[rows] - vector
+        return np.einsum("ij,ij->i", difference, difference)
+
+    def search_one(
+        self, vector: np.ndarray, n_neighbors: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        total = len(self)
+        n_neighbors = min(n_neighbors, total)
+        bounds = self._lower_bounds(vector)
+
+        size = max(n_neighbors * RERANK_FACTOR, n_neighbors + RERANK_MIN)
+        if size < total:
+            candidates = np.argpartition(bounds, size - 1)[:size]
+        else:
+            candidates = np.arange(total)
+        squared = self._exact_squared(vector, candidates)
+
+        # The k-th exact distance among the candidates is at least the true
+        # k-th; any row whose bound is below it might belong in the top k, so
+        # those get an exact distance too and the result is exact.
+        threshold = np.partition(squared, n_neighbors - 1)[n_neighbors - 1]
+        limit = threshold * (1 + BOUND_SLACK) + BOUND_SLACK
+        rows = np.flatnonzero(bounds <= limit)
+        squared = self._exact_squared(vector, rows)
+
+        order = np.lexsort((rows, squared))[:n_neighbors]
+        return np.sqrt(squared[order]), rows[order]
+
+    def search(
+        self, vectors: np.ndarray, n_neighbors: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        vectors = np.asarray(vectors, dtype=np.float64)
+        results = [self.search_one(vector, n_neighbors) for vector in vectors]
+        return (
+            np.stack([distances for distances, _ in results]),
+            np.stack([indices for _, indices in results]),
+        )
@@ -2,9 +2,6 @@ import os
 import pickle
 from typing import Tuple
 
-import joblib
-import pandas as pd
-
 
 class ModelLoader:
     _instance = None
@@ -22,6 +19,10 @@ class ModelLoader:
         if self._model is not None and self._features is not None:
             return self._model, self._scaler, self._df, self._features
 
+        # Imported here so the page can render before pandas and sklearn load.
+        import joblib
+        import pandas as pd
+
         base_path = os.path.dirname(__file__)
         assets_path = os.path.abspath(os.path.join(base_path, "../assets"))
 
@@ -58,6 +59,9 @@ class ModelLoader:
             print(f"❌ Error loading models: {e}")
             raise
 
+    def is_loaded(self) -> bool:
+        return self._model is not None and self._df is not None
+
     def get_model(self):
         if self._model is None:
             self.load()
@@ -86,6 +90,10 @@ def load_models() -> Tuple:
     return _loader.load()
 
 
+def models_loaded() -> bool:
+    return _loader.is_loaded()
+
+
 def get_model():
     return _loader.get_model()
 
@@ -0,0 +1,97 @@
+from typing import Dict, Optional, Tuple
+
+from .recommender import DECADES, MAX_PAGE_SIZE, _check_sliders
+
+DEFAULT_TOP_N = 10
+DEFAULT_SEARCH_LIMIT = 100
+MAX_SEARCH_LIMIT = 1000
+SLIDER_PARAMS = ("danceability", "energy", "acousticness", "valence")
+
+
+def parse_flag(value, name: str) -> bool:
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str) and value.lower() in ("1", "true", "0", "false"):
+        return value.lower() in ("1", "true")
+    raise ValueError(f"{name} must be a boolean")
+
+
+def parse_top_n(value) -> int:
+    try:
+        top_n = int(value)
+    except (TypeError, ValueError):
+        raise ValueError("top_n must be an integer")
+    if not 1 <= top_n <= MAX_PAGE_SIZE:
+        raise ValueError(f"top_n must be between 1 and {MAX_PAGE_SIZE}")
+    return top_n
+
+
+def _number(value, name: str) -> float:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError(f"{name} must be a number")
+    return float(value)
+
+
+def parse_ranges(value) -> Dict[str, Tuple[Optional[float], Optional[float]]]:
+    if value is None:
+        return {}
+    if not isinstance(value, dict):
+        raise ValueError("ranges must be a JSON object")
+
+    ranges = {}
+    for name, bounds in value.items():
+        if name not in SLIDER_PARAMS:
+            raise ValueError(f"ranges.{name} must be one of {', '.join(SLIDER_PARAMS)}")
+        if not isinstance(bounds, dict) or not set(bounds) <= {"min", "max"}:
+            raise ValueError(f"ranges.{name} must be an object with min and/or max")
+        ranges[name] = tuple(
+            None
+            if bounds.get(side) is None
+            else _number(bounds[side], f"{name}.{side}")
+            for side in ("min", "max")
+        )
+    return ranges
+
+
+def parse_query(body) -> Dict:
+    if not isinstance(body, dict):
+        raise ValueError("Each query must be a JSON object")
+
+    query = {}
+    for param in SLIDER_PARAMS:
+        if param not in body:
+            raise ValueError(f"{param} is required")
+        value = body[param]
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ValueError(f"{param} must be a number")
+        query[param] = float(value)
+    _check_sliders(*(query[param] for param in SLIDER_PARAMS))
+
+    query["is_popular"] = parse_flag(body.get("is_popular", False), "is_popular")
+    query["is_explicit"] = parse_flag(body.get("is_explicit", False), "is_explicit")
+    decade = body.get("decade") or ""
+    if decade and decade not in DECADES:
+        raise ValueError(f"decade must be one of {', '.join(DECADES)}")
+    query["decade"] = decade
+    query["top_n"] = parse_top_n(body.get("top_n", DEFAULT_TOP_N))
+    return query
+
+
+def parse_search(body) -> Dict:
+    query = parse_query(body)
+    del query["top_n"]
+
+    radius = body.get("radius")
+    query["radius"] = None if radius is None else _number(radius, "radius")
+    query["ranges"] = parse_ranges(body.get("ranges"))
+    if query["radius"] is None and not query["ranges"]:
+        raise ValueError("radius or ranges is required")
+
+    try:
+        limit = int(body.get("limit", DEFAULT_SEARCH_LIMIT))
+    except (TypeError, ValueError):
+        raise ValueError("limit must be an integer")
+    if not 1 <= limit <= MAX_SEARCH_LIMIT:
+        raise ValueError(f"limit must be between 1 and {MAX_SEARCH_LIMIT}")
+    query["limit"] = limit
+    return query
@@ -1,8 +1,127 @@
-from typing import List
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import (
+    TYPE_CHECKING,
+    Collection,
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+)
 
-import pandas as pd
+import numpy as np
 
+from .catalog import (
+    AUDIO_FEATURES,
+    COMPACT_THRESHOLD,
+    POLL_SECONDS,
+    DeltaSegment,
+    UpdateLog,
+    decade_of,
+    empty_delta,
+)
+from .coalescer import SearchCoalescer
+from .compact_index import CompactIndex
 from .model_loader import get_dataframe, get_features, get_model, get_preprocessor
+from .segment_index import SegmentIndex
+from .shown_filter import ShownFilter
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+MAX_PAGE_SIZE = 20
+# How many neighbors to scan per requested row; filters discard the rest.
+CANDIDATE_FACTOR = 5
+# Neighbor lists of recent queries, so returning a slider to a position it
+# already visited skips the search. Deep scans are too large to keep.
+NEIGHBOR_CACHE_SIZE = 512
+NEIGHBOR_CACHE_MAX_NEIGHBORS = 2000
+# First element of the query key of "more like this track" searches.
+SIMILAR_QUERY = "similar"
+DECADES = (
+    "1920",
+    "1930",
+    "1940",
+    "1950",
+    "1960",
+    "1970",
+    "1980",
+    "1990",
+    "2000",
+    "2010",
+    "2020",
+)
+# Concurrent sessions' searches are merged into one kneighbors call. A query
+# that is alone is searched at once; when others are queued, the batch waits
+# up to the window for more, or until it is full.
+COALESCE_ENABLED = os.getenv("RECOMMEND_COALESCE", "1") != "0"
+COALESCE_WINDOW_SECONDS = float(os.getenv("RECOMMEND_COALESCE_WINDOW_MS", "2")) / 1000
+COALESCE_MAX_BATCH = int(os.getenv("RECOMMEND_COALESCE_MAX_BATCH", "32"))
+# "int8" or "float16" searches a compact copy of the index with an exact
+# re-rank; empty keeps the sklearn search.
+COMPACT_INDEX = os.getenv("RECOMMEND_COMPACT_INDEX", "")
+# Splits the tracks by their indicator columns, with a KD-tree over the
+# audio features of each part; takes precedence over the compact index.
+SEGMENT_INDEX = os.getenv("RECOMMEND_SEGMENT_INDEX", "0") == "1"
+
+
+class RecommendationHandle(NamedTuple):
+    # What a session keeps between reruns: the query, the dataset row
+    # positions and distances of every match found so far in rank order, how
+    # many neighbors were scanned to find them and how many are on screen.
+    # Display data is rebuilt from the shared dataframe and metadata caches.
+    query_key: Tuple
+    indices: np.ndarray
+    distances: np.ndarray
+    searched: int = 0
+    shown: int = 0
+
+
+def make_query_key(
+    danceability: float,
+    energy: float,
+    acousticness: float,
+    valence: float,
+    is_popular: bool,
+    is_explicit: bool,
+    decade: str,
+) -> Tuple:
+    return (
+        float(danceability),
+        float(energy),
+        float(acousticness),
+        float(valence),
+        bool(is_popular),
+        bool(is_explicit),
+        decade,
+    )
+
+
+def _check_sliders(
+    danceability: float, energy: float, acousticness: float, valence: float
+) -> None:
+    params = {
+        "danceability": danceability,
+        "energy": energy,
+        "acousticness": acousticness,
+        "valence": valence,
+    }
+
+    for param, value in params.items():
+        if not (0.0 <= value <= 100.0):
+            raise ValueError(f"{param} must be between 0.0 and 100.0, got {value}")
+
+
+def _frozen(values: np.ndarray, dtype) -> np.ndarray:
+    array = np.ascontiguousarray(values, dtype=dtype)
+    array.flags.writeable = False
+    return array
 
 
 class MusicRecommender:
@@ -11,8 +130,297 @@ class MusicRecommender:
         self.preprocessor = get_preprocessor()
         self.df = get_dataframe()
         self.features = get_features()
+        self._neighbor_cache: "OrderedDict[Tuple, Tuple[np.ndarray, np.ndarray]]" = (
+            OrderedDict()
+        )
+        self._neighbor_lock = threading.Lock()
+        self._columns: Optional[Dict[str, np.ndarray]] = None
+        self._id_index = None
+        self._sorted: Optional[
+            Tuple[np.ndarray, Dict[int, Tuple[np.ndarray, np.ndarray]]]
+        ] = None
+        self._index: Optional[Union[SegmentIndex, CompactIndex]] = None
+        if SEGMENT_INDEX and self.model is not None:
+            self._index = SegmentIndex(self.model._fit_X)
+        elif COMPACT_INDEX and self.model is not None:
+            # Scans the compact layout; the fitted matrix is only read for
+            # each query's few candidate rows in the exact pass.
+            self._index = CompactIndex(self.model._fit_X, COMPACT_INDEX)
+        self._coalescer: Optional[SearchCoalescer] = None
+        if COALESCE_ENABLED:
+            self._coalescer = SearchCoalescer(
+                self.search_neighbors, COALESCE_WINDOW_SECONDS, COALESCE_MAX_BATCH
+            )
 
-    def recommend(
+        self._live = empty_delta(
+            len(self.df) if self.df is not None else 0, len(self.features)
+        )
+        self._updates = UpdateLog()
+        self._catalog_lock = threading.RLock()
+        if self.model is not None and self.df is not None:
+            self.refresh_catalog()
+            if POLL_SECONDS > 0:
+                threading.Thread(
+                    target=self._follow_updates, name="catalog-updates", daemon=True
+                ).start()
+
+    def _main_position(self, track_id: str) -> Optional[int]:
+        import pandas as pd
+
+        if self._id_index is None:
+            self._id_index = pd.Index(self._main_columns()["id"])
+        try:
+            location = self._id_index.get_loc(track_id)
+        except KeyError:
+            return None
+
+        # Repeated ids come back as a slice or a mask; the first row wins.
+        if isinstance(location, slice):
+            return location.start
+        if isinstance(location, np.ndarray):
+            return int(np.flatnonzero(location)[0])
+        return location
+
+    def _position_of(self, track_id: str) -> int:
+        live = self._live
+        position = live.ids.get(track_id)
+        if position is None:
+            position = self._main_position(track_id)
+        if position is None or position in live.removed:
+            raise KeyError(f"Unknown track id: {track_id}")
+        return position
+
+    def has_track(self, track_id: str) -> bool:
+        try:
+            self._position_of(track_id)
+        except KeyError:
+            return False
+        return True
+
+    def _rows(self, positions: np.ndarray) -> np.ndarray:
+        live = self._live
+        matrix = self.model._fit_X
+        if not len(live.matrix):
+            return matrix[positions]
+
+        in_delta = positions >= live.base
+        rows = np.empty((len(positions), matrix.shape[1]))
+        rows[~in_delta] = matrix[positions[~in_delta]]
+        rows[in_delta] = live.matrix[positions[in_delta] - live.base]
+        return rows
+
+    def _frame(self, positions: np.ndarray) -> "pd.DataFrame":
+        import pandas as pd
+
+        live = self._live
+        df = self.df
+        in_delta = positions >= live.base
+        if live.frame is None or not in_delta.any():
+            return df.iloc[positions]
+
+        parts = pd.concat(
+            [
+                df.iloc[positions[~in_delta]],
+                live.frame.iloc[positions[in_delta] - live.base],
+            ]
+        )
+        order = np.concatenate([np.flatnonzero(~in_delta), np.flatnonzero(in_delta)])
+        return parts.iloc[np.argsort(order, kind="stable")]
+
+    def _column_at(self, name: str, positions: np.ndarray) -> np.ndarray:
+        live = self._live
+        values = self.df[name].to_numpy()
+        if live.frame is None:
+            return values[positions]
+
+        in_delta = positions >= live.base
+        found = np.empty(len(positions), dtype=object)
+        found[~in_delta] = values[positions[~in_delta]]
+        found[in_delta] = live.frame[name].to_numpy()[positions[in_delta] - live.base]
+        return found
+
+    def _query_vectors(self, query_keys: List[Tuple]) -> np.ndarray:
+        import pandas as pd
+
+        vectors = np.empty((len(query_keys), len(self.features)))
+        sliders = [
+            row
+            for row, query_key in enumerate(query_keys)
+            if query_key[0] != SIMILAR_QUERY
+        ]
+
+        # Dataset rows are already in the model's feature space.
+        similar = [
+            row
+            for row, query_key in enumerate(query_keys)
+            if query_key[0] == SIMILAR_QUERY
+        ]
+        if similar:
+            positions = [self._position_of(query_keys[row][1]) for row in similar]
+            vectors[similar] = self._rows(np.array(positions))
+
+        if not sliders:
+            return vectors
+
+        keys = [query_keys[row] for row in sliders]
+        numeric_df = pd.DataFrame(
+            {
+                "acousticness": [key[2] / 100.0 for key in keys],
+                "danceability": [key[0] / 100.0 for key in keys],
+                "energy": [key[1] / 100.0 for key in keys],
+                "valence": [key[3] / 100.0 for key in keys],
+            }
+        )
+
+        # One transform for the whole batch of slider queries.
+        numeric_scaled = self.preprocessor.transform(numeric_df)
+
+        # Assembled as plain columns: a DataFrame insert per indicator costs
+        # more than the transform itself.
+        columns = {
+            name: numeric_scaled[:, position]
+            for position, name in enumerate(AUDIO_FEATURES)
+        }
+        columns["is_popular"] = np.array([1.0 if key[4] else 0.0 for key in keys])
+        columns["explicit"] = np.array([1.0 if key[5] else 0.0 for key in keys])
+        for decade in DECADES:
+            columns[decade + "s"] = np.array(
+                [1.0 if key[6] == decade else 0.0 for key in keys]
+            )
+
+        vectors[sliders] = np.column_stack([columns[name] for name in self.features])
+        return vectors
+
+    def search_neighbors(
+        self, query_keys: List[Tuple], n_neighbors: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        # The delta is read before the main index: a compaction swaps the
+        # main index first, so it always covers the delta's base.
+        live = self._live
+        vectors = self._query_vectors(query_keys)
+        main_neighbors = min(n_neighbors, len(self.model._fit_X))
+        if self._index is not None:
+            distances, indices = self._index.search(vectors, main_neighbors)
+        else:
+            distances, indices = self.model.kneighbors(
+                vectors, n_neighbors=main_neighbors
+            )
+        if not len(live.matrix):
+            return distances, indices
+
+        delta_distances, delta_indices = live.search(vectors, n_neighbors)
+        return _merged(
+            np.hstack([distances, delta_distances]),
+            np.hstack([indices, delta_indices]),
+            n_neighbors,
+        )
+
+    def _neighbors(
+        self, query_key: Tuple, n_neighbors: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        with self._neighbor_lock:
+            cached = self._neighbor_cache.get(query_key)
+            if cached is not None and len(cached[1]) >= n_neighbors:
+                self._neighbor_cache.move_to_end(query_key)
+                return cached[0][:n_neighbors], cached[1][:n_neighbors]
+
+        generation = self._live.generation
+        if self._coalescer is not None:
+            distances, indices = self._coalescer.search(query_key, n_neighbors)
+        else:
+            distances, indices = self.search_neighbors([query_key], n_neighbors)
+            distances, indices = distances[0], indices[0]
+        return self._remember(query_key, distances, indices, generation)
+
+    def _remember(
+        self,
+        query_key: Tuple,
+        distances: np.ndarray,
+        indices: np.ndarray,
+        generation: int,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        distances = _frozen(distances, np.float32)
+        indices = _frozen(indices, np.int32)
+
+        if len(indices) <= NEIGHBOR_CACHE_MAX_NEIGHBORS:
+            with self._neighbor_lock:
+                # Searched before the catalog last changed: not worth keeping.
+                if generation != self._live.generation:
+                    return distances, indices
+                self._neighbor_cache[query_key] = (distances, indices)
+                self._neighbor_cache.move_to_end(query_key)
+                while len(self._neighbor_cache) > NEIGHBOR_CACHE_SIZE:
+                    self._neighbor_cache.popitem(last=False)
+        return distances, indices
+
+    def warm_neighbors(self, query_keys: List[Tuple], n_neighbors: int) -> None:
+        # One kneighbors call for every key not cached yet, so the handles
+        # built right after for the same keys skip the search.
+        with self._neighbor_lock:
+            missing = [
+                query_key
+                for query_key in dict.fromkeys(query_keys)
+                if query_key not in self._neighbor_cache
+                or len(self._neighbor_cache[query_key][1]) < n_neighbors
+            ]
+        if not missing:
+            return
+
+        generation = self._live.generation
+        distances, indices = self.search_neighbors(missing, n_neighbors)
+        for row, query_key in enumerate(missing):
+            self._remember(query_key, distances[row], indices[row], generation)
+
+    def _filter_columns(self) -> Dict[str, np.ndarray]:
+        live = self._live
+        if live.columns is not None:
+            return live.columns
+        return self._main_columns()
+
+    def _main_columns(self) -> Dict[str, np.ndarray]:
+        # Per-row filter flags as plain arrays, built once: a page of
+        # candidates is then filtered without creating any pandas objects.
+        if self._columns is None:
+            self._columns = _frame_columns(self.df)
+        return self._columns
+
+    def _keep(
+        self,
+        positions: np.ndarray,
+        query_key: Tuple,
+        exclude_ids: Optional[Collection[str]],
+        shown: Optional[ShownFilter] = None,
+    ) -> np.ndarray:
+        columns = self._filter_columns()
+
+        keep = columns["valid"][positions]
+        # Checked before any page slot is handed out, so tracks the session
+        # already saw are skipped like filtered ones and never enriched.
+        if shown is not None:
+            keep &= ~shown.contains(positions)
+        if query_key[0] == SIMILAR_QUERY:
+            keep &= columns["id"][positions] != query_key[1]
+        else:
+            _, _, _, _, is_popular, is_explicit, decade = query_key
+            if is_popular:
+                keep &= columns["is_popular"][positions]
+
+            if is_explicit and "explicit" in columns:
+                keep &= columns["explicit"][positions]
+
+            if decade:
+                keep &= columns[decade + "s"][positions]
+
+        if exclude_ids:
+            keep &= np.fromiter(
+                (track_id not in exclude_ids for track_id in columns["id"][positions]),
+                dtype=bool,
+                count=len(positions),
+            )
+
+        return keep
+
+    def recommend_handle(
         self,
         danceability: float,
         energy: float,
@@ -22,95 +430,507 @@ class MusicRecommender:
         is_explicit: bool,
         decade: str,
         top_n: int = 5,
-    ) -> pd.DataFrame:
+        exclude_ids: Optional[Collection[str]] = None,
+        shown: Optional[ShownFilter] = None,
+    ) -> RecommendationHandle:
         if self.model is None or self.df is None:
             raise RuntimeError("Model or dataframe not loaded")
 
-        params = {
-            "danceability": danceability,
-            "energy": energy,
-            "acousticness": acousticness,
-            "valence": valence,
-        }
+        _check_sliders(danceability, energy, acousticness, valence)
+        query_key = make_query_key(
+            danceability,
+            energy,
+            acousticness,
+            valence,
+            is_popular,
+            is_explicit,
+            decade,
+        )
+        handle = RecommendationHandle(
+            query_key=query_key,
+            indices=_frozen([], np.int32),
+            distances=_frozen([], np.float32),
+        )
+        return self.next_page(handle, min(top_n, MAX_PAGE_SIZE), exclude_ids, shown)
 
-        for param, value in params.items():
-            if not (0.0 <= value <= 100.0):
-                raise ValueError(f"{param} must be between 0.0 and 100.0, got {value}")
+    def similar_handle(
+        self,
+        track_id: str,
+        top_n: int = 5,
+        exclude_ids: Optional[Collection[str]] = None,
+        shown: Optional[ShownFilter] = None,
+    ) -> RecommendationHandle:
+        if self.model is None or self.df is None:
+            raise RuntimeError("Model or dataframe not loaded")
 
-        numeric_data = {
-            "acousticness": acousticness / 100.0,
-            "danceability": danceability / 100.0,
-            "energy": energy / 100.0,
-            "valence": valence / 100.0,
-        }
+        self._position_of(track_id)
+        handle = RecommendationHandle(
+            query_key=(SIMILAR_QUERY, track_id),
+            indices=_frozen([], np.int32),
+            distances=_frozen([], np.float32),
+        )
+        return self.next_page(handle, min(top_n, MAX_PAGE_SIZE), exclude_ids, shown)
 
-        numeric_df = pd.DataFrame([numeric_data])
+    def next_page(
+        self,
+        handle: RecommendationHandle,
+        page_size: int,
+        exclude_ids: Optional[Collection[str]] = None,
+        shown: Optional[ShownFilter] = None,
+    ) -> RecommendationHandle:
+        wanted = handle.shown + page_size
+        indices = handle.indices
+        distances = handle.distances
+        searched = handle.searched
+        total = self._live.size
 
-        numeric_scaled = self.preprocessor.transform(numeric_df)
+        # Up to every track the session already saw may sit among the nearest
+        # ones, so the first scan goes that much deeper instead of repeating.
+        depth = page_size * CANDIDATE_FACTOR
+        if shown is not None:
+            depth += shown.count
+
+        # Matches already found past the last page are reused as-is; only the
+        # neighbors beyond what was scanned before are filtered.
+        while len(indices) < wanted and searched < total:
+            n_neighbors = min(total, max(2 * searched, depth))
+            found_distances, found_indices = self._neighbors(
+                handle.query_key, n_neighbors
+            )
+            positions = found_indices[searched:]
+            new_distances = found_distances[searched:]
+            keep = self._keep(positions, handle.query_key, exclude_ids, shown)
+            # Tracks added since the last page can move earlier matches past
+            # the scanned depth; those are not shown twice.
+            if searched and self._live.generation:
+                keep &= ~np.isin(positions, indices)
+            order = np.argsort(new_distances[keep], kind="stable")
 
-        numeric_scaled_df = pd.DataFrame(
-            numeric_scaled,
-            columns=["acousticness", "danceability", "energy", "valence"],
+            indices = np.concatenate([indices, positions[keep][order]])
+            distances = np.concatenate([distances, new_distances[keep][order]])
+            searched = n_neighbors
+
+        return RecommendationHandle(
+            query_key=handle.query_key,
+            indices=_frozen(indices, np.int32),
+            distances=_frozen(distances, np.float32),
+            searched=searched,
+            shown=min(wanted, len(indices)),
         )
 
-        numeric_scaled_df["is_popular"] = 1 if is_popular else 0
-        numeric_scaled_df["explicit"] = 1 if is_explicit else 0
-        numeric_scaled_df["1920s"] = 1 if decade == "1920" else 0
-        numeric_scaled_df["1930s"] = 1 if decade == "1930" else 0
-        numeric_scaled_df["1940s"] = 1 if decade == "1940" else 0
-        numeric_scaled_df["1950s"] = 1 if decade == "1950" else 0
-        numeric_scaled_df["1960s"] = 1 if decade == "1960" else 0
-        numeric_scaled_df["1970s"] = 1 if decade == "1970" else 0
-        numeric_scaled_df["1980s"] = 1 if decade == "1980" else 0
-        numeric_scaled_df["1990s"] = 1 if decade == "1990" else 0
-        numeric_scaled_df["2000s"] = 1 if decade == "2000" else 0
-        numeric_scaled_df["2010s"] = 1 if decade == "2010" else 0
-        numeric_scaled_df["2020s"] = 1 if decade == "2020" else 0
+    def _sorted_columns(self) -> Dict[int, Tuple[np.ndarray, np.ndarray]]:
+        # Each audio column's values in ascending order with the rows they
+        # belong to, built once: a range is then two binary searches.
+        matrix = self.model._fit_X
+        if self._sorted is not None and self._sorted[0] is matrix:
+            return self._sorted[1]
+
+        sorted_columns = {}
+        for name in AUDIO_FEATURES:
+            column = self.features.index(name)
+            order = np.argsort(matrix[:, column], kind="stable").astype(np.int32)
+            sorted_columns[column] = (matrix[order, column], order)
+
+        self._sorted = (matrix, sorted_columns)
+        return sorted_columns
 
-        input_scaled = numeric_scaled_df[self.features].values
+    def _scaled_ranges(
+        self, ranges: Dict[str, Tuple[Optional[float], Optional[float]]]
+    ) -> Dict[int, Tuple[float, float]]:
+        import pandas as pd
 
-        distances, indices = self.model.kneighbors(input_scaled, n_neighbors=top_n * 5)
+        unknown = set(ranges) - set(AUDIO_FEATURES)
+        if unknown:
+            raise ValueError(f"Unknown range feature: {', '.join(sorted(unknown))}")
 
-        resultados = self.df.iloc[indices[0]].copy().reset_index(drop=True)
-        resultados["distancia"] = distances[0]
+        lows, highs = [], []
+        for name in AUDIO_FEATURES:
+            low, high = ranges.get(name, (None, None))
+            if low is not None and high is not None and low > high:
+                raise ValueError(f"{name} minimum is above its maximum")
+            lows.append(0.0 if low is None else low / 100.0)
+            highs.append(1.0 if high is None else high / 100.0)
+
+        # Slider units to the model's space, through the same scaler as the
+        # queries; open ends stay open.
+        scaled = self.preprocessor.transform(
+            pd.DataFrame([lows, highs], columns=list(AUDIO_FEATURES))
+        )
+        bounds = {}
+        for position, name in enumerate(AUDIO_FEATURES):
+            if name not in ranges:
+                continue
+            low, high = ranges[name]
+            bounds[self.features.index(name)] = (
+                -np.inf if low is None else scaled[0, position],
+                np.inf if high is None else scaled[1, position],
+            )
+        return bounds
+
+    def _range_candidates(self, bounds: Dict[int, Tuple[float, float]]) -> np.ndarray:
+        live = self._live
+        if not bounds:
+            return np.arange(live.size)
+
+        # The narrowest range picks the candidates; the others only check
+        # those rows.
+        sorted_columns = self._sorted_columns()
+        slices = {}
+        for column, (low, high) in bounds.items():
+            values, order = sorted_columns[column]
+            start = np.searchsorted(values, low, side="left")
+            stop = np.searchsorted(values, high, side="right")
+            slices[column] = order[start:stop]
+        narrowest = min(slices, key=lambda column: len(slices[column]))
+        candidates = np.sort(slices[narrowest])
+
+        matrix = self.model._fit_X
+        for column, (low, high) in bounds.items():
+            if column != narrowest:
+                values = matrix[candidates, column]
+                candidates = candidates[(values >= low) & (values <= high)]
+        # A main index compacted meanwhile may already hold the delta's rows.
+        candidates = candidates[candidates < live.base]
+
+        # The delta is small enough to check every row.
+        inside = np.ones(len(live.matrix), dtype=bool)
+        for column, (low, high) in bounds.items():
+            values = live.matrix[:, column]
+            inside &= (values >= low) & (values <= high)
+        return np.concatenate([candidates, np.flatnonzero(inside) + live.base])
+
+    def range_search(
+        self,
+        danceability: float,
+        energy: float,
+        acousticness: float,
+        valence: float,
+        is_popular: bool,
+        is_explicit: bool,
+        decade: str,
+        radius: Optional[float] = None,
+        ranges: Optional[Dict[str, Tuple[Optional[float], Optional[float]]]] = None,
+        exclude_ids: Optional[Collection[str]] = None,
+        chunk_size: int = MAX_PAGE_SIZE,
+        shown: Optional[ShownFilter] = None,
+    ) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        if self.model is None or self.df is None:
+            raise RuntimeError("Model or dataframe not loaded")
+        _check_sliders(danceability, energy, acousticness, valence)
+        if radius is not None and radius < 0:
+            raise ValueError(f"radius must not be negative, got {radius}")
 
-        if is_popular:
-            resultados = resultados[resultados["is_popular"] == 1]
+        query_key = make_query_key(
+            danceability,
+            energy,
+            acousticness,
+            valence,
+            is_popular,
+            is_explicit,
+            decade,
+        )
+        vector = self._query_vectors([query_key])[0]
+        bounds = self._scaled_ranges(ranges or {})
 
-        if is_explicit:
-            if "explicit" in resultados.columns:
-                resultados = resultados[resultados["explicit"] == 1]
+        # Nothing outside the radius' box can be within the radius, so it
+        # prunes through the sorted columns like any other range.
+        if radius is not None:
+            for name in AUDIO_FEATURES:
+                column = self.features.index(name)
+                low, high = bounds.get(column, (-np.inf, np.inf))
+                bounds[column] = (
+                    max(low, vector[column] - radius),
+                    min(high, vector[column] + radius),
+                )
 
-        if decade:
-            decade_col = decade + "s"
-            resultados = resultados[resultados[decade_col] == 1]
+        candidates = self._range_candidates(bounds)
+        candidates = candidates[self._keep(candidates, query_key, exclude_ids, shown)]
+        difference = self._rows(candidates) - vector
+        squared = np.einsum("ij,ij->i", difference, difference)
+        if radius is not None:
+            within = squared <= radius * radius
+            candidates, squared = candidates[within], squared[within]
 
-        artist_col = "artist" if "artist" in resultados.columns else "artists"
-        title_col = "title" if "title" in resultados.columns else "name"
+        return _in_distance_order(candidates, squared, max(1, chunk_size))
 
-        resultados = resultados[
-            (resultados[artist_col].notna())
-            & (resultados[artist_col] != "")
-            & (resultados[title_col].notna())
-            & (resultados[title_col] != "")
-        ].reset_index(drop=True)
+    def has_more(self, handle: RecommendationHandle) -> bool:
+        return handle.shown < len(handle.indices) or handle.searched < self._live.size
 
-        resultados = (
-            resultados.sort_values("distancia")
-            .reset_index(drop=True)
-            .head(min(top_n, 20))
+    def recommend(
+        self,
+        danceability: float,
+        energy: float,
+        acousticness: float,
+        valence: float,
+        is_popular: bool,
+        is_explicit: bool,
+        decade: str,
+        top_n: int = 5,
+        exclude_ids: Optional[Collection[str]] = None,
+        shown: Optional[ShownFilter] = None,
+    ) -> "pd.DataFrame":
+        handle = self.recommend_handle(
+            danceability=danceability,
+            energy=energy,
+            acousticness=acousticness,
+            valence=valence,
+            is_popular=is_popular,
+            is_explicit=is_explicit,
+            decade=decade,
+            top_n=top_n,
+            exclude_ids=exclude_ids,
+            shown=shown,
         )
+        return self.rows(handle)
+
+    def rows(self, handle: RecommendationHandle) -> "pd.DataFrame":
+        shown = slice(0, handle.shown)
+        resultados = self._frame(handle.indices[shown]).copy().reset_index(drop=True)
+        resultados["distancia"] = handle.distances[shown].astype(np.float64)
 
         if "track_id" in resultados.columns and "id" not in resultados.columns:
             resultados["id"] = resultados["track_id"]
 
         return resultados
 
+    def tracks(
+        self, handle: RecommendationHandle, start: int = 0, stop: Optional[int] = None
+    ) -> List[Dict]:
+        positions = handle.indices[start : handle.shown if stop is None else stop]
+        return self.tracks_at(positions)
+
+    def tracks_at(self, positions: np.ndarray) -> List[Dict]:
+        ids = self._filter_columns()["id"][positions]
+        if "genres" not in self.df.columns:
+            return [{"id": track_id} for track_id in ids]
+
+        genres = self._column_at("genres", positions)
+        return [
+            {"id": track_id, "genres": track_genres}
+            for track_id, track_genres in zip(ids, genres)
+        ]
+
+    def refresh_catalog(self) -> int:
+        # Only one thread applies updates; queries keep reading the previous
+        # delta until the new one is swapped in.
+        with self._catalog_lock:
+            updates = self._updates.read()
+            if updates:
+                self._apply_updates(updates)
+                if len(self._live.matrix) >= COMPACT_THRESHOLD:
+                    self.compact()
+        return len(updates)
+
+    def _follow_updates(self) -> None:
+        while True:
+            time.sleep(POLL_SECONDS)
+            try:
+                self.refresh_catalog()
+            except Exception as e:
+                print(f"❌ Error applying catalog updates: {e}")
+
+    def _track_rows(
+        self, tracks: List[Dict], base: int
+    ) -> Tuple[np.ndarray, "pd.DataFrame"]:
+        import pandas as pd
+
+        # A track's features go through the same path as the sliders.
+        keys = [
+            make_query_key(
+                track["danceability"] * 100.0,
+                track["energy"] * 100.0,
+                track["acousticness"] * 100.0,
+                track["valence"] * 100.0,
+                track.get("is_popular", False),
+                track.get("explicit", False),
+                decade_of(track.get("year")),
+            )
+            for track in tracks
+        ]
+        vectors = self._query_vectors(keys)
+
+        frame = pd.DataFrame(
+            [
+                {column: track.get(column) for column in self.df.columns}
+                for track in tracks
+            ],
+            columns=self.df.columns,
+            index=pd.RangeIndex(base, base + len(tracks)),
+        )
+        for position, name in enumerate(self.features):
+            frame[name] = vectors[:, position].astype(self.df[name].dtype)
+        return vectors, frame
+
+    def _apply_updates(self, updates: List[Dict]) -> None:
+        import pandas as pd
+
+        live = self._live
+        ids = dict(live.ids)
+        removed = set(live.removed)
+        added = []
+        # An id added again replaces its earlier row, which becomes a
+        # tombstone like a removed one.
+        for update in updates:
+            position = ids.pop(update["id"], None)
+            if position is None:
+                position = self._main_position(update["id"])
+            if position is not None:
+                removed.add(position)
+            if update["op"] == "add":
+                ids[update["id"]] = live.size + len(added)
+                added.append(update["track"])
+
+        matrix, frame = live.matrix, live.frame
+        if added:
+            vectors, new_frame = self._track_rows(added, live.size)
+            matrix = np.concatenate([matrix, vectors])
+            frame = new_frame if frame is None else pd.concat([frame, new_frame])
+
+        main = self._main_columns()
+        if frame is not None:
+            delta = _frame_columns(frame)
+            columns = {
+                name: np.concatenate([values[: live.base], delta[name]])
+                for name, values in main.items()
+            }
+        else:
+            columns = {
+                name: values[: live.base].copy() for name, values in main.items()
+            }
+        columns["valid"][list(removed)] = False
+
+        self._live = DeltaSegment(
+            base=live.base,
+            matrix=matrix,
+            frame=frame,
+            ids=ids,
+            removed=frozenset(removed),
+            columns=columns,
+            generation=live.generation + 1,
+        )
+        with self._neighbor_lock:
+            self._neighbor_cache.clear()
+        print(
+            f"🆕 Catalog: {len(added)} tracks added, "
+            f"{len(updates) - len(added)} removed, {len(matrix)} in the delta"
+        )
+
+    def compact(self) -> None:
+        # Folds the delta into a new main index in the background thread;
+        # queries keep using the old one until the swap. Removed tracks stay
+        # as tombstones so every position still points at the same track.
+        with self._catalog_lock:
+            live = self._live
+            if len(live.matrix):
+                self._compact(live)
+
+    def _compact(self, live: DeltaSegment) -> None:
+        import pandas as pd
+        from sklearn.neighbors import NearestNeighbors
+
+        started = time.perf_counter()
+        matrix = np.concatenate([self.model._fit_X, live.matrix])
+        model = NearestNeighbors(**self.model.get_params()).fit(matrix)
+        index = self._index
+        if isinstance(index, SegmentIndex):
+            index = SegmentIndex(matrix)
+        elif isinstance(index, CompactIndex):
+            index = CompactIndex(matrix, index.layout)
+        df = pd.concat([self.df, live.frame])
+
+        ids = live.columns["id"].copy()
+        ids[list(live.removed)] = None
+        id_index = pd.Index(ids)
+
+        # The main side first: a query holding the old delta then finds its
+        # rows in both, and results are merged by position.
+        self.df = df
+        self.model = model
+        self._index = index
+        self._id_index = id_index
+        self._columns = live.columns
+        self._live = empty_delta(
+            len(matrix),
+            matrix.shape[1],
+            removed=live.removed,
+            columns=live.columns,
+            generation=live.generation + 1,
+        )
+        with self._neighbor_lock:
+            self._neighbor_cache.clear()
+        print(
+            f"🗜️ Catalog: {len(live.matrix)} tracks compacted into the index in "
+            f"{time.perf_counter() - started:.2f}s"
+        )
+
     def get_features_list(self) -> List[str]:
         return self.features if self.features else []
 
     def get_dataset_size(self) -> int:
-        return len(self.df) if self.df is not None else 0
+        if self.df is None:
+            return 0
+        live = self._live
+        return live.size - len(live.removed)
+
+
+def _frame_columns(df: "pd.DataFrame") -> Dict[str, np.ndarray]:
+    artist_col = "artist" if "artist" in df.columns else "artists"
+    title_col = "title" if "title" in df.columns else "name"
+    id_col = "id" if "id" in df.columns else "track_id"
+    columns = {
+        "valid": (
+            df[artist_col].notna()
+            & (df[artist_col] != "")
+            & df[title_col].notna()
+            & (df[title_col] != "")
+        ).to_numpy(),
+        "is_popular": (df["is_popular"] == 1).to_numpy(),
+        "id": df[id_col].to_numpy(),
+    }
+    if "explicit" in df.columns:
+        columns["explicit"] = (df["explicit"] == 1).to_numpy()
+    for column in df.columns:
+        if len(column) == 5 and column.endswith("0s") and column[:4].isdigit():
+            columns[column] = (df[column] == 1).to_numpy()
+    return columns
+
+
+def _merged(
+    distances: np.ndarray, indices: np.ndarray, n_neighbors: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    # Main and delta results side by side per query, nearest first; a row
+    # found in both (mid-compaction) is kept once.
+    merged = []
+    for row_distances, row_indices in zip(distances, indices):
+        order = np.lexsort((row_indices, row_distances))
+        _, first = np.unique(row_indices[order], return_index=True)
+        order = order[np.sort(first)][:n_neighbors]
+        merged.append((row_distances[order], row_indices[order]))
+    width = min(len(row_indices) for _, row_indices in merged)
+    return (
+        np.stack([row_distances[:width] for row_distances, _ in merged]),
+        np.stack([row_indices[:width] for _, row_indices in merged]),
+    )
+
+
+def _in_distance_order(
+    rows: np.ndarray, squared: np.ndarray, chunk_size: int
+) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    # Blocks of doubling size are split off the rest and sorted, so the
+    # first chunks go out without sorting every match.
+    block = chunk_size
+    while len(rows):
+        if len(rows) > block:
+            parts = np.argpartition(squared, block - 1)
+            head, rest = parts[:block], parts[block:]
+        else:
+            head, rest = np.arange(len(rows)), np.arange(0)
+        head = head[np.lexsort((rows[head], squared[head]))]
+        for start in range(0, len(head), chunk_size):
+            piece = head[start : start + chunk_size]
+            yield rows[piece], np.sqrt(squared[piece])
+        rows, squared = rows[rest], squared[rest]
+        block *= 2
 
 
 _recommender = None
@@ -132,7 +952,9 @@ def recommend(
     is_explicit: bool,
     decade: str,
     top_n: int = 5,
-) -> pd.DataFrame:
+    exclude_ids: Optional[Collection[str]] = None,
+    shown: Optional[ShownFilter] = None,
+) -> "pd.DataFrame":
     return get_recommender().recommend(
         danceability=danceability,
         energy=energy,
@@ -142,4 +964,90 @@ def recommend(
         is_explicit=is_explicit,
         decade=decade,
         top_n=top_n,
+        exclude_ids=exclude_ids,
+        shown=shown,
+    )
+
+
+def recommend_handle(
+    danceability: float,
+    energy: float,
+    acousticness: float,
+    valence: float,
+    is_popular: bool,
+    is_explicit: bool,
+    decade: str,
+    top_n: int = 5,
+    exclude_ids: Optional[Collection[str]] = None,
+    shown: Optional[ShownFilter] = None,
+) -> RecommendationHandle:
+    return get_recommender().recommend_handle(
+        danceability=danceability,
+        energy=energy,
+        acousticness=acousticness,
+        valence=valence,
+        is_popular=is_popular,
+        is_explicit=is_explicit,
+        decade=decade,
+        top_n=top_n,
+        exclude_ids=exclude_ids,
+        shown=shown,
+    )
+
+
+def similar_handle(
+    track_id: str,
+    top_n: int = 5,
+    exclude_ids: Optional[Collection[str]] = None,
+    shown: Optional[ShownFilter] = None,
+) -> RecommendationHandle:
+    return get_recommender().similar_handle(track_id, top_n, exclude_ids, shown)
+
+
+def next_page(
+    handle: RecommendationHandle,
+    page_size: int,
+    exclude_ids: Optional[Collection[str]] = None,
+    shown: Optional[ShownFilter] = None,
+) -> RecommendationHandle:
+    return get_recommender().next_page(handle, page_size, exclude_ids, shown)
+
+
+def has_more(handle: RecommendationHandle) -> bool:
+    return get_recommender().has_more(handle)
+
+
+def get_tracks(
+    handle: RecommendationHandle, start: int = 0, stop: Optional[int] = None
+) -> List[Dict]:
+    return get_recommender().tracks(handle, start, stop)
+
+
+def range_search(
+    danceability: float,
+    energy: float,
+    acousticness: float,
+    valence: float,
+    is_popular: bool,
+    is_explicit: bool,
+    decade: str,
+    radius: Optional[float] = None,
+    ranges: Optional[Dict[str, Tuple[Optional[float], Optional[float]]]] = None,
+    exclude_ids: Optional[Collection[str]] = None,
+    chunk_size: int = MAX_PAGE_SIZE,
+    shown: Optional[ShownFilter] = None,
+) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    return get_recommender().range_search(
+        danceability=danceability,
+        energy=energy,
+        acousticness=acousticness,
+        valence=valence,
+        is_popular=is_popular,
+        is_explicit=is_explicit,
+        decade=decade,
+        radius=radius,
+        ranges=ranges,
+        exclude_ids=exclude_ids,
+        chunk_size=chunk_size,
+        shown=shown,
     )
@@ -0,0 +1,112 @@
+import time
+from typing import List, Tuple
+
+import numpy as np
+
+from .compact_index import indicator_columns
+
+LEAF_SIZE = 40
+# Past this many neighbors the trees' heaps cost more than one full scan.
+BRUTE_NEIGHBORS = 4096
+
+
+class SegmentIndex:
+    def __init__(self, matrix: np.ndarray, leaf_size: int = LEAF_SIZE):
+        # Imported here so the page can render before sklearn loads.
+        from sklearn.neighbors import KDTree
+
+        self.matrix = matrix
+        self.size = len(matrix)
+        binary = indicator_columns(matrix)
+        self.binary_columns = np.flatnonzero(binary)
+        self.continuous_columns = np.flatnonzero(~binary)
+
+        # One segment per combination of the indicator columns, each with a
+        # KD-tree over the audio features alone.
+        # The indicators are read as the bits of one integer per row: unique
+        # integers are found far faster than unique rows.
+        bits = 1 << np.arange(len(self.binary_columns), dtype=np.int64)
+        codes = matrix[:, self.binary_columns].astype(np.int64) @ bits
+        _, first, ids = np.unique(codes, return_index=True, return_inverse=True)
+        ids = ids.reshape(-1)
+        self.signatures = matrix[np.ix_(first, self.binary_columns)]
+        order = np.argsort(ids, kind="stable")
+        bounds = np.concatenate([[0], np.cumsum(np.bincount(ids))])
+
+        self.segments: List[Tuple[np.ndarray, "KDTree"]] = []
+        for start, stop in zip(bounds[:-1], bounds[1:]):
+            rows = order[start:stop]
+            points = matrix[np.ix_(rows, self.continuous_columns)]
+            self.segments.append((rows, KDTree(points, leaf_size=leaf_size)))
+            # Tree builds hold the GIL: when rebuilt next to live queries, let
+            # them in between segments.
+            time.sleep(0)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def search_one(
+        self, vector: np.ndarray, n_neighbors: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        n_neighbors = min(n_neighbors, self.size)
+        if n_neighbors > BRUTE_NEIGHBORS:
+            return self._scan(vector, n_neighbors)
+
+        difference = self.signatures - vector[self.binary_columns]
+        # Every row of a segment is at least this far away in the indicator
+        # columns, whatever its audio features.
+        floors = np.einsum("ij,ij->i", difference, difference)
+        point = vector[self.continuous_columns][None]
+
+        found_squared: List[np.ndarray] = []
+        found_rows: List[np.ndarray] = []
+        found = 0
+        kth = np.inf
+        for segment in np.argsort(floors, kind="stable"):
+            # Segments come nearest first: once one can't beat the k-th
+            # distance so far, none of the rest can either.
+            if floors[segment] >= kth:
+                break
+            rows, tree = self.segments[segment]
+            if found < n_neighbors:
+                count = min(n_neighbors, len(rows))
+                distances, positions = tree.query(point, k=count)
+                distances, positions = distances[0], positions[0]
+            else:
+                # Only rows that would beat the current k-th can matter.
+                radius = np.sqrt(kth - floors[segment])
+                positions, distances = tree.query_radius(
+                    point, radius, return_distance=True
+                )
+                distances, positions = distances[0], positions[0]
+                count = len(positions)
+            found_squared.append(distances**2 + floors[segment])
+            found_rows.append(rows[positions])
+            found += count
+            if found >= n_neighbors:
+                squared = np.concatenate(found_squared)
+                kth = np.partition(squared, n_neighbors - 1)[n_neighbors - 1]
+
+        squared = np.concatenate(found_squared)
+        rows = np.concatenate(found_rows)
+        order = np.lexsort((rows, squared))[:n_neighbors]
+        return np.sqrt(squared[order]), rows[order]
+
+    def _scan(
+        self, vector: np.ndarray, n_neighbors: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        difference = self.matrix - vector
+        squared = np.einsum("ij,ij->i", difference, difference)
+        rows = np.argpartition(squared, n_neighbors - 1)[:n_neighbors]
+        order = np.lexsort((rows, squared[rows]))
+        return np.sqrt(squared[rows][order]), rows[order]
+
+    def search(
+        self, vectors: np.ndarray, n_neighbors: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        vectors = np.asarray(vectors, dtype=np.float64)
+        results = [self.search_one(vector, n_neighbors) for vector in vectors]
+        return (
+            np.stack([distances for distances, _ in results]),
+            np.stack([indices for _, indices in results]),
+        )
@@ -1,13 +1,8 @@
 import streamlit as st
-from dotenv import load_dotenv
 
+from services.token_manager import CLIENT_ID, CLIENT_SECRET
 from ui.layout import init_app
 
-load_dotenv()
-
-CLIENT_ID = st.secrets.spotify_credentials.client_id
-CLIENT_SECRET = st.secrets.spotify_credentials.client_secret
-
 if not CLIENT_ID or not CLIENT_SECRET:
     st.error(
         "❌ Erro de Configuração\n\n"
@@ -1,16 +1,33 @@
+from .metadata_store import MetadataStore, get_metadata_store
+from .negative_cache import get_negative_cache
 from .spotify_api import (
     SpotifyAPIError,
+    SpotifyNotFoundError,
+    SpotifyRateLimitError,
+    SpotifyUnavailableError,
     fetch_spotify_data_parallel,
+    get_artists_by_ids,
     get_best_album_image,
     get_track_by_id,
+    get_tracks_by_ids,
+    stream_spotify_data,
 )
 from .token_manager import get_access_token, get_token_manager
 
 __all__ = [
     "SpotifyAPIError",
+    "SpotifyNotFoundError",
+    "SpotifyRateLimitError",
+    "SpotifyUnavailableError",
     "get_track_by_id",
+    "get_tracks_by_ids",
+    "get_artists_by_ids",
     "fetch_spotify_data_parallel",
+    "stream_spotify_data",
     "get_best_album_image",
     "get_access_token",
     "get_token_manager",
+    "MetadataStore",
+    "get_metadata_store",
+    "get_negative_cache",
 ]
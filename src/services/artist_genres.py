@@ -0,0 +1,65 @@
+import threading
+from typing import Callable, Dict, Iterable, List, Optional
+
+from .metadata_store import get_metadata_store
+from .single_flight import SingleFlight
+
+MAX_ARTISTS_PER_REQUEST = 50
+
+
+class ArtistGenreCache:
+    def __init__(self, fetch_artists: Callable[[List[str]], List[Optional[Dict]]]):
+        # Shared by every session: artists repeat heavily across pages, so
+        # after warm-up most pages need no artist call at all.
+        self.fetch_artists = fetch_artists
+        self._genres: Dict[str, List[str]] = {}
+        self._lock = threading.Lock()
+        self._flights = SingleFlight()
+
+    def get_cached(self, artist_ids: Iterable[str]) -> Optional[Dict[str, List[str]]]:
+        found = {}
+        for artist_id in artist_ids:
+            genres = self._genres.get(artist_id)
+            if genres is None:
+                return None
+            found[artist_id] = genres
+        return found
+
+    def resolve(self, artist_ids: Iterable[str]) -> Dict[str, List[str]]:
+        ids = [artist_id for artist_id in dict.fromkeys(artist_ids) if artist_id]
+        missing = [artist_id for artist_id in ids if artist_id not in self._genres]
+        if missing:
+            loaded = self._flights.do_many(missing, self._load)
+            with self._lock:
+                self._genres.update({k: v for k, v in loaded.items() if v is not None})
+        return {artist_id: self._genres.get(artist_id, []) for artist_id in ids}
+
+    def _load(self, artist_ids: List[str]) -> Dict[str, List[str]]:
+        store = get_metadata_store()
+        try:
+            found = store.get_artist_genres(artist_ids)
+        except Exception as e:
+            print(f"⚠️ Could not read artist genres: {e}")
+            found = {}
+
+        missing = [artist_id for artist_id in artist_ids if artist_id not in found]
+        fetched = {}
+        for start in range(0, len(missing), MAX_ARTISTS_PER_REQUEST):
+            chunk = missing[start : start + MAX_ARTISTS_PER_REQUEST]
+            for artist_id, artist in zip(chunk, self.fetch_artists(chunk)):
+                # Unknown artists are cached as genre-less so they aren't
+                # asked for again on every page.
+                fetched[artist_id] = artist.get("genres", []) if artist else []
+
+        try:
+            store.put_artist_genres(fetched)
+        except Exception as e:
+            print(f"⚠️ Could not write artist genres: {e}")
+
+        found.update(fetched)
+        return found
+
+
+def format_genres(artist_ids: Iterable[str], genres: Dict[str, List[str]]) -> str:
+    ordered = [genre for artist_id in artist_ids for genre in genres.get(artist_id, [])]
+    return ", ".join(dict.fromkeys(ordered))
@@ -0,0 +1,254 @@
+import asyncio
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future
+from typing import Coroutine, Dict, Iterator, List, Optional, Tuple
+
+from tornado.httpclient import AsyncHTTPClient, HTTPRequest
+
+from . import single_flight, spotify_api
+from .negative_cache import get_negative_cache
+from .rate_limiter import CONCURRENCY_MAX, get_concurrency_limiter, get_token_bucket
+from .spotify_api import (
+    MAX_RETRIES,
+    REQUEST_TIMEOUT_SECONDS,
+    RETRY_DEADLINE_SECONDS,
+    SpotifyAPIError,
+    SpotifyNotFoundError,
+    SpotifyRateLimitError,
+    SpotifyUnavailableError,
+    _load_stored_entries,
+    _lookup_failed,
+    _lookup_succeeded,
+    _parse_retry_after,
+    _parse_track,
+    _retry_backoff,
+    _store_entries,
+    _unknown_track,
+    iter_ranked_items,
+    partition_track_ids,
+    track_to_store_entry,
+)
+from .token_manager import get_access_token
+
+ASYNC_ENGINE_ENABLED = os.getenv("SPOTIFY_ASYNC_ENGINE", "0") == "1"
+ASYNC_MAX_CONCURRENCY = int(
+    os.getenv("SPOTIFY_ASYNC_CONCURRENCY", str(CONCURRENCY_MAX))
+)
+
+
+class AsyncEnrichmentEngine:
+    def __init__(self, max_concurrency: int = ASYNC_MAX_CONCURRENCY):
+        # One loop per process, shared by every session. In-flight requests
+        # count against the same adaptive limit as the thread pool's, without
+        # a thread each; max_concurrency only caps the HTTP client.
+        self.max_concurrency = max_concurrency
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._run_loop, name="enrichment-loop", daemon=True
+        )
+        self._thread.start()
+        self._flights: Dict[str, asyncio.Future] = {}
+        self.submit(self._setup()).result()
+
+    def _run_loop(self) -> None:
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_forever()
+
+    async def _setup(self) -> None:
+        self._client = AsyncHTTPClient(
+            force_instance=True, max_clients=self.max_concurrency
+        )
+
+    def submit(self, coro: Coroutine) -> Future:
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    async def _get(self, url: str, access_token: Optional[str]) -> Dict:
+        if access_token is None:
+            raise SpotifyAPIError("Could not obtain access token")
+
+        headers = {"Authorization": f"Bearer {access_token}"}
+        bucket = get_token_bucket()
+        limiter = get_concurrency_limiter()
+        breaker = spotify_api._breaker
+        last_error: Exception = SpotifyAPIError(f"No attempt made for {url}")
+        deadline = time.monotonic() + RETRY_DEADLINE_SECONDS
+
+        for attempt in range(MAX_RETRIES + 1):
+            if not breaker.allow_request():
+                raise SpotifyUnavailableError(
+                    "Spotify circuit is open, skipping request"
+                )
+
+            wait = bucket.try_acquire()
+            while wait > 0:
+                if time.monotonic() + wait > deadline:
+                    raise SpotifyRateLimitError(
+                        f"Rate limited, no request slot before the retry deadline "
+                        f"for {url}"
+                    )
+                await asyncio.sleep(wait)
+                wait = bucket.try_acquire()
+
+            request = HTTPRequest(
+                url, headers=headers, request_timeout=REQUEST_TIMEOUT_SECONDS
+            )
+            await limiter.acquire_async()
+            started = time.monotonic()
+            try:
+                response = await self._client.fetch(request, raise_error=False)
+            finally:
+                limiter.release()
+            latency = time.monotonic() - started
+
+            # Tornado reports timeouts and connection errors as code 599.
+            if response.code == 599:
+                breaker.record_failure()
+                limiter.on_overload(latency)
+                last_error = SpotifyAPIError(
+                    f"Request to {url} failed: {response.error}"
+                )
+                backoff = _retry_backoff(attempt, deadline)
+                if backoff is None:
+                    break
+                await asyncio.sleep(backoff)
+                continue
+
+            if response.code == 429:
+                retry_after = _parse_retry_after(response.headers.get("Retry-After"))
+                bucket.block_for(retry_after)
+                limiter.on_overload(latency)
+                last_error = SpotifyRateLimitError(
+                    f"Rate limited by Spotify (Retry-After: {retry_after:.1f}s)"
+                )
+                if time.monotonic() + retry_after > deadline:
+                    break
+                print(f"⏳ Spotify rate limit hit, retrying after {retry_after:.1f}s")
+                continue
+
+            if response.code >= 500:
+                breaker.record_failure()
+                limiter.on_overload(latency)
+                last_error = SpotifyAPIError(
+                    f"Spotify server error {response.code} for {url}"
+                )
+                backoff = _retry_backoff(attempt, deadline)
+                if backoff is None:
+                    break
+                await asyncio.sleep(backoff)
+                continue
+
+            bucket.on_success()
+            limiter.on_success(latency)
+            breaker.record_success()
+            if response.code == 404:
+                raise SpotifyNotFoundError(
+                    f"Spotify returned {response.code} for {url}"
+                )
+            if response.code >= 300:
+                raise SpotifyAPIError(f"Request to {url} failed: {response.code}")
+            return json.loads(response.body)
+
+        raise last_error
+
+    async def _lookup_uncoalesced(
+        self, track_id: str, access_token: Optional[str]
+    ) -> Optional[Dict]:
+        stored = _load_stored_entries([track_id])
+        if track_id in stored:
+            return stored[track_id]
+
+        url = f"{spotify_api.SPOTIFY_API_BASE}/tracks/{track_id}"
+        try:
+            payload = await spotify_api._hedger.call_async(
+                lambda: self._get(url, access_token)
+            )
+        except SpotifyAPIError as e:
+            raise type(e)(f"Failed to fetch track {track_id}: {e}")
+
+        entry = track_to_store_entry(_parse_track(payload))
+        _store_entries({track_id: entry})
+        return entry
+
+    async def lookup_track(
+        self, track_id: str, access_token: Optional[str]
+    ) -> Optional[Dict]:
+        if not single_flight.COALESCING_ENABLED:
+            return await self._lookup_uncoalesced(track_id, access_token)
+
+        flight = self._flights.get(track_id)
+        if flight is None:
+            flight = asyncio.ensure_future(
+                self._lookup_uncoalesced(track_id, access_token)
+            )
+            self._flights[track_id] = flight
+            flight.add_done_callback(lambda _: self._flights.pop(track_id, None))
+        # A session abandoning its stream must not cancel the shared lookup.
+        return await asyncio.shield(flight)
+
+    async def fetch_spotify_data_by_id(
+        self, track_id: str, access_token: Optional[str]
+    ) -> Dict:
+        if get_negative_cache().is_blocked(track_id):
+            return _unknown_track()
+
+        try:
+            entry = await self.lookup_track(track_id, access_token)
+        except Exception as e:
+            return _lookup_failed(track_id, e)
+        return _lookup_succeeded(track_id, entry)
+
+    def stream_spotify_data(self, tracks: List[Dict]) -> Iterator[Tuple[int, Dict]]:
+        if not tracks:
+            return
+
+        stored, blocked, missing = partition_track_ids(
+            [track.get("id", "") for track in tracks]
+        )
+
+        access_token = None
+        if missing:
+            try:
+                access_token = get_access_token()
+            except RuntimeError as e:
+                print(f"⚠️ Could not obtain access token: {e}")
+
+        futures = {
+            track_id: self.submit(self.fetch_spotify_data_by_id(track_id, access_token))
+            for track_id in missing
+        }
+        try:
+            yield from iter_ranked_items(tracks, stored, blocked, futures)
+        finally:
+            # A rerun may abandon the stream midway; cancel what's left.
+            for future in futures.values():
+                future.cancel()
+
+    def fetch_spotify_data(self, tracks: List[Dict]) -> List[Dict]:
+        items: List[Optional[Dict]] = [None] * len(tracks)
+        for rank, item in self.stream_spotify_data(tracks):
+            items[rank] = item
+        return items
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_async_engine() -> AsyncEnrichmentEngine:
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = AsyncEnrichmentEngine()
+    return _engine
+
+
+def stream_spotify_data(tracks: List[Dict]) -> Iterator[Tuple[int, Dict]]:
+    return get_async_engine().stream_spotify_data(tracks)
+
+
+def fetch_spotify_data(tracks: List[Dict]) -> List[Dict]:
+    return get_async_engine().fetch_spotify_data(tracks)
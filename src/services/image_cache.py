@@ -0,0 +1,138 @@
+import hashlib
+import io
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+
+from .metadata_store import get_metadata_store
+
+STATIC_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "../static"))
+THUMBNAIL_DIR = os.path.join(STATIC_PATH, "thumbs")
+THUMBNAIL_URL_PREFIX = "app/static/thumbs"
+THUMBNAILS_ENABLED = os.getenv("THUMBNAILS_ENABLED", "1") != "0"
+
+# Cards render at roughly 140px on mobile and 200-260px on desktop.
+THUMBNAIL_WIDTHS = (128, 256)
+THUMBNAIL_QUALITY = 75
+CARD_IMAGE_SIZES = "(max-width: 800px) 140px, 240px"
+
+IMAGE_FETCH_TIMEOUT_SECONDS = 10
+THUMBNAIL_WORKERS = 2
+
+
+def _thumbnail_filename(content_key: str, width: int) -> str:
+    return f"{content_key}-{width}.webp"
+
+
+def thumbnail_srcset(content_key: str) -> str:
+    return ", ".join(
+        f"{THUMBNAIL_URL_PREFIX}/{_thumbnail_filename(content_key, width)} {width}w"
+        for width in THUMBNAIL_WIDTHS
+    )
+
+
+def build_thumbnails(image_bytes: bytes) -> str:
+    from PIL import Image
+
+    content_key = hashlib.sha256(image_bytes).hexdigest()[:32]
+    os.makedirs(THUMBNAIL_DIR, exist_ok=True)
+
+    targets = {
+        width: os.path.join(THUMBNAIL_DIR, _thumbnail_filename(content_key, width))
+        for width in THUMBNAIL_WIDTHS
+    }
+    if all(os.path.exists(path) for path in targets.values()):
+        return content_key
+
+    with Image.open(io.BytesIO(image_bytes)) as source:
+        source = source.convert("RGB")
+        for width, path in targets.items():
+            if os.path.exists(path):
+                continue
+            thumb = source.copy()
+            thumb.thumbnail((width, width), Image.Resampling.LANCZOS)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            thumb.save(tmp_path, "WEBP", quality=THUMBNAIL_QUALITY, method=6)
+            os.replace(tmp_path, path)
+
+    return content_key
+
+
+def cache_album_image(url: str) -> Optional[str]:
+    import requests
+
+    response = requests.get(url, timeout=IMAGE_FETCH_TIMEOUT_SECONDS)
+    response.raise_for_status()
+
+    content_key = build_thumbnails(response.content)
+    get_metadata_store().put_image_key(url, content_key)
+    return content_key
+
+
+class ThumbnailCache:
+    def __init__(self):
+        self._keys: Optional[Dict[str, str]] = None
+        self._pending = set()
+        self._failed = set()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=THUMBNAIL_WORKERS, thread_name_prefix="thumbnails"
+        )
+
+    def _known_keys(self) -> Dict[str, str]:
+        if self._keys is None:
+            with self._lock:
+                if self._keys is None:
+                    try:
+                        self._keys = get_metadata_store().get_image_keys()
+                    except Exception as e:
+                        print(f"⚠️ Could not read thumbnail index: {e}")
+                        self._keys = {}
+        return self._keys
+
+    def get_srcset(self, url: Optional[str]) -> Optional[str]:
+        if not url or not THUMBNAILS_ENABLED:
+            return None
+
+        content_key = self._known_keys().get(url)
+        largest = _thumbnail_filename(content_key or "", max(THUMBNAIL_WIDTHS))
+        if content_key is not None and os.path.exists(
+            os.path.join(THUMBNAIL_DIR, largest)
+        ):
+            return thumbnail_srcset(content_key)
+
+        self._schedule(url)
+        return None
+
+    def _schedule(self, url: str) -> None:
+        with self._lock:
+            if url in self._pending or url in self._failed:
+                return
+            self._pending.add(url)
+        self._executor.submit(self._build, url)
+
+    def _build(self, url: str) -> None:
+        try:
+            content_key = cache_album_image(url)
+            self._known_keys()[url] = content_key
+        except Exception as e:
+            print(f"⚠️ Could not build thumbnail for {url}: {e}")
+            with self._lock:
+                self._failed.add(url)
+        finally:
+            with self._lock:
+                self._pending.discard(url)
+
+
+_thumbnail_cache = None
+_thumbnail_cache_lock = threading.Lock()
+
+
+def get_thumbnail_cache() -> ThumbnailCache:
+    global _thumbnail_cache
+    if _thumbnail_cache is None:
+        with _thumbnail_cache_lock:
+            if _thumbnail_cache is None:
+                _thumbnail_cache = ThumbnailCache()
+    return _thumbnail_cache
@@ -0,0 +1,200 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Set
+
+ASSETS_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "../assets"))
+METADATA_DB_PATH = os.getenv(
+    "SPOTIFY_METADATA_DB", os.path.join(ASSETS_PATH, "datasets/spotify_metadata.sqlite")
+)
+
+# SQLite caps the number of bound parameters per statement.
+_QUERY_CHUNK = 500
+
+
+class MetadataStore:
+    def __init__(self, path: str = METADATA_DB_PATH):
+        self.path = path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connection() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS tracks (
+                    id TEXT PRIMARY KEY,
+                    title TEXT NOT NULL,
+                    artist TEXT NOT NULL,
+                    images TEXT NOT NULL,
+                    spotify_url TEXT,
+                    fetched_at REAL NOT NULL,
+                    artist_ids TEXT
+                ) WITHOUT ROWID
+                """
+            )
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(tracks)")}
+            if "artist_ids" not in columns:
+                conn.execute("ALTER TABLE tracks ADD COLUMN artist_ids TEXT")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS artists (
+                    id TEXT PRIMARY KEY,
+                    genres TEXT NOT NULL,
+                    fetched_at REAL NOT NULL
+                ) WITHOUT ROWID
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS dead_tracks (
+                    id TEXT PRIMARY KEY,
+                    expires_at REAL NOT NULL
+                ) WITHOUT ROWID
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS album_images (
+                    url TEXT PRIMARY KEY,
+                    content_key TEXT NOT NULL
+                ) WITHOUT ROWID
+                """
+            )
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            self._local.conn = conn
+        return conn
+
+    def get_many(self, track_ids: Iterable[str]) -> Dict[str, Dict]:
+        ids = [track_id for track_id in dict.fromkeys(track_ids) if track_id]
+        found = {}
+        conn = self._connection()
+
+        for start in range(0, len(ids), _QUERY_CHUNK):
+            chunk = ids[start : start + _QUERY_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            rows = conn.execute(
+                "SELECT id, title, artist, images, spotify_url, artist_ids FROM tracks "
+                f"WHERE id IN ({placeholders})",
+                chunk,
+            )
+            for track_id, title, artist, images, spotify_url, artist_ids in rows:
+                found[track_id] = {
+                    "title": title,
+                    "artist": artist,
+                    "images": json.loads(images),
+                    "spotify_url": spotify_url,
+                    "artist_ids": json.loads(artist_ids) if artist_ids else [],
+                }
+
+        return found
+
+    def put_many(self, tracks: Dict[str, Dict]) -> None:
+        if not tracks:
+            return
+
+        now = time.time()
+        rows = [
+            (
+                track_id,
+                data["title"],
+                data["artist"],
+                json.dumps(data.get("images", [])),
+                data.get("spotify_url"),
+                now,
+                json.dumps(data.get("artist_ids", [])),
+            )
+            for track_id, data in tracks.items()
+        ]
+        with self._connection() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO tracks "
+                "(id, title, artist, images, spotify_url, fetched_at, artist_ids) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    def known_ids(self) -> Set[str]:
+        return {row[0] for row in self._connection().execute("SELECT id FROM tracks")}
+
+    def missing_ids(self, track_ids: Iterable[str]) -> List[str]:
+        ids = list(dict.fromkeys(track_ids))
+        found = self.get_many(ids)
+        return [track_id for track_id in ids if track_id not in found]
+
+    def get_dead_ids(self) -> Dict[str, float]:
+        rows = self._connection().execute(
+            "SELECT id, expires_at FROM dead_tracks WHERE expires_at > ?",
+            (time.time(),),
+        )
+        return dict(rows)
+
+    def put_dead_ids(self, track_ids: Iterable[str], expires_at: float) -> None:
+        with self._connection() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO dead_tracks (id, expires_at) VALUES (?, ?)",
+                [(track_id, expires_at) for track_id in track_ids],
+            )
+
+    def get_artist_genres(self, artist_ids: Iterable[str]) -> Dict[str, List[str]]:
+        ids = [artist_id for artist_id in dict.fromkeys(artist_ids) if artist_id]
+        found = {}
+        conn = self._connection()
+
+        for start in range(0, len(ids), _QUERY_CHUNK):
+            chunk = ids[start : start + _QUERY_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            rows = conn.execute(
+                f"SELECT id, genres FROM artists WHERE id IN ({placeholders})", chunk
+            )
+            for artist_id, genres in rows:
+                found[artist_id] = json.loads(genres)
+
+        return found
+
+    def put_artist_genres(self, artists: Dict[str, List[str]]) -> None:
+        if not artists:
+            return
+
+        now = time.time()
+        with self._connection() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO artists (id, genres, fetched_at) "
+                "VALUES (?, ?, ?)",
+                [
+                    (artist_id, json.dumps(genres), now)
+                    for artist_id, genres in artists.items()
+                ],
+            )
+
+    def get_image_keys(self) -> Dict[str, str]:
+        rows = self._connection().execute("SELECT url, content_key FROM album_images")
+        return dict(rows)
+
+    def put_image_key(self, url: str, content_key: str) -> None:
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO album_images (url, content_key) VALUES (?, ?)",
+                (url, content_key),
+            )
+
+    def count(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM tracks").fetchone()[0]
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_metadata_store() -> MetadataStore:
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = MetadataStore()
+    return _store
@@ -0,0 +1,107 @@
+import os
+import threading
+import time
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+from .metadata_store import get_metadata_store
+
+PERMANENT_TTL_SECONDS = 7 * 24 * 3600
+TRANSIENT_TTL_SECONDS = 30.0
+TRANSIENT_MAX_TTL_SECONDS = 300.0
+# Past this many transient failures the expired ones are dropped, and then the
+# oldest if that isn't enough.
+TRANSIENT_MAX_ENTRIES = 10000
+EXCLUDE_DEAD_FROM_RECOMMENDATIONS = os.getenv("EXCLUDE_DEAD_TRACKS", "1") != "0"
+
+
+class NegativeCache:
+    def __init__(self):
+        # Permanent failures (404, or null in a batch lookup) are persisted in
+        # the metadata store; transient ones only live in memory with a growing backoff.
+        self._dead: Optional[Dict[str, float]] = None
+        self._transient: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def _dead_ids(self) -> Dict[str, float]:
+        if self._dead is None:
+            with self._lock:
+                if self._dead is None:
+                    try:
+                        self._dead = get_metadata_store().get_dead_ids()
+                    except Exception as e:
+                        print(f"⚠️ Could not read dead track ids: {e}")
+                        self._dead = {}
+        return self._dead
+
+    def is_blocked(self, track_id: str) -> bool:
+        now = time.time()
+        expires_at = self._dead_ids().get(track_id)
+        if expires_at is not None and expires_at > now:
+            return True
+
+        transient = self._transient.get(track_id)
+        return transient is not None and transient[0] > now
+
+    def record_permanent(self, track_ids: Iterable[str]) -> None:
+        track_ids = list(track_ids)
+        if not track_ids:
+            return
+
+        expires_at = time.time() + PERMANENT_TTL_SECONDS
+        dead = self._dead_ids()
+        with self._lock:
+            for track_id in track_ids:
+                dead[track_id] = expires_at
+                self._transient.pop(track_id, None)
+
+        try:
+            get_metadata_store().put_dead_ids(track_ids, expires_at)
+        except Exception as e:
+            print(f"⚠️ Could not persist dead track ids: {e}")
+
+    def record_transient(self, track_id: str) -> None:
+        now = time.time()
+        with self._lock:
+            previous = self._transient.get(track_id)
+            ttl = TRANSIENT_TTL_SECONDS
+            if previous is not None:
+                ttl = min(TRANSIENT_MAX_TTL_SECONDS, previous[1] * 2)
+            self._transient[track_id] = (now + ttl, ttl)
+
+            # Expired entries are kept until then so a failing id's backoff
+            # keeps growing.
+            if len(self._transient) > TRANSIENT_MAX_ENTRIES:
+                for expired in [
+                    key
+                    for key, (expires_at, _) in self._transient.items()
+                    if expires_at <= now
+                ]:
+                    del self._transient[expired]
+                while len(self._transient) > TRANSIENT_MAX_ENTRIES:
+                    del self._transient[next(iter(self._transient))]
+
+    def record_success(self, track_id: str) -> None:
+        if track_id in self._transient:
+            with self._lock:
+                self._transient.pop(track_id, None)
+
+    def dead_ids(self) -> Set[str]:
+        now = time.time()
+        return {
+            track_id
+            for track_id, expires_at in self._dead_ids().items()
+            if expires_at > now
+        }
+
+
+_negative_cache = None
+_negative_cache_lock = threading.Lock()
+
+
+def get_negative_cache() -> NegativeCache:
+    global _negative_cache
+    if _negative_cache is None:
+        with _negative_cache_lock:
+            if _negative_cache is None:
+                _negative_cache = NegativeCache()
+    return _negative_cache
@@ -0,0 +1,106 @@
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, List, Optional, Union
+
+from .rate_limiter import get_token_bucket
+from .spotify_api import MAX_TRACKS_PER_REQUEST, lookup_tracks, partition_track_ids
+
+PREFETCH_ENABLED = os.getenv("SPOTIFY_PREFETCH", "1") != "0"
+PREFETCH_WORKERS = 2
+# Prefetch only spends tokens while the bucket is at least this full, so a
+# foreground page never queues behind speculative work.
+PREFETCH_MIN_BUCKET_RATIO = 0.5
+PREFETCH_POLL_SECONDS = 0.1
+
+
+TrackIds = Union[List[str], Callable[[], List[str]]]
+
+
+class PrefetchTask:
+    def __init__(self, track_ids: TrackIds):
+        self.track_ids = track_ids
+        self.future: Optional[Future] = None
+        self._cancelled = threading.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def cancel(self) -> None:
+        self._cancelled.set()
+        if self.future is not None:
+            self.future.cancel()
+
+    def done(self) -> bool:
+        return self.future is None or self.future.done()
+
+
+class Prefetcher:
+    def __init__(self, max_workers: int = PREFETCH_WORKERS):
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="prefetch"
+        )
+        self.stats = {"scheduled": 0, "fetched": 0, "cancelled": 0}
+        self._lock = threading.Lock()
+
+    def schedule(self, track_ids: TrackIds) -> Optional[PrefetchTask]:
+        # The ids can also come from a function, called on the worker so the
+        # caller never waits for them to be worked out.
+        if not PREFETCH_ENABLED or not track_ids:
+            return None
+
+        task = PrefetchTask(track_ids)
+        task.future = self._executor.submit(self._run, task)
+        with self._lock:
+            self.stats["scheduled"] += 1
+        return task
+
+    def _wait_for_spare_budget(self, task: PrefetchTask) -> bool:
+        bucket = get_token_bucket()
+        while bucket.available() < bucket.capacity * PREFETCH_MIN_BUCKET_RATIO:
+            if task.cancelled:
+                return False
+            time.sleep(PREFETCH_POLL_SECONDS)
+        return not task.cancelled
+
+    def _run(self, task: PrefetchTask) -> None:
+        if callable(task.track_ids):
+            try:
+                task.track_ids = task.track_ids()
+            except Exception as e:
+                print(f"⚠️ Prefetch could not resolve its tracks: {e}")
+                return
+        _, _, missing = partition_track_ids(task.track_ids)
+
+        for start in range(0, len(missing), MAX_TRACKS_PER_REQUEST):
+            if not self._wait_for_spare_budget(task):
+                with self._lock:
+                    self.stats["cancelled"] += 1
+                return
+
+            chunk = missing[start : start + MAX_TRACKS_PER_REQUEST]
+            try:
+                # Shares in-flight lookups with foreground sessions, so a
+                # "load more" racing the prefetch doesn't fetch twice.
+                lookup_tracks(chunk)
+            except Exception as e:
+                print(f"⚠️ Prefetch of {len(chunk)} tracks failed: {e}")
+                return
+
+            with self._lock:
+                self.stats["fetched"] += len(chunk)
+
+
+_prefetcher = None
+_prefetcher_lock = threading.Lock()
+
+
+def get_prefetcher() -> Prefetcher:
+    global _prefetcher
+    if _prefetcher is None:
+        with _prefetcher_lock:
+            if _prefetcher is None:
+                _prefetcher = Prefetcher()
+    return _prefetcher
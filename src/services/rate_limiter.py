@@ -0,0 +1,221 @@
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from typing import Deque, Tuple
+
+# The budget is per process, and any one-second window sees at most rate +
+# burst requests from it: keep that sum, across every process sharing the
+# credentials, under the limit Spotify enforces. Hedges, probes and prefetches
+# all draw from it.
+RATE_LIMIT_PER_SECOND = float(os.getenv("SPOTIFY_RATE_LIMIT", "10"))
+RATE_LIMIT_BURST = float(os.getenv("SPOTIFY_RATE_BURST", "20"))
+# Longest a caller waits for a token before giving up on the request.
+ACQUIRE_TIMEOUT_SECONDS = 5.0
+
+CONCURRENCY_INITIAL = 4
+CONCURRENCY_MIN = 1
+CONCURRENCY_MAX = int(os.getenv("SPOTIFY_MAX_CONCURRENCY", "32"))
+LATENCY_TARGET_SECONDS = 0.75
+
+_AsyncWaiter = Tuple[asyncio.AbstractEventLoop, asyncio.Future]
+
+
+class TokenBucket:
+    def __init__(
+        self,
+        rate: float,
+        capacity: float,
+        min_rate: float = 1.0,
+        backoff_factor: float = 0.7,
+    ):
+        self.max_rate = rate
+        self.min_rate = min(min_rate, rate)
+        self.rate = rate
+        self.capacity = capacity
+        self.backoff_factor = backoff_factor
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._updated
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+        self._updated = now
+
+    def try_acquire(self) -> float:
+        # Takes a token if one is available and returns 0, otherwise returns
+        # how long to wait before trying again.
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+
+            if now < self._blocked_until:
+                return self._blocked_until - now
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                return 0.0
+            return (1.0 - self._tokens) / self.rate
+
+    def acquire(self, timeout: float = ACQUIRE_TIMEOUT_SECONDS) -> bool:
+        deadline = time.monotonic() + timeout
+
+        while True:
+            wait = self.try_acquire()
+            if wait == 0.0:
+                return True
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            time.sleep(min(wait, remaining))
+
+    def block_for(self, seconds: float) -> None:
+        with self._lock:
+            now = time.monotonic()
+            # Every request rejected in the same burst reports the same 429;
+            # only shrink the rate once per Retry-After window.
+            if now >= self._blocked_until:
+                self.rate = max(self.min_rate, self.rate * self.backoff_factor)
+            self._blocked_until = max(self._blocked_until, now + seconds)
+            self._tokens = 0.0
+            self._updated = now
+
+    def on_success(self) -> None:
+        with self._lock:
+            if self.rate < self.max_rate:
+                # Additive increase of about 1 req/s per second of traffic.
+                self.rate = min(self.max_rate, self.rate + 1.0 / self.rate)
+
+    def available(self) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if now < self._blocked_until:
+                return 0.0
+            return self._tokens
+
+    def blocked_for(self) -> float:
+        with self._lock:
+            return max(0.0, self._blocked_until - time.monotonic())
+
+
+class AdaptiveConcurrencyLimiter:
+    def __init__(
+        self,
+        initial: int = CONCURRENCY_INITIAL,
+        min_limit: int = CONCURRENCY_MIN,
+        max_limit: int = CONCURRENCY_MAX,
+        latency_target: float = LATENCY_TARGET_SECONDS,
+        backoff_factor: float = 0.5,
+    ):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_target = latency_target
+        self.backoff_factor = backoff_factor
+        self._limit = float(initial)
+        self._in_flight = 0
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+        # Coroutines waiting for a slot, woken in order from whichever thread
+        # frees one instead of polling.
+        self._async_waiters: Deque[_AsyncWaiter] = deque()
+
+    @property
+    def limit(self) -> int:
+        return max(self.min_limit, int(self._limit))
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def acquire(self) -> None:
+        with self._cond:
+            while self._in_flight >= self.limit:
+                self._cond.wait()
+            self._in_flight += 1
+
+    async def acquire_async(self) -> None:
+        loop = asyncio.get_running_loop()
+        with self._cond:
+            if not self._async_waiters and self._in_flight < self.limit:
+                self._in_flight += 1
+                return
+            waiter = (loop, loop.create_future())
+            self._async_waiters.append(waiter)
+
+        try:
+            await waiter[1]
+        except asyncio.CancelledError:
+            with self._cond:
+                queued = waiter in self._async_waiters
+                if queued:
+                    self._async_waiters.remove(waiter)
+            # A slot granted before the cancellation is handed back here; one
+            # granted after it is handed back by _grant.
+            if not queued and not waiter[1].cancelled():
+                self.release()
+            raise
+
+    def _wake_async_waiters(self) -> None:
+        # Called with the lock held. The slot is taken on the waiter's behalf
+        # here, so a thread can't claim it before the waiter's loop runs.
+        while self._async_waiters and self._in_flight < self.limit:
+            loop, future = self._async_waiters.popleft()
+            self._in_flight += 1
+            loop.call_soon_threadsafe(self._grant, future)
+
+    def _grant(self, future: asyncio.Future) -> None:
+        if future.cancelled():
+            self.release()
+        else:
+            future.set_result(None)
+
+    def release(self) -> None:
+        with self._cond:
+            self._in_flight -= 1
+            self._wake_async_waiters()
+            self._cond.notify_all()
+
+    def on_success(self, latency: float) -> None:
+        with self._cond:
+            if latency <= self.latency_target:
+                # Additive increase: roughly +1 per window of `limit` successes.
+                self._limit = min(self.max_limit, self._limit + 1.0 / self._limit)
+            self._wake_async_waiters()
+            self._cond.notify_all()
+
+    def on_overload(self, latency: float) -> None:
+        with self._cond:
+            now = time.monotonic()
+            # Requests already in flight when the limit was cut report their
+            # own failures; only back off once per observed round trip.
+            if now - self._last_decrease < max(latency, 0.1):
+                return
+            self._limit = max(self.min_limit, self._limit * self.backoff_factor)
+            self._last_decrease = now
+
+
+_token_bucket = None
+_concurrency_limiter = None
+_init_lock = threading.Lock()
+
+
+def get_token_bucket() -> TokenBucket:
+    global _token_bucket
+    if _token_bucket is None:
+        with _init_lock:
+            if _token_bucket is None:
+                _token_bucket = TokenBucket(RATE_LIMIT_PER_SECOND, RATE_LIMIT_BURST)
+    return _token_bucket
+
+
+def get_concurrency_limiter() -> AdaptiveConcurrencyLimiter:
+    global _concurrency_limiter
+    if _concurrency_limiter is None:
+        with _init_lock:
+            if _concurrency_limiter is None:
+                _concurrency_limiter = AdaptiveConcurrencyLimiter()
+    return _concurrency_limiter
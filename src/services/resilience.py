@@ -0,0 +1,190 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Awaitable, Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+HEDGING_ENABLED = True
+HEDGE_PERCENTILE = 95
+HEDGE_DEFAULT_DELAY_SECONDS = 0.5
+HEDGE_MIN_DELAY_SECONDS = 0.05
+HEDGE_MIN_SAMPLES = 20
+HEDGE_BUDGET_RATIO = 0.1
+HEDGE_WORKERS = 64
+
+BREAKER_WINDOW = 50
+BREAKER_MIN_REQUESTS = 20
+BREAKER_FAILURE_THRESHOLD = 0.5
+BREAKER_COOLDOWN_SECONDS = 15.0
+
+
+class LatencyTracker:
+    def __init__(self, window: int = 500):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, latency: float) -> None:
+        with self._lock:
+            self._samples.append(latency)
+
+    def count(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, p: float) -> Optional[float]:
+        with self._lock:
+            if not self._samples:
+                return None
+            ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+
+class Hedger:
+    def __init__(self, budget_ratio: float = HEDGE_BUDGET_RATIO):
+        # Whole-call durations, queueing included, so that hedges only fire
+        # for real outliers and not for calls waiting on the rate budget.
+        self.tracker = LatencyTracker()
+        self.budget_ratio = budget_ratio
+        self._calls = 0
+        self._hedges = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=HEDGE_WORKERS, thread_name_prefix="hedge"
+        )
+
+    def hedge_delay(self) -> float:
+        if self.tracker.count() < HEDGE_MIN_SAMPLES:
+            return HEDGE_DEFAULT_DELAY_SECONDS
+        return max(HEDGE_MIN_DELAY_SECONDS, self.tracker.percentile(HEDGE_PERCENTILE))
+
+    def _take_hedge_budget(self) -> bool:
+        # Cap duplicates to a fraction of calls so hedging can't amplify an
+        # overload into a retry storm.
+        with self._lock:
+            if self._hedges + 1 > self.budget_ratio * self._calls + 1:
+                return False
+            self._hedges += 1
+            return True
+
+    def call(self, fn: Callable[[], T]) -> T:
+        with self._lock:
+            self._calls += 1
+
+        if not HEDGING_ENABLED:
+            return fn()
+
+        started = time.monotonic()
+        pending = {self._executor.submit(fn)}
+        done, pending = wait(pending, timeout=self.hedge_delay())
+        if not done and self._take_hedge_budget():
+            pending.add(self._executor.submit(fn))
+
+        last_error: Optional[BaseException] = None
+        while True:
+            for future in done:
+                error = future.exception()
+                if error is None:
+                    self.tracker.record(time.monotonic() - started)
+                    return future.result()
+                last_error = error
+            if not pending:
+                raise last_error
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+
+    async def call_async(self, fn: Callable[[], Awaitable[T]]) -> T:
+        with self._lock:
+            self._calls += 1
+
+        if not HEDGING_ENABLED:
+            return await fn()
+
+        started = time.monotonic()
+        pending = {asyncio.ensure_future(fn())}
+        done, pending = await asyncio.wait(pending, timeout=self.hedge_delay())
+        if not done and self._take_hedge_budget():
+            pending.add(asyncio.ensure_future(fn()))
+
+        last_error: Optional[BaseException] = None
+        try:
+            while True:
+                for task in done:
+                    error = task.exception()
+                    if error is None:
+                        self.tracker.record(time.monotonic() - started)
+                        return task.result()
+                    last_error = error
+                if not pending:
+                    raise last_error
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+        finally:
+            # Unlike threads, the losing copy can actually be cancelled.
+            for task in pending:
+                task.cancel()
+
+    @property
+    def stats(self) -> dict:
+        with self._lock:
+            return {"calls": self._calls, "hedges": self._hedges}
+
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+
+    def __init__(
+        self,
+        probe: Callable[[], bool],
+        window: int = BREAKER_WINDOW,
+        min_requests: int = BREAKER_MIN_REQUESTS,
+        failure_threshold: float = BREAKER_FAILURE_THRESHOLD,
+        cooldown: float = BREAKER_COOLDOWN_SECONDS,
+    ):
+        self.probe = probe
+        self.min_requests = min_requests
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.state = self.CLOSED
+        self._outcomes = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def allow_request(self) -> bool:
+        return self.state == self.CLOSED
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._outcomes.append(True)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            if self.state != self.CLOSED:
+                return
+            self._outcomes.append(False)
+            if len(self._outcomes) < self.min_requests:
+                return
+            failures = self._outcomes.count(False)
+            if failures / len(self._outcomes) < self.failure_threshold:
+                return
+            self.state = self.OPEN
+
+        print(f"🔌 Circuit opened, probing Spotify every {self.cooldown:.0f}s")
+        threading.Thread(target=self._probe_until_recovered, daemon=True).start()
+
+    def _probe_until_recovered(self) -> None:
+        while True:
+            time.sleep(self.cooldown)
+            try:
+                healthy = self.probe()
+            except Exception:
+                healthy = False
+
+            if healthy:
+                with self._lock:
+                    self._outcomes.clear()
+                    self.state = self.CLOSED
+                print("🔌 Circuit closed, Spotify is responding again")
+                return
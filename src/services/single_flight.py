@@ -0,0 +1,88 @@
+import threading
+from concurrent.futures import Future
+from typing import Callable, Dict, Hashable, Iterable, List, TypeVar
+
+T = TypeVar("T")
+
+COALESCING_ENABLED = True
+
+
+class SingleFlight:
+    def __init__(self):
+        self._flights: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        self.leader_calls = 0
+        self.shared_calls = 0
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        if not COALESCING_ENABLED:
+            return fn()
+
+        with self._lock:
+            future = self._flights.get(key)
+            is_leader = future is None
+            if is_leader:
+                future = Future()
+                self._flights[key] = future
+                self.leader_calls += 1
+            else:
+                self.shared_calls += 1
+
+        if not is_leader:
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._flights[key]
+
+    def do_many(
+        self, keys: Iterable[Hashable], fn: Callable[[List[Hashable]], Dict]
+    ) -> Dict:
+        keys = list(dict.fromkeys(keys))
+        if not COALESCING_ENABLED:
+            return fn(keys)
+
+        joined = {}
+        owned = {}
+        with self._lock:
+            for key in keys:
+                future = self._flights.get(key)
+                if future is None:
+                    future = Future()
+                    self._flights[key] = future
+                    owned[key] = future
+                else:
+                    joined[key] = future
+            if owned:
+                self.leader_calls += 1
+            self.shared_calls += len(joined)
+
+        results = {}
+        if owned:
+            try:
+                fetched = fn(list(owned))
+            except BaseException as e:
+                for future in owned.values():
+                    future.set_exception(e)
+                raise
+            else:
+                for key, future in owned.items():
+                    future.set_result(fetched.get(key))
+                    results[key] = fetched.get(key)
+            finally:
+                with self._lock:
+                    for key in owned:
+                        del self._flights[key]
+
+        for key, future in joined.items():
+            results[key] = future.result()
+
+        return results
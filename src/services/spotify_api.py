@@ -1,41 +1,270 @@
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import Dict, List, Optional
-
-import requests
+import os
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Set, Tuple
 
+from .artist_genres import MAX_ARTISTS_PER_REQUEST, ArtistGenreCache, format_genres
+from .image_cache import get_thumbnail_cache
+from .metadata_store import get_metadata_store
+from .negative_cache import get_negative_cache
+from .rate_limiter import get_concurrency_limiter, get_token_bucket
+from .resilience import CircuitBreaker, Hedger
+from .single_flight import SingleFlight
 from .token_manager import get_access_token
 
-SPOTIFY_API_BASE = "https://api.spotify.com/v1"
+if TYPE_CHECKING:
+    import requests
+
+SPOTIFY_API_BASE = os.getenv("SPOTIFY_API_BASE", "https://api.spotify.com/v1")
+
+REQUEST_TIMEOUT_SECONDS = 10
+MAX_RETRIES = 3
+DEFAULT_RETRY_AFTER_SECONDS = 1.0
+MAX_RETRY_AFTER_SECONDS = 30.0
+SERVER_ERROR_BACKOFF_SECONDS = 0.5
+# Retries stop once the next one couldn't start within this long of the first
+# attempt; a longer Retry-After fails the lookup now instead.
+RETRY_DEADLINE_SECONDS = 5.0
+MAX_TRACKS_PER_REQUEST = 50
+# Track used by the circuit breaker to check whether Spotify is back.
+PROBE_TRACK_ID = "11dFghVXANMlKmJXsNCbNl"
+PROBE_TIMEOUT_SECONDS = 5
 
 
 class SpotifyAPIError(Exception):
     pass
 
 
-def get_track_by_id(track_id: str) -> Optional[Dict]:
+class SpotifyRateLimitError(SpotifyAPIError):
+    pass
+
+
+class SpotifyUnavailableError(SpotifyAPIError):
+    pass
+
+
+class SpotifyNotFoundError(SpotifyAPIError):
+    pass
+
+
+def _probe_spotify() -> bool:
+    import requests
+
+    # The probe counts against the same budget as every other request.
+    if not get_token_bucket().acquire(timeout=PROBE_TIMEOUT_SECONDS):
+        return False
+    response = requests.get(
+        f"{SPOTIFY_API_BASE}/tracks/{PROBE_TRACK_ID}",
+        headers={"Authorization": f"Bearer {get_access_token()}"},
+        timeout=PROBE_TIMEOUT_SECONDS,
+    )
+    return response.status_code < 500 and response.status_code != 429
+
+
+_hedger = Hedger()
+_breaker = CircuitBreaker(_probe_spotify)
+_track_flights = SingleFlight()
+
+
+def _parse_retry_after(value: Optional[str]) -> float:
+    try:
+        seconds = float(value)
+    except (TypeError, ValueError):
+        return DEFAULT_RETRY_AFTER_SECONDS
+    return min(max(seconds, 0.0), MAX_RETRY_AFTER_SECONDS)
+
+
+def _retry_backoff(attempt: int, deadline: float) -> Optional[float]:
+    # The wait before retrying a failed attempt, or None past the deadline.
+    backoff = SERVER_ERROR_BACKOFF_SECONDS * (2**attempt)
+    if time.monotonic() + backoff > deadline:
+        return None
+    return backoff
+
+
+def _spotify_get(url: str, params: Optional[Dict] = None) -> "requests.Response":
+    import requests
+
     try:
         access_token = get_access_token()
     except RuntimeError as e:
         raise SpotifyAPIError(f"Could not obtain access token: {e}")
 
     headers = {"Authorization": f"Bearer {access_token}"}
+    bucket = get_token_bucket()
+    limiter = get_concurrency_limiter()
+    last_error: Exception = SpotifyAPIError(f"No attempt made for {url}")
+    deadline = time.monotonic() + RETRY_DEADLINE_SECONDS
+
+    for attempt in range(MAX_RETRIES + 1):
+        if not _breaker.allow_request():
+            raise SpotifyUnavailableError("Spotify circuit is open, skipping request")
+
+        if not bucket.acquire(timeout=max(0.0, deadline - time.monotonic())):
+            raise SpotifyRateLimitError(
+                f"Rate limited, no request slot before the retry deadline for {url}"
+            )
+        limiter.acquire()
+        started = time.monotonic()
+        response = None
+        try:
+            response = requests.get(
+                url, headers=headers, params=params, timeout=REQUEST_TIMEOUT_SECONDS
+            )
+        except requests.RequestException as e:
+            last_error = e
+        finally:
+            limiter.release()
+        latency = time.monotonic() - started
+
+        if response is None:
+            _breaker.record_failure()
+            limiter.on_overload(latency)
+            backoff = _retry_backoff(attempt, deadline)
+            if backoff is None:
+                break
+            time.sleep(backoff)
+            continue
+
+        if response.status_code == 429:
+            retry_after = _parse_retry_after(response.headers.get("Retry-After"))
+            bucket.block_for(retry_after)
+            limiter.on_overload(latency)
+            last_error = SpotifyRateLimitError(
+                f"Rate limited by Spotify (Retry-After: {retry_after:.1f}s)"
+            )
+            if time.monotonic() + retry_after > deadline:
+                break
+            print(f"⏳ Spotify rate limit hit, retrying after {retry_after:.1f}s")
+            continue
 
+        if response.status_code >= 500:
+            _breaker.record_failure()
+            limiter.on_overload(latency)
+            last_error = SpotifyAPIError(
+                f"Spotify server error {response.status_code} for {url}"
+            )
+            backoff = _retry_backoff(attempt, deadline)
+            if backoff is None:
+                break
+            time.sleep(backoff)
+            continue
+
+        bucket.on_success()
+        limiter.on_success(latency)
+        _breaker.record_success()
+        if response.status_code == 404:
+            raise SpotifyNotFoundError(
+                f"Spotify returned {response.status_code} for {url}"
+            )
+        try:
+            response.raise_for_status()
+        except requests.RequestException as e:
+            raise SpotifyAPIError(f"Request to {url} failed: {e}")
+        return response
+
+    if isinstance(last_error, SpotifyAPIError):
+        raise last_error
+    raise SpotifyAPIError(f"Request to {url} failed: {last_error}")
+
+
+def get_track_by_id(track_id: str) -> Optional[Dict]:
     try:
-        response = requests.get(
-            f"{SPOTIFY_API_BASE}/tracks/{track_id}",
-            headers=headers,
-            timeout=10,
+        response = _spotify_get(f"{SPOTIFY_API_BASE}/tracks/{track_id}")
+    except SpotifyAPIError as e:
+        raise type(e)(f"Failed to fetch track {track_id}: {e}")
+
+    return _parse_track(response.json())
+
+
+def get_tracks_by_ids(track_ids: List[str]) -> List[Optional[Dict]]:
+    if len(track_ids) > MAX_TRACKS_PER_REQUEST:
+        raise ValueError(
+            f"At most {MAX_TRACKS_PER_REQUEST} ids per request, got {len(track_ids)}"
+        )
+
+    try:
+        response = _spotify_get(
+            f"{SPOTIFY_API_BASE}/tracks", params={"ids": ",".join(track_ids)}
+        )
+    except SpotifyAPIError as e:
+        raise type(e)(f"Failed to fetch {len(track_ids)} tracks: {e}")
+
+    return [
+        _parse_track(track) if track else None
+        for track in response.json().get("tracks", [])
+    ]
+
+
+def get_artists_by_ids(artist_ids: List[str]) -> List[Optional[Dict]]:
+    if len(artist_ids) > MAX_ARTISTS_PER_REQUEST:
+        raise ValueError(
+            f"At most {MAX_ARTISTS_PER_REQUEST} ids per request, got {len(artist_ids)}"
+        )
+
+    try:
+        response = _spotify_get(
+            f"{SPOTIFY_API_BASE}/artists", params={"ids": ",".join(artist_ids)}
+        )
+    except SpotifyAPIError as e:
+        raise type(e)(f"Failed to fetch {len(artist_ids)} artists: {e}")
+
+    return [
+        {"id": artist["id"], "genres": artist.get("genres", [])} if artist else None
+        for artist in response.json().get("artists", [])
+    ]
+
+
+_artist_genres = ArtistGenreCache(get_artists_by_ids)
+
+
+def lookup_track(track_id: str) -> Optional[Dict]:
+    def fetch() -> Optional[Dict]:
+        # Another flight may have landed since the caller checked the store.
+        stored = _load_stored_entries([track_id])
+        if track_id in stored:
+            return stored[track_id]
+
+        # A duplicate is sent once the call outlives the observed p95, and
+        # whichever copy answers first wins.
+        track = _hedger.call(lambda: get_track_by_id(track_id))
+        if not track:
+            return None
+        entry = track_to_store_entry(track)
+        _store_entries({track_id: entry})
+        return entry
+
+    # Sessions asking for the same id at the same moment share one upstream
+    # call. Hedging sits inside the flight so its duplicate isn't absorbed.
+    return _track_flights.do(track_id, fetch)
+
+
+def lookup_tracks(track_ids: List[str]) -> Dict[str, Optional[Dict]]:
+    def fetch(ids: List[str]) -> Dict[str, Optional[Dict]]:
+        entries = _load_stored_entries(ids)
+        missing = [track_id for track_id in ids if track_id not in entries]
+        fetched = {}
+        for start in range(0, len(missing), MAX_TRACKS_PER_REQUEST):
+            chunk = missing[start : start + MAX_TRACKS_PER_REQUEST]
+            for track_id, track in zip(chunk, get_tracks_by_ids(chunk)):
+                fetched[track_id] = track_to_store_entry(track) if track else None
+
+        _store_entries({k: v for k, v in fetched.items() if v is not None})
+        get_negative_cache().record_permanent(
+            track_id for track_id, entry in fetched.items() if entry is None
         )
-        response.raise_for_status()
-    except requests.RequestException as e:
-        raise SpotifyAPIError(f"Failed to fetch track {track_id}: {e}")
+        entries.update(fetched)
+        return entries
 
-    track = response.json()
+    return _track_flights.do_many(track_ids, fetch)
 
-    track_info = {
+
+def _parse_track(track: Dict) -> Dict:
+    return {
         "id": track["id"],
         "name": track["name"],
         "artists": [artist["name"] for artist in track["artists"]],
+        "artist_ids": [artist.get("id") for artist in track["artists"]],
         "album": {
             "name": track["album"]["name"],
             "images": track["album"].get("images", []),
@@ -43,7 +272,15 @@ def get_track_by_id(track_id: str) -> Optional[Dict]:
         "external_urls": track.get("external_urls", {}),
     }
 
-    return track_info
+
+def track_to_store_entry(track: Dict) -> Dict:
+    return {
+        "title": track.get("name", "Unknown"),
+        "artist": ", ".join(track.get("artists", [])),
+        "images": track.get("album", {}).get("images", []),
+        "spotify_url": track.get("external_urls", {}).get("spotify", ""),
+        "artist_ids": [a for a in track.get("artist_ids", []) if a],
+    }
 
 
 def get_best_album_image(images: List[Dict], size: str = "medium") -> Optional[str]:
@@ -59,62 +296,187 @@ def get_best_album_image(images: List[Dict], size: str = "medium") -> Optional[s
     return images[0]["url"] if images else None
 
 
-def _fetch_spotify_data_by_id(track_id: str) -> Dict:
-    try:
-        track = get_track_by_id(track_id)
-        if track:
-            image_url = get_best_album_image(track.get("album", {}).get("images", []))
-            spotify_url = track.get("external_urls", {}).get("spotify", "")
-            artists = ", ".join(track.get("artists", []))
-
-            return {
-                "title": track.get("name", "Unknown"),
-                "artist": artists,
-                "image_url": image_url,
-                "spotify_url": spotify_url,
-                "genres": "",
-            }
-    except Exception as e:
-        print(f"⚠️ Error fetching Spotify data for track {track_id}: {e}")
-
+def _unknown_track() -> Dict:
     return {
         "title": "Unknown",
         "artist": "Unknown Artist",
         "image_url": None,
         "spotify_url": None,
         "genres": "",
+        "artist_ids": [],
     }
 
 
-def fetch_spotify_data_parallel(tracks: List[Dict], max_workers: int = 5) -> List[Dict]:
-    results = []
+def _spotify_data_from_entry(entry: Dict) -> Dict:
+    return {
+        "title": entry["title"],
+        "artist": entry["artist"],
+        "image_url": get_best_album_image(entry.get("images", [])),
+        "spotify_url": entry.get("spotify_url", ""),
+        "genres": "",
+        "artist_ids": entry.get("artist_ids", []),
+    }
+
+
+def _lookup_succeeded(track_id: str, entry: Optional[Dict]) -> Dict:
+    if not entry:
+        return _unknown_track()
+    get_negative_cache().record_success(track_id)
+    return _spotify_data_from_entry(entry)
+
+
+def _lookup_failed(track_id: str, error: Exception) -> Dict:
+    if isinstance(error, SpotifyNotFoundError):
+        print(f"⚠️ Track {track_id} no longer exists on Spotify: {error}")
+        get_negative_cache().record_permanent([track_id])
+        return _unknown_track()
+
+    print(f"⚠️ Error fetching Spotify data for track {track_id}: {error}")
+    if not isinstance(error, SpotifyUnavailableError):
+        get_negative_cache().record_transient(track_id)
+    return _unknown_track()
+
+
+def _fetch_spotify_data_by_id(track_id: str) -> Dict:
+    if get_negative_cache().is_blocked(track_id):
+        return _unknown_track()
+
+    try:
+        return _lookup_succeeded(track_id, lookup_track(track_id))
+    except Exception as e:
+        return _lookup_failed(track_id, e)
+
+
+def _load_stored_entries(track_ids: List[str]) -> Dict[str, Dict]:
+    try:
+        return get_metadata_store().get_many(track_ids)
+    except Exception as e:
+        print(f"⚠️ Could not read metadata store: {e}")
+        return {}
 
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        futures = {
-            executor.submit(
-                _fetch_spotify_data_by_id,
-                track.get("id", ""),
-            ): track
-            for track in tracks
-        }
 
-        for future in as_completed(futures):
+def _store_entries(entries: Dict[str, Dict]) -> None:
+    try:
+        get_metadata_store().put_many(entries)
+    except Exception as e:
+        print(f"⚠️ Could not write metadata store: {e}")
+
+
+def _to_display_item(spotify_data: Dict, original_track: Dict) -> Dict:
+    return {
+        "id": original_track.get("id"),
+        "title": spotify_data.get("title", "Unknown Title"),
+        "artist": spotify_data.get("artist", "Unknown Artist"),
+        "genres": original_track.get("genres", spotify_data.get("genres", "")),
+        "image_url": spotify_data.get("image_url"),
+        "spotify_url": spotify_data.get("spotify_url"),
+    }
+
+
+def partition_track_ids(
+    track_ids: List[str],
+) -> Tuple[Dict[str, Dict], Set[str], List[str]]:
+    stored = _load_stored_entries(track_ids)
+    negative_cache = get_negative_cache()
+    blocked = {
+        track_id
+        for track_id in track_ids
+        if track_id not in stored and negative_cache.is_blocked(track_id)
+    }
+    missing = [
+        track_id
+        for track_id in dict.fromkeys(track_ids)
+        if track_id not in stored and track_id not in blocked
+    ]
+    return stored, blocked, missing
+
+
+def iter_ranked_items(
+    tracks: List[Dict],
+    stored: Dict[str, Dict],
+    blocked: Set[str],
+    futures: Dict[str, Future],
+) -> Iterator[Tuple[int, Dict]]:
+    thumbnails = get_thumbnail_cache()
+    without_genres: Dict[int, Tuple[Dict, List[str]]] = {}
+
+    # Waiting on the futures in rank order releases each track as soon as it
+    # and every better-ranked track are ready.
+    for rank, original_track in enumerate(tracks):
+        track_id = original_track.get("id", "")
+        if track_id in stored:
+            spotify_data = _spotify_data_from_entry(stored[track_id])
+        elif track_id in blocked:
+            spotify_data = _unknown_track()
+        else:
             try:
-                spotify_data = future.result()
-                original_track = futures[future]
-
-                results.append(
-                    {
-                        "title": spotify_data.get("title", "Unknown Title"),
-                        "artist": spotify_data.get("artist", "Unknown Artist"),
-                        "genres": original_track.get(
-                            "genres", spotify_data.get("genres", "")
-                        ),
-                        "image_url": spotify_data.get("image_url"),
-                        "spotify_url": spotify_data.get("spotify_url"),
-                    }
-                )
+                spotify_data = futures[track_id].result()
             except Exception as e:
                 print(f"❌ Error processing track: {e}")
+                spotify_data = _unknown_track()
+
+        item = _to_display_item(spotify_data, original_track)
+        item["image_srcset"] = thumbnails.get_srcset(item["image_url"])
+        artist_ids = spotify_data.get("artist_ids", [])
+        if not item["genres"] and artist_ids:
+            cached = _artist_genres.get_cached(artist_ids)
+            if cached is None:
+                without_genres[rank] = (item, artist_ids)
+            else:
+                item["genres"] = format_genres(artist_ids, cached)
+        yield rank, item
+
+    if not without_genres:
+        return
+
+    # Artists missing from the cache are resolved once for the whole page and
+    # the affected cards are yielded again with their genres.
+    try:
+        genres = _artist_genres.resolve(
+            artist_id for _, ids in without_genres.values() for artist_id in ids
+        )
+    except Exception as e:
+        print(f"⚠️ Could not fetch artist genres: {e}")
+        return
+
+    for rank, (item, artist_ids) in without_genres.items():
+        item_genres = format_genres(artist_ids, genres)
+        if item_genres:
+            yield rank, {**item, "genres": item_genres}
+
+
+def stream_spotify_data(
+    tracks: List[Dict], max_workers: Optional[int] = None
+) -> Iterator[Tuple[int, Dict]]:
+    if not tracks:
+        return
+
+    stored, blocked, missing = partition_track_ids(
+        [track.get("id", "") for track in tracks]
+    )
+
+    # Actual concurrency is governed by the shared adaptive limiter; the pool
+    # only needs enough threads to let it widen.
+    if max_workers is None:
+        max_workers = get_concurrency_limiter().max_limit
+    max_workers = max(1, min(max_workers, len(missing) or 1))
+
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        futures = {
+            track_id: executor.submit(_fetch_spotify_data_by_id, track_id)
+            for track_id in missing
+        }
+        yield from iter_ranked_items(tracks, stored, blocked, futures)
+    finally:
+        # A rerun may abandon the stream midway; don't block on the rest.
+        executor.shutdown(wait=False, cancel_futures=True)
+
 
-    return results
+def fetch_spotify_data_parallel(
+    tracks: List[Dict], max_workers: Optional[int] = None
+) -> List[Dict]:
+    items: List[Optional[Dict]] = [None] * len(tracks)
+    for rank, item in stream_spotify_data(tracks, max_workers):
+        items[rank] = item
+    return items
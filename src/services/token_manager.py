@@ -1,15 +1,23 @@
 import base64
+import os
 from datetime import datetime, timedelta
 
-import requests
 import streamlit as st
 from dotenv import load_dotenv
 
 load_dotenv()
 
-CLIENT_ID = st.secrets.spotify_credentials.client_id
-CLIENT_SECRET = st.secrets.spotify_credentials.client_secret
-TOKEN_URL = "https://accounts.spotify.com/api/token"
+
+def _load_credentials() -> tuple:
+    try:
+        credentials = st.secrets.spotify_credentials
+        return credentials.client_id, credentials.client_secret
+    except Exception:
+        return os.getenv("CLIENT_ID"), os.getenv("CLIENT_SECRET")
+
+
+CLIENT_ID, CLIENT_SECRET = _load_credentials()
+TOKEN_URL = os.getenv("TOKEN_URL", "https://accounts.spotify.com/api/token")
 
 TOKEN_COOKIE_KEY = "spotify_access_token"
 TOKEN_EXPIRY_COOKIE_KEY = "spotify_token_expiry"
@@ -67,6 +75,8 @@ class TokenManager:
 
         data = {"grant_type": "client_credentials"}
 
+        import requests
+
         try:
             print("🔄 Fetching new Spotify access token...")
             response = requests.post(TOKEN_URL, headers=headers, data=data, timeout=10)
@@ -0,0 +1,303 @@
+import argparse
+import contextlib
+import csv
+import io
+import json
+import multiprocessing
+import os
+import resource
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from core.model_loader import load_models
+from core.queries import (
+    DEFAULT_TOP_N,
+    SLIDER_PARAMS,
+    parse_query,
+    parse_top_n,
+)
+from core.recommender import (
+    CANDIDATE_FACTOR,
+    SIMILAR_QUERY,
+    get_recommender,
+    make_query_key,
+)
+
+# Rows per kneighbors call. Brute force holds a rows x dataset distance
+# matrix, so this bounds worker memory whatever the chunk size.
+SEARCH_BATCH = 64
+CSV_COLUMNS = ["index", "query_id", "rank", "id", "distance", "error"]
+
+Raw = Tuple[int, object]
+
+
+def read_queries(stream: TextIO, input_format: str) -> Iterator[Raw]:
+    # Raw lines and rows are decoded in the workers, not here.
+    if input_format == "csv":
+        for index, row in enumerate(csv.DictReader(stream)):
+            yield index, row
+        return
+
+    index = 0
+    for line in stream:
+        if line.strip():
+            yield index, line
+            index += 1
+
+
+def chunked(items: Iterable, size: int) -> Iterator[List]:
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _decode(raw: object) -> Dict:
+    if isinstance(raw, str):
+        return json.loads(raw)
+
+    # CSV cells are all strings: empty ones count as missing and the sliders
+    # are read as numbers.
+    body = {key: value for key, value in raw.items() if key and value not in ("", None)}
+    for param in SLIDER_PARAMS:
+        if param in body:
+            try:
+                body[param] = float(body[param])
+            except ValueError:
+                pass
+    return body
+
+
+def _parse(body: Dict) -> Tuple[Tuple, Dict]:
+    if "track_id" in body:
+        track_id = str(body["track_id"])
+        if not get_recommender().has_track(track_id):
+            raise ValueError(f"Unknown track id: {track_id}")
+        top_n = parse_top_n(body.get("top_n", DEFAULT_TOP_N))
+        return (SIMILAR_QUERY, track_id), {"top_n": top_n}
+
+    query = parse_query(body)
+    query_key = make_query_key(
+        **{name: value for name, value in query.items() if name != "top_n"}
+    )
+    return query_key, query
+
+
+def _results(query_key: Tuple, query: Dict) -> List[Dict]:
+    recommender = get_recommender()
+    if query_key[0] == SIMILAR_QUERY:
+        handle = recommender.similar_handle(query_key[1], query["top_n"])
+    else:
+        handle = recommender.recommend_handle(**query)
+    tracks = recommender.tracks(handle)
+    return [
+        {"id": track["id"], "distance": round(float(distance), 6)}
+        for track, distance in zip(tracks, handle.distances[: handle.shown])
+    ]
+
+
+def _format(
+    records: List[Tuple[int, Optional[str], List[Dict], Optional[str]]],
+    output_format: str,
+) -> str:
+    if output_format == "jsonl":
+        lines = []
+        for index, query_id, tracks, error in records:
+            record = {"index": index}
+            if query_id is not None:
+                record["query_id"] = query_id
+            record.update({"error": error} if error else {"tracks": tracks})
+            lines.append(json.dumps(record, ensure_ascii=False) + "\n")
+        return "".join(lines)
+
+    # One row per recommended track, long format.
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for index, query_id, tracks, error in records:
+        if error:
+            writer.writerow([index, query_id, "", "", "", error])
+        for rank, track in enumerate(tracks, start=1):
+            writer.writerow([index, query_id, rank, track["id"], track["distance"], ""])
+    return buffer.getvalue()
+
+
+def recommend_chunk(chunk: List[Raw], output_format: str) -> Tuple[str, int, int]:
+    recommender = get_recommender()
+    records = []
+    parsed = []
+    for index, raw in chunk:
+        query_id = None
+        try:
+            body = _decode(raw)
+            if not isinstance(body, dict):
+                raise ValueError("Each query must be a JSON object")
+            query_id = body.get("query_id")
+            parsed.append((index, query_id, *_parse(body)))
+        except Exception as e:
+            records.append((index, query_id, [], str(e)))
+
+    total = recommender.get_dataset_size()
+    for start in range(0, len(parsed), SEARCH_BATCH):
+        batch = parsed[start : start + SEARCH_BATCH]
+        # The first page of every handle below reads these cached neighbors.
+        top_n = max(query["top_n"] for _, _, _, query in batch)
+        recommender.warm_neighbors(
+            [query_key for _, _, query_key, _ in batch],
+            min(total, top_n * CANDIDATE_FACTOR),
+        )
+        for index, query_id, query_key, query in batch:
+            try:
+                records.append((index, query_id, _results(query_key, query), None))
+            except Exception as e:
+                records.append((index, query_id, [], str(e)))
+
+    records.sort(key=lambda record: record[0])
+    errors = sum(1 for record in records if record[3])
+    return _format(records, output_format), len(records), errors
+
+
+def _init_worker() -> None:
+    # Forked workers already hold the parent's model; only spawned ones load.
+    with contextlib.redirect_stdout(sys.stderr):
+        load_models()
+    get_recommender()
+
+
+def run(
+    queries: Iterator[Raw],
+    out: TextIO,
+    output_format: str,
+    workers: int,
+    chunk_size: int,
+) -> Dict[str, float]:
+    stats = {"queries": 0, "errors": 0, "chunks": 0}
+    chunks = chunked(queries, chunk_size)
+    started = time.monotonic()
+
+    def write(result: Tuple[str, int, int]) -> None:
+        text, count, errors = result
+        out.write(text)
+        stats["queries"] += count
+        stats["errors"] += errors
+        stats["chunks"] += 1
+        elapsed = time.monotonic() - started
+        print(
+            f"🔄 {stats['queries']} queries ({stats['queries'] / elapsed:.0f}/s)",
+            file=sys.stderr,
+        )
+
+    if workers == 0:
+        for chunk in chunks:
+            write(recommend_chunk(chunk, output_format))
+        return stats
+
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context("fork" if "fork" in methods else None)
+    window = workers * 2
+
+    with ProcessPoolExecutor(
+        max_workers=workers, mp_context=context, initializer=_init_worker
+    ) as executor:
+        in_flight = {}
+        finished = {}
+        submitted = written = 0
+
+        def refill() -> None:
+            nonlocal submitted
+            # Finished chunks waiting for an earlier one count against the
+            # window too, so memory stays bounded whatever the input size.
+            while len(in_flight) + len(finished) < window:
+                chunk = next(chunks, None)
+                if chunk is None:
+                    return
+                future = executor.submit(recommend_chunk, chunk, output_format)
+                in_flight[future] = submitted
+                submitted += 1
+
+        refill()
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                finished[in_flight.pop(future)] = future.result()
+
+            # Output keeps the input order.
+            while written in finished:
+                write(finished.pop(written))
+                written += 1
+            refill()
+
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Recommendations for a stream of queries, without the app."
+    )
+    parser.add_argument("input", nargs="?", default="-", help="File, or - for stdin")
+    parser.add_argument("--output", "-o", default="-", help="File, or - for stdout")
+    parser.add_argument("--format", choices=["auto", "jsonl", "csv"], default="auto")
+    parser.add_argument("--output-format", choices=["jsonl", "csv"], default="jsonl")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=512)
+    args = parser.parse_args()
+
+    input_format = args.format
+    if input_format == "auto":
+        input_format = "csv" if args.input.lower().endswith(".csv") else "jsonl"
+
+    # Output may be stdout, so everything else goes to stderr.
+    load_started = time.monotonic()
+    with contextlib.redirect_stdout(sys.stderr):
+        load_models()
+    get_recommender()
+    load_seconds = time.monotonic() - load_started
+
+    with contextlib.ExitStack() as stack:
+        source = sys.stdin
+        if args.input != "-":
+            source = stack.enter_context(open(args.input, newline="", encoding="utf-8"))
+        out = sys.stdout
+        if args.output != "-":
+            out = stack.enter_context(
+                open(args.output, "w", newline="", encoding="utf-8")
+            )
+        if args.output_format == "csv":
+            csv.writer(out).writerow(CSV_COLUMNS)
+
+        started = time.monotonic()
+        stats = run(
+            read_queries(source, input_format),
+            out,
+            args.output_format,
+            max(0, args.workers),
+            max(1, args.chunk_size),
+        )
+        elapsed = time.monotonic() - started
+
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    log = sys.stderr
+    print("=" * 60, file=log)
+    print(f"✅ Queries:          {stats['queries']}", file=log)
+    print(f"❌ Errors:           {stats['errors']}", file=log)
+    print(f"📦 Chunks:           {stats['chunks']} x {args.chunk_size}", file=log)
+    print(f"👷 Workers:          {args.workers}", file=log)
+    print(f"📂 Model load:       {load_seconds:.1f} s", file=log)
+    print(f"⏱️ Elapsed:          {elapsed:.1f} s", file=log)
+    print(
+        f"🚀 Throughput:       {stats['queries'] / max(elapsed, 1e-9):.1f} queries/s",
+        file=log,
+    )
+    print(f"🧠 Peak RSS main:    {usage.ru_maxrss / 1024:.0f} MiB", file=log)
+    print(f"🧠 Peak RSS worker:  {children.ru_maxrss / 1024:.0f} MiB", file=log)
+    print("=" * 60, file=log)
+
+
+if __name__ == "__main__":
+    main()
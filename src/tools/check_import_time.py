@@ -0,0 +1,99 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Set, Tuple
+
+SRC_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Already imported by the Streamlit server before it first runs main.py, so
+# they don't count against the app's own startup.
+PRELOADED_MODULES = ("streamlit", "streamlit.web.server", "tornado.httpclient")
+# What main.py imports before the first element is drawn.
+STARTUP_MODULES = ("services.token_manager", "ui.layout")
+# Must only be imported on first use, never on the way to the first frame.
+LAZY_MODULES = ("pandas", "joblib", "sklearn", "requests", "PIL")
+
+DEFAULT_BUDGET_MS = 300.0
+MARKER = "--- startup imports ---"
+
+
+def _profile_code() -> str:
+    lines = [f"import {module}" for module in PRELOADED_MODULES]
+    lines.append(f"import sys; sys.stderr.write({MARKER!r} + '\\n')")
+    lines.extend(f"import {module}" for module in STARTUP_MODULES)
+    return "\n".join(lines)
+
+
+def profile_startup() -> Tuple[Dict[str, float], Set[str]]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _profile_code()],
+        cwd=SRC_PATH,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Startup imports failed:\n{result.stderr}")
+
+    _, _, startup = result.stderr.partition(MARKER)
+    top_level: Dict[str, float] = {}
+    imported: Set[str] = set()
+    for line in startup.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line.split("|")
+        module = name.strip()
+        imported.add(module)
+        # Nesting is shown by indentation; only top-level entries add up to
+        # the wall time of the startup imports.
+        if not name[1:].startswith(" "):
+            top_level[module] = int(cumulative) / 1000.0
+    return top_level, imported
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Fail when the imports on the way to the first frame get slow."
+    )
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    runs: List[Dict[str, float]] = []
+    imported: Set[str] = set()
+    for _ in range(args.runs):
+        top_level, modules = profile_startup()
+        runs.append(top_level)
+        imported |= modules
+
+    totals = [sum(run.values()) for run in runs]
+    total = statistics.median(totals)
+    leaked = sorted(
+        module for module in imported if module.split(".")[0] in LAZY_MODULES
+    )
+
+    print("=" * 60)
+    for module in sorted(runs[0], key=runs[0].get, reverse=True):
+        median = statistics.median(run.get(module, 0.0) for run in runs)
+        print(f"{module:<40} {median:>8.1f} ms")
+    print("-" * 60)
+    print(f"{'startup imports (median)':<40} {total:>8.1f} ms")
+    print(f"{'budget':<40} {args.budget_ms:>8.1f} ms")
+
+    failed = False
+    if total > args.budget_ms:
+        print(f"❌ Startup imports take {total:.1f} ms, over the budget")
+        failed = True
+    if leaked:
+        roots = sorted({module.split(".")[0] for module in leaked})
+        print(f"❌ Imported before first use: {', '.join(roots)}")
+        failed = True
+    if not failed:
+        print("✅ Startup imports within budget")
+    print("=" * 60)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
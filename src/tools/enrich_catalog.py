@@ -0,0 +1,174 @@
+import argparse
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+from typing import Dict, List, Optional
+
+import pandas as pd
+from dotenv import load_dotenv
+
+from services.image_cache import cache_album_image
+from services.metadata_store import get_metadata_store
+from services.negative_cache import get_negative_cache
+from services.spotify_api import (
+    MAX_TRACKS_PER_REQUEST,
+    get_best_album_image,
+    get_tracks_by_ids,
+    track_to_store_entry,
+)
+
+ASSETS_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "../assets"))
+DATASET_PATH = os.path.join(ASSETS_PATH, "datasets/pre_processing.csv")
+
+
+def load_track_ids(path: str = DATASET_PATH) -> List[str]:
+    header = pd.read_csv(path, nrows=0).columns
+    id_col = "id" if "id" in header else "track_id"
+    ids = pd.read_csv(path, usecols=[id_col])[id_col].dropna().astype(str)
+    return list(dict.fromkeys(ids))
+
+
+def _fetch_chunk(chunk: List[str]) -> Dict[str, Optional[Dict]]:
+    tracks = get_tracks_by_ids(chunk)
+    return {
+        track_id: track_to_store_entry(track) if track else None
+        for track_id, track in zip(chunk, tracks)
+    }
+
+
+def enrich_catalog(
+    track_ids: List[str],
+    batch_size: int = MAX_TRACKS_PER_REQUEST,
+    workers: int = 4,
+    limit: Optional[int] = None,
+) -> Dict[str, int]:
+    store = get_metadata_store()
+    negative_cache = get_negative_cache()
+    known = store.known_ids()
+    dead = negative_cache.dead_ids()
+    pending = [
+        track_id
+        for track_id in track_ids
+        if track_id not in known and track_id not in dead
+    ]
+    if limit is not None:
+        pending = pending[:limit]
+
+    print(
+        f"📊 {len(known)} tracks already stored, {len(dead)} known dead, "
+        f"{len(pending)} pending"
+    )
+
+    chunks = [pending[i : i + batch_size] for i in range(0, len(pending), batch_size)]
+    stats = {"stored": 0, "not_found": 0, "failed_chunks": 0}
+    started = time.monotonic()
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        remaining = iter(chunks)
+        in_flight = {}
+
+        # Keep only a bounded window of chunks in flight; every finished chunk
+        # is committed before the next is submitted, so an interrupted run
+        # resumes from what is already in the store.
+        for chunk in remaining:
+            in_flight[executor.submit(_fetch_chunk, chunk)] = chunk
+            if len(in_flight) >= workers * 2:
+                break
+
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                chunk = in_flight.pop(future)
+                try:
+                    entries = future.result()
+                except Exception as e:
+                    print(f"⚠️ Chunk starting at {chunk[0]} failed: {e}")
+                    stats["failed_chunks"] += 1
+                    entries = {}
+
+                found = {k: v for k, v in entries.items() if v is not None}
+                store.put_many(found)
+                negative_cache.record_permanent(
+                    k for k, v in entries.items() if v is None
+                )
+                stats["stored"] += len(found)
+                stats["not_found"] += len(entries) - len(found)
+
+                next_chunk = next(remaining, None)
+                if next_chunk is not None:
+                    in_flight[executor.submit(_fetch_chunk, next_chunk)] = next_chunk
+
+            elapsed = time.monotonic() - started
+            done_count = stats["stored"] + stats["not_found"]
+            print(
+                f"🔄 {done_count}/{len(pending)} tracks "
+                f"({done_count / max(elapsed, 1e-9):.0f} tracks/s)"
+            )
+
+    return stats
+
+
+def build_catalog_thumbnails(workers: int = 4) -> Dict[str, int]:
+    store = get_metadata_store()
+    known = store.get_image_keys()
+    entries = store.get_many(store.known_ids())
+    urls = {get_best_album_image(entry["images"]) for entry in entries.values()}
+    pending = [url for url in urls if url and url not in known]
+
+    print(f"🖼️ {len(known)} album images cached, {len(pending)} pending")
+
+    stats = {"cached": 0, "failed": 0}
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(cache_album_image, url): url for url in pending}
+        for future in as_completed(futures):
+            try:
+                future.result()
+                stats["cached"] += 1
+            except Exception as e:
+                print(f"⚠️ Could not cache {futures[future]}: {e}")
+                stats["failed"] += 1
+
+    return stats
+
+
+def main():
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(
+        description="Precompute Spotify metadata for every track in the dataset."
+    )
+    parser.add_argument("--dataset", default=DATASET_PATH)
+    parser.add_argument("--batch-size", type=int, default=MAX_TRACKS_PER_REQUEST)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--limit", type=int, help="Only process this many ids")
+    parser.add_argument(
+        "--thumbnails",
+        action="store_true",
+        help="Also download album art and build the local card thumbnails",
+    )
+    args = parser.parse_args()
+
+    track_ids = load_track_ids(args.dataset)
+    print(f"📂 {len(track_ids)} track ids in {args.dataset}")
+
+    stats = enrich_catalog(
+        track_ids,
+        batch_size=min(args.batch_size, MAX_TRACKS_PER_REQUEST),
+        workers=args.workers,
+        limit=args.limit,
+    )
+
+    print("=" * 60)
+    print(f"✅ Stored:        {stats['stored']}")
+    print(f"❔ Not found:     {stats['not_found']}")
+    print(f"❌ Failed chunks: {stats['failed_chunks']}")
+
+    if args.thumbnails:
+        thumb_stats = build_catalog_thumbnails(workers=args.workers)
+        print(f"🖼️ Thumbnails:    {thumb_stats['cached']}")
+        print(f"❌ Failed images: {thumb_stats['failed']}")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,526 @@
+import argparse
+import base64
+import hashlib
+import io
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+import requests
+from dotenv import load_dotenv
+
+ASSETS_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "../assets"))
+DATASET_PATH = os.path.join(ASSETS_PATH, "datasets/pre_processing.csv")
+
+UPSTREAM_API_BASE = "https://api.spotify.com/v1"
+UPSTREAM_TOKEN_URL = "https://accounts.spotify.com/api/token"
+MAX_BATCH_IDS = 50
+IMAGE_SIZES = (640, 300, 64)
+STAND_IN_GENRES = (
+    "pop",
+    "rock",
+    "jazz",
+    "samba",
+    "mpb",
+    "bossa nova",
+    "indie folk",
+    "classical",
+    "hip hop",
+    "electronic",
+    "sertanejo",
+    "soul",
+)
+
+
+class LatencyModel:
+    def __init__(
+        self,
+        spec: str = "fixed:0",
+        stall_rate: float = 0.0,
+        stall_seconds: float = 10.0,
+        capacity: int = 0,
+    ):
+        kind, _, raw_args = spec.partition(":")
+        self.kind = kind
+        self.args = [float(a) for a in raw_args.split(",") if a]
+        self.stall_rate = stall_rate
+        self.stall_seconds = stall_seconds
+        self.capacity = capacity
+
+        if kind not in ("fixed", "uniform", "lognormal", "exponential"):
+            raise ValueError(f"Unknown latency distribution: {spec}")
+
+    def sample(self, in_flight: int = 0) -> float:
+        if self.stall_rate and random.random() < self.stall_rate:
+            return self.stall_seconds
+
+        if self.kind == "fixed":
+            latency = self.args[0] if self.args else 0.0
+        elif self.kind == "uniform":
+            latency = random.uniform(self.args[0], self.args[1])
+        elif self.kind == "lognormal":
+            latency = random.lognormvariate(self.args[0], self.args[1])
+        else:
+            latency = random.expovariate(1.0 / self.args[0])
+
+        # Optional congestion: latency grows once concurrency exceeds capacity.
+        if self.capacity:
+            latency *= 1 + in_flight / self.capacity
+        return latency
+
+
+class FixtureStore:
+    def __init__(self, fixtures_dir: Optional[str] = None, strict: bool = False):
+        self.fixtures_dir = fixtures_dir
+        self.strict = strict
+        self.base_url = ""
+        self._catalog: Dict[str, Dict] = {}
+        self._artists: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def load_dataset(self, path: str = DATASET_PATH) -> int:
+        if not os.path.exists(path):
+            print(f"⚠️ Dataset not found at {path}, synthesizing every id")
+            return 0
+
+        import pandas as pd
+
+        header = pd.read_csv(path, nrows=0).columns
+        id_col = "id" if "id" in header else "track_id"
+        title_col = "title" if "title" in header else "name"
+        artist_col = "artist" if "artist" in header else "artists"
+
+        df = pd.read_csv(path, usecols=[id_col, title_col, artist_col])
+        for track_id, title, artists in df.itertuples(index=False):
+            self._catalog[str(track_id)] = {
+                "name": str(title),
+                "artists": _parse_artists(artists),
+            }
+
+        print(f"📂 Loaded {len(self._catalog)} track ids from {path}")
+        return len(self._catalog)
+
+    def _fixture_path(self, kind: str, item_id: str) -> Optional[str]:
+        if not self.fixtures_dir:
+            return None
+        return os.path.join(self.fixtures_dir, kind, f"{item_id}.json")
+
+    def get_recorded(self, kind: str, item_id: str) -> Optional[Dict]:
+        path = self._fixture_path(kind, item_id)
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)
+        return None
+
+    def record(self, kind: str, item_id: str, payload: Dict) -> None:
+        path = self._fixture_path(kind, item_id)
+        if not path:
+            return
+        with self._lock:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(payload, f)
+
+    def synthesize_track(self, track_id: str) -> Optional[Dict]:
+        entry = self._catalog.get(track_id)
+        if entry is None:
+            if self.strict or self._catalog:
+                return None
+            entry = {"name": f"Track {track_id}", "artists": ["Stand-in Artist"]}
+
+        digest = hashlib.sha1(track_id.encode("utf-8")).hexdigest()
+        album_id = digest[:22]
+        return {
+            "id": track_id,
+            "name": entry["name"],
+            "artists": [
+                {"id": self._artist_id(name), "name": name} for name in entry["artists"]
+            ],
+            "album": {
+                "id": album_id,
+                "name": f"Album {album_id[:6]}",
+                "images": [
+                    {
+                        "url": f"{self.base_url}/images/{album_id}/{size}.jpg",
+                        "height": size,
+                        "width": size,
+                    }
+                    for size in IMAGE_SIZES
+                ],
+            },
+            "external_urls": {"spotify": f"https://open.spotify.com/track/{track_id}"},
+        }
+
+    def _artist_id(self, name: str) -> str:
+        artist_id = hashlib.sha1(name.encode("utf-8")).hexdigest()[:22]
+        self._artists[artist_id] = name
+        return artist_id
+
+    def synthesize_artist(self, artist_id: str) -> Optional[Dict]:
+        name = self._artists.get(artist_id)
+        if name is None:
+            if self.strict:
+                return None
+            name = f"Artist {artist_id[:6]}"
+
+        # Deterministic per artist, so repeated runs see the same genres.
+        seed = int(hashlib.sha1(artist_id.encode("utf-8")).hexdigest()[:8], 16)
+        genres = [
+            STAND_IN_GENRES[(seed >> shift) % len(STAND_IN_GENRES)]
+            for shift in range(0, 3 * (1 + seed % 3), 3)
+        ]
+        return {
+            "id": artist_id,
+            "name": name,
+            "genres": list(dict.fromkeys(genres)),
+            "external_urls": {
+                "spotify": f"https://open.spotify.com/artist/{artist_id}"
+            },
+        }
+
+
+class Upstream:
+    def __init__(self, client_id: str, client_secret: str):
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self._token = None
+        self._expiry = 0.0
+        self._lock = threading.Lock()
+
+    def _get_token(self) -> str:
+        with self._lock:
+            if self._token and time.monotonic() < self._expiry:
+                return self._token
+
+            auth = base64.b64encode(
+                f"{self.client_id}:{self.client_secret}".encode("utf-8")
+            ).decode("utf-8")
+            response = requests.post(
+                UPSTREAM_TOKEN_URL,
+                headers={"Authorization": f"Basic {auth}"},
+                data={"grant_type": "client_credentials"},
+                timeout=10,
+            )
+            response.raise_for_status()
+            token_info = response.json()
+            self._token = token_info["access_token"]
+            self._expiry = time.monotonic() + token_info.get("expires_in", 3600) - 300
+            return self._token
+
+    def get(self, path: str, params: Optional[Dict] = None) -> requests.Response:
+        return requests.get(
+            f"{UPSTREAM_API_BASE}{path}",
+            headers={"Authorization": f"Bearer {self._get_token()}"},
+            params=params,
+            timeout=10,
+        )
+
+
+class StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(
+        self,
+        address,
+        store: FixtureStore,
+        latency: LatencyModel,
+        error_rate: float = 0.0,
+        throttle_rate: float = 0.0,
+        rate_limit: int = 0,
+        retry_after: int = 1,
+        mode: str = "synthetic",
+        upstream: Optional[Upstream] = None,
+    ):
+        super().__init__(address, StandInHandler)
+        self.store = store
+        self.latency = latency
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.rate_limit = rate_limit
+        self.retry_after = retry_after
+        self.mode = mode
+        self.upstream = upstream
+
+        self.lock = threading.Lock()
+        self.window: deque = deque()
+        self.in_flight = 0
+        self.stats = {"requests": 0, "served": 0, "throttled": 0, "errors": 0}
+
+        host, port = self.server_address[:2]
+        store.base_url = f"http://{host}:{port}"
+
+    @property
+    def base_url(self) -> str:
+        return self.store.base_url
+
+    def admit(self) -> Optional[int]:
+        with self.lock:
+            self.stats["requests"] += 1
+            now = time.monotonic()
+
+            if self.rate_limit:
+                while self.window and now - self.window[0] > 1.0:
+                    self.window.popleft()
+                if len(self.window) >= self.rate_limit:
+                    self.stats["throttled"] += 1
+                    return 429
+                self.window.append(now)
+
+            if self.throttle_rate and random.random() < self.throttle_rate:
+                self.stats["throttled"] += 1
+                return 429
+
+            if self.error_rate and random.random() < self.error_rate:
+                self.stats["errors"] += 1
+                return random.choice((500, 502, 503))
+
+            self.in_flight += 1
+            return None
+
+    def finish(self) -> None:
+        with self.lock:
+            self.in_flight -= 1
+            self.stats["served"] += 1
+
+    def handle_error(self, request, client_address):
+        # Clients time out on stalled responses; that is expected here.
+        if isinstance(sys.exc_info()[1], (BrokenPipeError, ConnectionResetError)):
+            return
+        super().handle_error(request, client_address)
+
+    def start(self) -> "StandInServer":
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    server_version = "SpotifyStandIn/1.0"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, payload: Dict, headers: Dict = None) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_error(self, status: int, message: str) -> None:
+        headers = {}
+        if status == 429:
+            headers["Retry-After"] = str(self.server.retry_after)
+        self._send_json(
+            status, {"error": {"status": status, "message": message}}, headers
+        )
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if urlparse(self.path).path != "/api/token":
+            self._send_error(404, "Not found")
+            return
+        self._send_json(
+            200,
+            {
+                "access_token": "stand-in-token",
+                "token_type": "Bearer",
+                "expires_in": 3600,
+            },
+        )
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        parts = [p for p in url.path.split("/") if p]
+
+        if parts[:1] == ["images"] and len(parts) == 3:
+            self._serve_image(parts[1], parts[2])
+            return
+
+        if parts[:1] != ["v1"] or parts[1:2] not in (["tracks"], ["artists"]):
+            self._send_error(404, "Not found")
+            return
+        if len(parts) > 3:
+            self._send_error(404, "Not found")
+            return
+
+        status = self.server.admit()
+        if status is not None:
+            self._send_error(status, "Injected failure")
+            return
+
+        try:
+            time.sleep(self.server.latency.sample(self.server.in_flight))
+            self._serve_items(parts, url.query)
+        except requests.RequestException as e:
+            self._send_error(502, f"Upstream request failed: {e}")
+        finally:
+            self.server.finish()
+
+    def _serve_items(self, parts: List[str], query: str) -> None:
+        kind = parts[1]
+        if len(parts) == 3:
+            item = self._lookup(kind, [parts[2]])[0]
+            if item is None:
+                self._send_error(404, "Non existing id")
+            else:
+                self._send_json(200, item)
+            return
+
+        ids = parse_qs(query).get("ids", [""])[0]
+        ids = [i for i in ids.split(",") if i]
+        if not ids or len(ids) > MAX_BATCH_IDS:
+            self._send_error(400, "Invalid ids")
+        else:
+            self._send_json(200, {kind: self._lookup(kind, ids)})
+
+    def _lookup(self, kind: str, ids: List[str]) -> List[Optional[Dict]]:
+        server = self.server
+        store = server.store
+        items = {i: store.get_recorded(kind, i) for i in ids}
+        missing = [i for i, item in items.items() if item is None]
+
+        if missing and server.mode == "record":
+            response = server.upstream.get(f"/{kind}", {"ids": ",".join(missing)})
+            response.raise_for_status()
+            for item in response.json().get(kind, []):
+                if item:
+                    store.record(kind, item["id"], item)
+                    items[item["id"]] = item
+        elif missing and server.mode == "synthetic":
+            synthesize = (
+                store.synthesize_track if kind == "tracks" else store.synthesize_artist
+            )
+            for i in missing:
+                items[i] = synthesize(i)
+
+        return [items[i] for i in ids]
+
+    def _serve_image(self, key: str, filename: str) -> None:
+        from PIL import Image
+
+        try:
+            size = min(int(filename.split(".")[0]), 1024)
+        except ValueError:
+            self._send_error(404, "Not found")
+            return
+
+        # Tinted noise compresses about as poorly as real album art, which keeps
+        # page-weight measurements against the stand-in realistic.
+        color = tuple(bytes.fromhex(hashlib.sha1(key.encode("utf-8")).hexdigest()[:6]))
+        noise = Image.effect_noise((size, size), 48).convert("RGB")
+        image = Image.blend(Image.new("RGB", (size, size), color), noise, 0.35)
+        buffer = io.BytesIO()
+        image.save(buffer, "JPEG", quality=85)
+        body = buffer.getvalue()
+
+        self.send_response(200)
+        self.send_header("Content-Type", "image/jpeg")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "public, max-age=86400")
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def _parse_artists(value) -> List[str]:
+    text = str(value).strip()
+    if text.startswith("[") and text.endswith("]"):
+        names = [name.strip().strip("'\"") for name in text[1:-1].split(",")]
+    else:
+        names = [name.strip() for name in text.split(",")]
+    return [name for name in names if name] or ["Unknown Artist"]
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Local stand-in for the Spotify Web API used by the enrichment path."
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument(
+        "--mode",
+        choices=("synthetic", "record", "replay"),
+        default="synthetic",
+        help="synthetic: generate from the dataset ids; record: proxy to Spotify "
+        "and save responses; replay: serve only recorded responses",
+    )
+    parser.add_argument("--fixtures", help="Directory for recorded responses")
+    parser.add_argument("--dataset", default=DATASET_PATH)
+    parser.add_argument(
+        "--strict", action="store_true", help="Return 404 for ids not in the dataset"
+    )
+    parser.add_argument(
+        "--latency",
+        default="fixed:0.05",
+        help="fixed:S | uniform:MIN,MAX | lognormal:MU,SIGMA | exponential:MEAN",
+    )
+    parser.add_argument("--stall-rate", type=float, default=0.0)
+    parser.add_argument("--stall-seconds", type=float, default=10.0)
+    parser.add_argument(
+        "--capacity", type=int, default=0, help="Concurrency before latency degrades"
+    )
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=int, default=0, help="Max req/s, 0 = off")
+    parser.add_argument("--retry-after", type=int, default=1)
+    return parser
+
+
+def create_server(args: argparse.Namespace) -> StandInServer:
+    if args.mode in ("record", "replay") and not args.fixtures:
+        raise SystemExit("--fixtures is required in record and replay modes")
+
+    upstream = None
+    if args.mode == "record":
+        client_id = os.getenv("CLIENT_ID")
+        client_secret = os.getenv("CLIENT_SECRET")
+        if not client_id or not client_secret:
+            raise SystemExit("CLIENT_ID and CLIENT_SECRET are required to record")
+        upstream = Upstream(client_id, client_secret)
+
+    store = FixtureStore(args.fixtures, strict=args.strict)
+    if args.mode == "synthetic":
+        store.load_dataset(args.dataset)
+
+    return StandInServer(
+        (args.host, args.port),
+        store,
+        LatencyModel(args.latency, args.stall_rate, args.stall_seconds, args.capacity),
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        rate_limit=args.rate_limit,
+        retry_after=args.retry_after,
+        mode=args.mode,
+        upstream=upstream,
+    )
+
+
+def main():
+    load_dotenv()
+    args = build_parser().parse_args()
+    server = create_server(args)
+
+    print(f"🎧 Spotify stand-in listening on {server.base_url} ({args.mode})")
+    print(f"   SPOTIFY_API_BASE={server.base_url}/v1")
+    print(f"   TOKEN_URL={server.base_url}/api/token")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
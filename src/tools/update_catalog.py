@@ -0,0 +1,37 @@
+import argparse
+import json
+import sys
+
+from core.catalog import UPDATES_PATH, append_tracks, remove_tracks
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Add or remove tracks in the running recommenders' catalog, "
+        "without regenerating the dataset or refitting the model."
+    )
+    parser.add_argument("--log", default=UPDATES_PATH, help="Catalog updates log")
+    commands = parser.add_subparsers(dest="command", required=True)
+    add = commands.add_parser("add", help="Append the tracks of a JSONL file")
+    add.add_argument("input", help="JSONL file with one track per line, or -")
+    remove = commands.add_parser("remove", help="Remove tracks by id")
+    remove.add_argument("ids", nargs="+")
+    args = parser.parse_args()
+
+    if args.command == "remove":
+        count = remove_tracks(args.ids, args.log)
+        print(f"🗑️ {count} removals written to {args.log}")
+        return
+
+    stream = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    with stream:
+        tracks = [json.loads(line) for line in stream if line.strip()]
+    try:
+        count = append_tracks(tracks, args.log)
+    except (ValueError, KeyError) as e:
+        raise SystemExit(f"❌ Invalid track, nothing written: {e}")
+    print(f"🆕 {count} tracks written to {args.log}")
+
+
+if __name__ == "__main__":
+    main()
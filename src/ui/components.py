@@ -1,5 +1,12 @@
+import threading
+from collections import OrderedDict
+from html import escape
+from typing import Optional, Tuple
+
 import streamlit as st
 
+from services.image_cache import CARD_IMAGE_SIZES
+
 
 def slider_with_label(label, tooltip, key):
     return st.slider(label, 0, 100, 0, 1, key=key, help=tooltip)
@@ -36,6 +43,15 @@ def is_popular_checkbox():
     )
 
 
+def live_mode_toggle():
+    return st.toggle(
+        "Atualizar enquanto ajusto",
+        value=False,
+        key="live_toggle",
+        help="Atualiza as recomendações ao mover os sliders, sem precisar clicar",
+    )
+
+
 def is_explicit_checkbox():
     return st.checkbox(
         "Apenas músicas com palavrões",
@@ -44,49 +60,118 @@ def is_explicit_checkbox():
     )
 
 
-def track_card_html(song: dict) -> str:
-    title = song.get("title", "Unknown").replace('"', "&quot;").replace("'", "&#39;")
-    artist = (
-        song.get("artist", "Unknown Artist")
-        .replace('"', "&quot;")
-        .replace("'", "&#39;")
+def skip_shown_checkbox():
+    return st.checkbox(
+        "Não repetir músicas já mostradas",
+        value=False,
+        key="skip_shown_checkbox",
+        help="Cada nova recomendação pula as músicas que você já viu nesta sessão",
     )
-    genres = song.get("genres", "").replace('"', "&quot;").replace("'", "&#39;")
 
-    image_url = song.get("image_url", "")
-    spotify_url = song.get("spotify_url", "")
 
-    if image_url:
-        image_html = f'<img src="{image_url}" alt="{title}" class="track-image-img">'
-    else:
-        image_html = '<div class="track-image">🎵</div>'
+CARD_CACHE_SIZE = 4096
+
+# Single-line positional templates: no whitespace shipped per card, and
+# %-formatting a tuple is several times cheaper than str.format with names.
+_CARD_TEMPLATE = (
+    '<div class="track-card">%s'
+    '<div class="track-title-wrapper"><div class="track-title">%s</div></div>'
+    '<div class="track-artist-wrapper"><div class="track-artist">%s</div></div>'
+    '<div class="track-genres-wrapper"><div class="track-genres">%s</div></div>'
+    "</div>"
+)
+_CARD_LINK_TEMPLATE = (
+    '<a href="%s" target="_blank" rel="noopener noreferrer" '
+    'class="track-card-link">%s</a>'
+)
+_IMAGE_SRCSET_TEMPLATE = (
+    '<img src="%s" srcset="%s" sizes="'
+    + CARD_IMAGE_SIZES
+    + '" alt="%s" class="track-image-img" width="256" height="256" '
+    'loading="lazy" decoding="async">'
+)
+_IMAGE_TEMPLATE = (
+    '<img src="%s" alt="%s" class="track-image-img" loading="lazy" decoding="async">'
+)
+_NO_IMAGE_HTML = '<div class="track-image">🎵</div>'
+_SKELETON_HTML = (
+    '<div class="track-card skeleton"><div class="track-image"></div>'
+    '<div class="skeleton-line"></div><div class="skeleton-line short"></div></div>'
+)
+_GRID_OPEN = '<div class="tracks-grid scrollable-list">'
+_GRID_CLOSE = "</div>"
+
+_card_cache: "OrderedDict[str, Tuple[Tuple, str]]" = OrderedDict()
+_card_cache_lock = threading.Lock()
+
+
+def _card_fields(song: dict) -> Tuple:
+    return (
+        song.get("title") or "Unknown",
+        song.get("artist") or "Unknown Artist",
+        song.get("genres") or "",
+        song.get("image_url") or "",
+        song.get("image_srcset") or "",
+        song.get("spotify_url") or "",
+    )
 
-    card_class = "track-card"
-    if spotify_url:
-        card_open = f'<a href="{spotify_url}" target="_blank" rel="noopener noreferrer" class="{card_class}-link">'
-        card_close = "</a>"
+
+def _render_card(fields: Tuple) -> str:
+    title, artist, genres, image_url, image_srcset, spotify_url = map(escape, fields)
+
+    if image_url and image_srcset:
+        image_html = _IMAGE_SRCSET_TEMPLATE % (image_url, image_srcset, title)
+    elif image_url:
+        image_html = _IMAGE_TEMPLATE % (image_url, title)
     else:
-        card_open = ""
-        card_close = ""
-
-    card_inner = f"""
-        <div class="{card_class}">
-            {image_html}
-            <div class="track-title-wrapper">
-                <div class="track-title">{title}</div>
-            </div>
-            <div class="track-artist-wrapper">
-                <div class="track-artist">{artist}</div>
-            </div>
-            <div class="track-genres-wrapper">
-                <div class="track-genres">{genres}</div>
-            </div>
-        </div>
-    """
+        image_html = _NO_IMAGE_HTML
 
+    card = _CARD_TEMPLATE % (image_html, title, artist, genres)
     if spotify_url:
-        return f"\n{card_open}{card_inner}{card_close}\n"
-    return f"\n{card_inner}\n"
+        return _CARD_LINK_TEMPLATE % (spotify_url, card)
+    return card
+
+
+def track_card_html(song: dict) -> str:
+    fields = _card_fields(song)
+    track_id = song.get("id")
+    # A card without a Spotify link comes from a failed lookup; it is never
+    # cached, so the next run that shows the track tries the lookup again.
+    if not track_id or not song.get("spotify_url"):
+        return _render_card(fields)
+
+    # Shared across sessions: a card is escaped and formatted once per
+    # distinct content, then reused on every rerun that shows it.
+    with _card_cache_lock:
+        cached = _card_cache.get(track_id)
+        if cached is not None and cached[0] == fields:
+            _card_cache.move_to_end(track_id)
+            return cached[1]
+
+    card = _render_card(fields)
+    with _card_cache_lock:
+        _card_cache[track_id] = (fields, card)
+        _card_cache.move_to_end(track_id)
+        while len(_card_cache) > CARD_CACHE_SIZE:
+            _card_cache.popitem(last=False)
+    return card
+
+
+def cached_track_card_html(track_id: str) -> Optional[str]:
+    with _card_cache_lock:
+        cached = _card_cache.get(track_id)
+        if cached is None:
+            return None
+        _card_cache.move_to_end(track_id)
+        return cached[1]
+
+
+def track_card_skeleton_html() -> str:
+    return _SKELETON_HTML
+
+
+def tracks_grid_html(cards: list) -> str:
+    return _GRID_OPEN + "".join(cards) + _GRID_CLOSE
 
 
 def header():
@@ -94,13 +179,3 @@ def header():
         '<div class="header-title"><div class="spotify-icon"><svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 512 512"><rect width="512" height="512" rx="15%" fill="var(--primary-color)"/><circle cx="256" cy="256" fill="var(--text-light)" r="192"/><g fill="none" stroke="var(--primary-color)" stroke-linecap="round"><path d="m141 195c75-20 164-15 238 24" stroke-width="36"/><path d="m152 257c61-17 144-13 203 24" stroke-width="31"/><path d="m156 315c54-12 116-17 178 20" stroke-width="24"/></g></svg></div>Recomendações Spotify</div>',
         unsafe_allow_html=True,
     )
-
-
-def centered_loader():
-    loading_html = """
-    <div class="loading-container">
-        <div class="spinner"></div>
-        <div class="loading-text">Carregando...</div>
-    </div>
-    """
-    return st.markdown(loading_html, unsafe_allow_html=True)
@@ -1,42 +1,201 @@
+import time
+from typing import Collection
+
 import streamlit as st
 import streamlit.components.v1 as components
-from dotenv import load_dotenv
 
 from core.model_loader import load_models
-from core.recommender import recommend
-from services.spotify_api import fetch_spotify_data_parallel
+from core.recommender import (
+    get_tracks,
+    has_more,
+    make_query_key,
+    next_page,
+    recommend_handle,
+)
+from core.shown_filter import ShownFilter
+from services import async_engine, spotify_api
+from services.negative_cache import (
+    EXCLUDE_DEAD_FROM_RECOMMENDATIONS,
+    get_negative_cache,
+)
+from services.prefetch import get_prefetcher
 from ui.components import (
-    centered_loader,
+    cached_track_card_html,
     decade_selector,
     header,
     is_explicit_checkbox,
     is_popular_checkbox,
+    live_mode_toggle,
+    skip_shown_checkbox,
     slider_with_label,
     track_card_html,
+    track_card_skeleton_html,
+    tracks_grid_html,
 )
-from ui.styles import get_text_overflow_script, load_styles
+from ui.styles import get_assets_loader_html, inline_styles_html
 
 
-def init_app():
-    load_dotenv()
+GRID_REFRESH_SECONDS = 0.05
+# Slider moves closer together than this collapse into one query.
+LIVE_DEBOUNCE_SECONDS = 0.25
+
+
+def render_tracks_progressively(
+    tracks_list: list, reuse_ids: Collection[str] = ()
+) -> None:
+    grid = st.empty()
+    track_ids = [track.get("id", "") for track in tracks_list]
+
+    # Cards already on screen stand in while the page streams. Every track
+    # still goes through the stream, so a card picks up genres and thumbnails
+    # that resolved since it was drawn; only tracks missing from the store
+    # are looked up upstream.
+    cards = []
+    for track_id in track_ids:
+        card = cached_track_card_html(track_id) if track_id in reuse_ids else None
+        cards.append(card or track_card_skeleton_html())
+
+    emitted = None
+    emitted_at = 0.0
+
+    def emit() -> None:
+        nonlocal emitted, emitted_at
+        html = tracks_grid_html(cards)
+        if html != emitted:
+            grid.markdown(html, unsafe_allow_html=True)
+            emitted = html
+            emitted_at = time.monotonic()
+
+    # A page served entirely from the store goes out as a single grid. When
+    # nothing changed it is the markup the browser already holds, which
+    # Streamlit resends as a reference to its cached copy.
+    _, _, missing = spotify_api.partition_track_ids(track_ids)
+    if missing:
+        emit()
+
+    if async_engine.ASYNC_ENGINE_ENABLED:
+        stream = async_engine.stream_spotify_data(tracks_list)
+    else:
+        stream = spotify_api.stream_spotify_data(tracks_list)
+
+    for rank, song in stream:
+        cards[rank] = track_card_html(song)
+        if missing and time.monotonic() - emitted_at >= GRID_REFRESH_SECONDS:
+            emit()
+    emit()
+    st.session_state["rendered_ids"] = frozenset(track_ids)
+
+
+PAGE_SIZE = 10
+
+
+def _excluded_ids():
+    if EXCLUDE_DEAD_FROM_RECOMMENDATIONS:
+        return get_negative_cache().dead_ids()
+    return None
+
 
-    model, _, df_model, features = load_models()
+def _shown_filter():
+    # Positions of every track this session was shown, kept only while the
+    # checkbox is on; a click callback runs before the widget, so the value
+    # is read from the session.
+    if not st.session_state.get("skip_shown_checkbox"):
+        return None
+    if "shown_filter" not in st.session_state:
+        st.session_state["shown_filter"] = ShownFilter()
+    return st.session_state["shown_filter"]
 
+
+def remember_shown(handle) -> None:
+    shown = _shown_filter()
+    if shown is not None:
+        shown.add(handle.indices[: handle.shown])
+
+
+def cancel_prefetch() -> None:
+    task = st.session_state.pop("prefetch_task", None)
+    if task is not None:
+        task.cancel()
+    st.session_state.pop("next_recommendations", None)
+
+
+def prefetch_next_page(handle) -> None:
+    key = (handle.query_key, handle.shown)
+    upcoming = st.session_state.get("next_recommendations")
+    if upcoming is not None and upcoming["key"] == key:
+        return
+
+    cancel_prefetch()
+    upcoming = {"key": key}
+    st.session_state["next_recommendations"] = upcoming
+    exclude_ids, shown = _excluded_ids(), _shown_filter()
+
+    # The next page is ranked on the prefetch worker, not while this run
+    # draws; "Carregar mais" uses it if it is ready by then.
+    def next_track_ids():
+        next_handle = next_page(handle, PAGE_SIZE, exclude_ids=exclude_ids, shown=shown)
+        upcoming["handle"] = next_handle
+        return [track["id"] for track in get_tracks(next_handle, start=handle.shown)]
+
+    st.session_state["prefetch_task"] = get_prefetcher().schedule(next_track_ids)
+
+
+def settle_live_query() -> None:
+    # Streamlit stops a run at its next element call once a newer widget
+    # change arrives, so a superseded slider position is never ranked.
+    time.sleep(LIVE_DEBOUNCE_SECONDS)
+    st.empty()
+
+
+def load_more_recommendations() -> None:
+    handle = st.session_state.get("last_recommendations")
+    if handle is None:
+        return
+
+    # The page the prefetch ranked is reused if it is ready and follows this
+    # one; otherwise it is ranked now.
+    upcoming = st.session_state.pop("next_recommendations", None)
+    if (
+        upcoming is not None
+        and upcoming["key"] == (handle.query_key, handle.shown)
+        and "handle" in upcoming
+    ):
+        st.session_state["last_recommendations"] = upcoming["handle"]
+    else:
+        st.session_state["last_recommendations"] = next_page(
+            handle, PAGE_SIZE, exclude_ids=_excluded_ids(), shown=_shown_filter()
+        )
+
+
+def init_app():
     st.set_page_config(
         page_title="Recomendações Spotify",
         page_icon="🎵",
         layout="wide",
     )
-    st.markdown(load_styles(), unsafe_allow_html=True)
-
-    components.html(get_text_overflow_script(), height=0)
+    # A session's first run carries the styles inline so the page is never
+    # drawn unstyled. After it, styles and the overflow observer live in the
+    # page head, and reruns only resend this small, unchanged loader.
+    styles_html = inline_styles_html(first_run="styles_loaded" not in st.session_state)
+    if styles_html is not None:
+        st.markdown(styles_html, unsafe_allow_html=True)
+    st.session_state["styles_loaded"] = True
+    components.html(get_assets_loader_html(), height=0)
 
     header()
 
     col1, col2 = st.columns([1, 2], gap=None)
 
     with col1:
-        with st.form(key="reco_form", border=False):
+        live = live_mode_toggle()
+        # Widgets inside a form only report back on submit, so live mode lays
+        # the same widgets out in a plain container.
+        if live:
+            controls = st.container()
+        else:
+            controls = st.form(key="reco_form", border=False)
+
+        with controls:
             with st.container():
                 st.markdown("### Parâmetros")
 
@@ -65,9 +224,23 @@ def init_app():
 
                 is_explicit = is_explicit_checkbox()
 
-            submit = st.form_submit_button(
-                "Gerar recomendação", use_container_width=True, type="primary"
+                skip_shown_checkbox()
+
+            if live:
+                submit = False
+            else:
+                submit = st.form_submit_button(
+                    "Gerar recomendação", use_container_width=True, type="primary"
+                )
+
+        if live:
+            handle = st.session_state.get("last_recommendations")
+            query_key = make_query_key(
+                dance, energy, acoustic, valence, is_popular, is_explicit, decade
             )
+            if handle is None or handle.query_key != query_key:
+                settle_live_query()
+                submit = True
 
         if submit:
             try:
@@ -82,9 +255,16 @@ def init_app():
                 print(f"  Década: {decade}")
                 print(f"  Popular: {'Sim' if is_popular else 'Não'}")
                 print(f"  Explicit: {'Sim' if is_explicit else 'Não'}")
+                shown = _shown_filter()
+                if shown is not None:
+                    print(
+                        f"  Já mostradas: {shown.count} "
+                        f"({shown.nbytes} bytes nesta sessão)"
+                    )
                 print("-" * 60)
 
-                resultados = recommend(
+                cancel_prefetch()
+                handle = recommend_handle(
                     danceability=dance,
                     energy=energy,
                     acousticness=acoustic,
@@ -92,42 +272,44 @@ def init_app():
                     is_popular=is_popular,
                     is_explicit=is_explicit,
                     decade=decade,
-                    top_n=100,
+                    top_n=PAGE_SIZE,
+                    exclude_ids=_excluded_ids(),
+                    shown=shown,
                 )
-                st.session_state["last_recommendations"] = resultados
-                st.session_state["is_loading"] = True
+                st.session_state["last_recommendations"] = handle
             except Exception as e:
                 st.error(f"Erro ao gerar recomendação: {e}")
 
     with col2:
         st.markdown("### Músicas Recomendadas")
 
-        is_loading = st.session_state.get("is_loading", False)
-
-        if is_loading and "last_recommendations" in st.session_state:
-            centered_loader()
-
-            resultados = st.session_state["last_recommendations"]
-            tracks_list = resultados.to_dict("records")
-            display_list = fetch_spotify_data_parallel(tracks_list, max_workers=5)
+        handle = st.session_state.get("last_recommendations")
 
-            st.session_state["is_loading"] = False
-
-            st.rerun()
-
-        elif (
-            "last_recommendations" in st.session_state
-            and st.session_state["last_recommendations"] is not None
-        ):
-            resultados = st.session_state["last_recommendations"]
-
-            tracks_list = resultados.to_dict("records")
+        if handle is not None and handle.shown > 0:
+            render_tracks_progressively(
+                get_tracks(handle),
+                reuse_ids=st.session_state.get("rendered_ids", ()),
+            )
+            remember_shown(handle)
+            if has_more(handle):
+                prefetch_next_page(handle)
+                st.button(
+                    "Carregar mais",
+                    on_click=load_more_recommendations,
+                    use_container_width=True,
+                )
 
-            display_list = fetch_spotify_data_parallel(tracks_list, max_workers=5)
+        elif handle is not None:
+            no_results_html = """
+            <div class="empty-state">
+                <div class="icon">😔</div>
+                <h3>Sem resultados</h3>
+                <p>Nenhuma música encontrada com os parâmetros selecionados.<br>Tente ajustar os filtros ou mudar os valores dos sliders.</p>
+            </div>
+            """
+            st.markdown(no_results_html, unsafe_allow_html=True)
 
         else:
-            display_list = []
-
             placeholder_html = """
           <div class="placeholder-instruction">
               <div class="icon">🎵</div>
@@ -155,24 +337,6 @@ def init_app():
 
             st.markdown(placeholder_html, unsafe_allow_html=True)
 
-        if len(display_list) > 0 and not is_loading:
-            html_tracks = '<div class="tracks-grid scrollable-list">'
-            for song in display_list:
-                html_tracks += track_card_html(song)
-
-            html_tracks += "</div>"
-            st.markdown(html_tracks, unsafe_allow_html=True)
-
-        elif (
-            "last_recommendations" in st.session_state
-            and not is_loading
-            and len(display_list) == 0
-        ):
-            no_results_html = """
-            <div class="empty-state">
-                <div class="icon">😔</div>
-                <h3>Sem resultados</h3>
-                <p>Nenhuma música encontrada com os parâmetros selecionados.<br>Tente ajustar os filtros ou mudar os valores dos sliders.</p>
-            </div>
-            """
-            st.markdown(no_results_html, unsafe_allow_html=True)
+    # The page is already on screen; warm the model and dataset now so the
+    # first recommendation doesn't pay for loading them.
+    load_models()
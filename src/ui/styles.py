@@ -1,3 +1,12 @@
+import hashlib
+import json
+import os
+import threading
+from typing import Dict, Optional
+
+STATIC_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "../static"))
+STATIC_URL_PREFIX = "app/static"
+
 # Primary Brand Colors
 PRIMARY_COLOR = "#38E07B"  # Primary green - buttons, highlights, accents
 BACKGROUND_COLOR = "#122017"  # Main application background
@@ -32,9 +41,8 @@ def get_color_variables() -> str:
     """
 
 
-def load_styles() -> str:
+def get_app_css() -> str:
     return f"""
-    <style>
         {get_color_variables()}
 
         body, .main, .block-container {{
@@ -465,6 +473,28 @@ def load_styles() -> str:
             transform: translateY(-4px);
         }}
 
+        .track-card.skeleton {{
+            cursor: default;
+            animation: skeletonPulse 1.2s ease-in-out infinite;
+        }}
+
+        .track-card.skeleton:hover {{
+            background: var(--card-bg-light);
+            border-color: transparent;
+            transform: none;
+        }}
+
+        .skeleton-line {{
+            height: 0.8rem;
+            border-radius: 4px;
+            background: var(--secondary-background);
+            margin-bottom: 0.5rem;
+        }}
+
+        .skeleton-line.short {{
+            width: 60%;
+        }}
+
         .track-card-link {{
             text-decoration: none !important;
             display: block;
@@ -786,56 +816,181 @@ def load_styles() -> str:
             100% {{ transform: rotate(360deg); }}
         }}
 
+        @keyframes skeletonPulse {{
+            0% {{ opacity: 1; }}
+            50% {{ opacity: 0.5; }}
+            100% {{ opacity: 1; }}
+        }}
+
         @keyframes scrollText {{
             0% {{ transform: translateX(0); }}
             100% {{ transform: translateX(-100%); }}
         }}
-    </style>
     """
 
 
+def load_styles() -> str:
+    return f"<style>{get_app_css()}</style>"
+
+
 def get_text_overflow_script() -> str:
+    # Runs in the parent document once per page load. Each card's text
+    # wrappers are observed for size changes; nothing polls while idle.
+    return """
+        (function () {
+            if (window.__trackOverflowInstalled) return;
+            window.__trackOverflowInstalled = true;
+
+            const WRAPPERS = '.track-title-wrapper, .track-artist-wrapper, .track-genres-wrapper';
+            const watched = new Set();
+
+            function checkOverflow(wrapper) {
+                const element = wrapper.firstElementChild;
+                if (!element) return;
+                element.classList.toggle('has-overflow', element.scrollWidth > wrapper.clientWidth);
+            }
+
+            const resizeObserver = new ResizeObserver(entries => {
+                entries.forEach(entry => checkOverflow(entry.target));
+            });
+
+            function wrappersIn(node) {
+                if (node.nodeType !== Node.ELEMENT_NODE) return [];
+                if (node.matches(WRAPPERS)) return [node];
+                return node.querySelectorAll(WRAPPERS);
+            }
+
+            function watch(node) {
+                wrappersIn(node).forEach(wrapper => {
+                    if (watched.has(wrapper)) return;
+                    watched.add(wrapper);
+                    resizeObserver.observe(wrapper);
+                });
+            }
+
+            function unwatch(node) {
+                wrappersIn(node).forEach(wrapper => {
+                    if (!watched.delete(wrapper)) return;
+                    resizeObserver.unobserve(wrapper);
+                });
+            }
+
+            const root = document.querySelector('[data-testid="stMain"]') || document.body;
+            const mutationObserver = new MutationObserver(records => {
+                records.forEach(record => {
+                    record.removedNodes.forEach(unwatch);
+                    record.addedNodes.forEach(watch);
+                });
+            });
+            mutationObserver.observe(root, {childList: true, subtree: true});
+            watch(root);
+
+            // Text width changes when the web font arrives, without resizing the wrapper.
+            if (document.fonts) {
+                document.fonts.addEventListener('loadingdone', () => watched.forEach(checkOverflow));
+            }
+        })();
+    """
+
+
+def _write_static_asset(prefix: str, extension: str, content: str) -> Optional[str]:
+    digest = hashlib.sha256(content.encode("utf-8")).hexdigest()[:12]
+    filename = f"{prefix}-{digest}.{extension}"
+    path = os.path.join(STATIC_PATH, filename)
+    if not os.path.exists(path):
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(STATIC_PATH, exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"⚠️ Could not write {filename}, inlining it instead: {e}")
+            return None
+    return f"{STATIC_URL_PREFIX}/{filename}"
+
+
+def get_static_assets() -> Dict[str, Optional[str]]:
+    # None for an asset that could not be written, such as on a read-only
+    # deploy; the page then carries it inline.
+    return {
+        "app-styles": _write_static_asset("app", "css", get_app_css()),
+        "track-overflow": _write_static_asset(
+            "overflow", "js", get_text_overflow_script()
+        ),
+    }
+
+
+def _build_assets_loader(assets: Dict[str, Optional[str]]) -> str:
+    # Streamlit serves .css/.js from app/static as text/plain, so they are
+    # fetched and inlined into the parent head instead of linked. A script
+    # without a static copy is shipped in the loader itself; styles without
+    # one are left to inline_styles_html().
+    sources = {
+        asset_id: {"path": path}
+        for asset_id, path in assets.items()
+        if path is not None
+    }
+    if assets["track-overflow"] is None:
+        sources["track-overflow"] = {"script": get_text_overflow_script()}
     return """
         <script>
-        function detectTextOverflow() {
-            const doc = window.parent.document || window.document;
-            
-            const titles = doc.querySelectorAll('.track-title');
-            const artists = doc.querySelectorAll('.track-artist');
-            const genres = doc.querySelectorAll('.track-genres');
-            
-            function checkOverflow(element) {
-                const wrapper = element.parentElement;
-                if (!wrapper) return;
-                
-                const hasOverflow = element.scrollWidth > wrapper.clientWidth;
-                
-                if (hasOverflow) {
-                    element.classList.add('has-overflow');
-                } else {
-                    element.classList.remove('has-overflow');
-                }
+        (function () {
+            const parent = window.parent;
+            const doc = parent.document;
+            const loaded = parent.__staticAssets || (parent.__staticAssets = {});
+            const assets = %s;
+
+            function inject(id, tag, text) {
+                const previous = doc.getElementById(id);
+                if (previous) previous.remove();
+                const element = doc.createElement(tag);
+                element.id = id;
+                element.textContent = text;
+                doc.head.appendChild(element);
             }
-            
-            titles.forEach(title => checkOverflow(title));
-            artists.forEach(artist => checkOverflow(artist));
-            genres.forEach(genre => checkOverflow(genre));
-        }
-        
-        detectTextOverflow();
-        
-        setTimeout(detectTextOverflow, 100);
-        setTimeout(detectTextOverflow, 500);
-        setTimeout(detectTextOverflow, 1000);
-        
-        const observer = new MutationObserver(detectTextOverflow);
-        const targetDoc = window.parent.document || window.document;
-        observer.observe(targetDoc.body, {
-            childList: true,
-            subtree: true,
-            characterData: true
-        });
-        
-        setInterval(detectTextOverflow, 500);
+
+            Object.entries(assets).forEach(([id, source]) => {
+                const version = source.path || 'inline';
+                if (loaded[id] === version) return;
+                loaded[id] = version;
+                if (source.script) {
+                    inject(id, 'script', source.script);
+                    return;
+                }
+                const url = new URL(source.path, doc.baseURI);
+                fetch(url)
+                    .then(response => {
+                        if (!response.ok) throw new Error(response.status);
+                        return response.text();
+                    })
+                    .then(text => inject(id, source.path.endsWith('.css') ? 'style' : 'script', text))
+                    .catch(error => {
+                        delete loaded[id];
+                        console.error('Failed to load ' + source.path, error);
+                    });
+            });
+        })();
         </script>
-    """
+    """ % json.dumps(sources).replace("</", "<\\/")
+
+
+# Written once when the app first imports this module, before any page is
+# drawn, rather than on a request.
+_static_assets = get_static_assets()
+_assets_loader = _build_assets_loader(_static_assets)
+_inline_styles = load_styles()
+
+
+def get_assets_loader_html() -> str:
+    return _assets_loader
+
+
+def inline_styles_html(first_run: bool) -> Optional[str]:
+    # The loader fetches the stylesheet after the page is drawn, so a
+    # session's first run carries it inline to avoid a flash of unstyled
+    # content; later runs use the copy in the page head. Without a static
+    # copy every run carries it.
+    if first_run or _static_assets["app-styles"] is None:
+        return _inline_styles
+    return None